@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+#Nom : DidonBenchDemarrage.py
+#Description : Mesure du temps de demarrage du traitement DidonGetMesures
+#Copyright : 2026, Air Breizh
+#Auteur :  Manuel
+#Version: 1.0
+
+"""
+    Mesure du temps de démarrage du traitement DidonGetMesures, pour détecter les régressions :
+        - import du module DidonGetMesures dans un processus neuf (sans cache d'import partagé), NB_REPETITIONS fois
+        - si <frequence> et <environnement> sont fournis : construction de DidonGetMesures (paramétrage, connexions XR
+          et DIDON, schéma des tables) puis déconnexion, NB_REPETITIONS fois
+    Les durées médiane et maximale de chaque étape sont affichées
+    Usage :
+    python DidonBenchDemarrage.py <seuil> [<frequence> <environnement>]
+    <seuil> :
+        Obligatoire, durée médiane maximale (secondes) de l'import du module
+        Le code retour vaut 1 si la durée médiane d'import dépasse <seuil>, 0 sinon
+    <frequence> et <environnement> :
+        Facultatifs, mêmes valeurs que pour DidonGetMesures
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from sys import argv
+
+## Nombre de répétitions de chaque mesure
+NB_REPETITIONS = 5
+
+## Code exécuté dans un processus neuf pour mesurer l'import du module
+CODE_IMPORT = 'import time; debut = time.perf_counter(); import DidonGetMesures; print(time.perf_counter() - debut)'
+
+def mesureImport(nbRepetitions):
+    """
+        Mesure de la durée (secondes) d'import du module DidonGetMesures dans <nbRepetitions> processus neufs
+        Retourne la liste des durées
+    """
+    durees = []
+    for i in range(nbRepetitions):
+        sortie = subprocess.run([sys.executable, '-c', CODE_IMPORT], cwd=os.path.dirname(os.path.abspath(__file__)),\
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+        durees.append(float(sortie.stdout.strip().splitlines()[-1]))
+    return durees
+
+def mesureConstruction(frequence, env, nbRepetitions):
+    """
+        Mesure de la durée (secondes) de construction de DidonGetMesures(<env>, <frequence>), déconnexion exclue
+        Retourne la liste des durées
+    """
+    from DidonGetMesures import DidonGetMesures
+
+    durees = []
+    for i in range(nbRepetitions):
+        debut = time.perf_counter()
+        dgm = DidonGetMesures(env, frequence)
+        durees.append(time.perf_counter() - debut)
+        dgm.disconnect()
+    return durees
+
+def afficheDurees(libelle, durees):
+    """
+        Affichage des durées médiane et maximale d'une étape
+    """
+    print('{0:<40} mediane = {1:8.3f} s   max = {2:8.3f} s   ({3} mesures)'.format(libelle, statistics.median(durees),\
+                                                                                    max(durees), len(durees)))
+
+## ######################################
+## fonction principale
+## ######################################
+
+'''
+    Usage explanation
+'''
+def Usage():
+    print ("Argument manquant.")
+    print ("Usage:")
+    print (argv[0] + ' <seuil> [secondes] <frequence> [A|M|J|H ou combinaison] <environnement> [PROD|LOCAL]')
+    exit()
+
+'''
+    main
+'''
+
+if __name__ == "__main__":
+
+    if len(argv) < 2:
+        Usage()
+    seuil = float(argv[1])
+
+    dureesImport = mesureImport(NB_REPETITIONS)
+    afficheDurees('Import du module DidonGetMesures', dureesImport)
+
+    if len(argv) >= 4:
+        afficheDurees('Construction DidonGetMesures ('+argv[2]+', '+argv[3]+')', mesureConstruction(argv[2], argv[3], NB_REPETITIONS))
+
+    if statistics.median(dureesImport) > seuil:
+        print('Regression du temps de demarrage : import median superieur a '+str(seuil)+' s')
+        sys.exit(1)
+    sys.exit(0)
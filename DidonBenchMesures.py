@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+#Nom : DidonBenchMesures.py
+#Description : Banc de mesure hors ligne du traitement DidonGetMesures (XR simule et base DIDON locale)
+#Copyright : 2026, Air Breizh
+#Auteur :  Manuel
+#Version: 1.0
+
+"""
+    Banc de mesure (benchmark) hors ligne du traitement DidonGetMesures, pour comparer chaque optimisation
+    de la récupération XR (getMesuresFromXR) et du traitement (traiteMesures) à une référence :
+        - XR est remplacé par FauxXAIR : séries horaires synthétiques (cycle journalier et saisonnier, bruit) et codes
+          de validation XR générés de façon déterministe pour <nbMesures> mesures et <nbAnnees> années
+        - DIDON est remplacé par une base SQLite locale (schéma 'mesure' attaché) ou, si <didon> est fourni,
+          par une base PostgreSQL temporaire (tables bench_mesures_* recréées à chaque scénario)
+        - le paramétrage est remplacé par FauxParametrage, les paramètres optionnels (getNbWorkers, getTailleLotXR,
+          getModeRemplacement ...) pouvant être passés en argument
+    Le paramétrage, la connexion XR et l'engine DIDON sont injectés dans DidonGetMesures (paramètres du constructeur).
+    Chaque scénario (fréquence H, D, M, A ou combinaison, ex : HDMA) est exécuté <passages> fois sur des tables vides
+    au départ : le premier passage est un chargement initial, les suivants remplacent les mesures existantes.
+    Pour chaque passage sont restitués :
+        - la durée totale, le débit (valeurs XR lues par seconde, mesures par seconde) et le nombre de lignes écrites
+        - la latence par étape (métriques DidonMetriques : durée cumulée, passages, latence moyenne)
+        - la mémoire maximale allouée (tracemalloc), mesurée lors d'une seconde exécution des scénarios
+          pour ne pas fausser les durées
+    Les résultats sont écrits au format JSON dans <sortie> et comparés à ceux du fichier <reference> s'il est fourni.
+    Usage :
+    python DidonBenchMesures.py [<cle>=<valeur> ...]
+        nbMesures=<n>       : nombre de mesures simulées (NB_MESURES par défaut)
+        nbAnnees=<n>        : nombre d'années de données par mesure (NB_ANNEES par défaut)
+        frequences=<liste>  : scénarios séparés par des virgules (FREQUENCES par défaut, ex : H,D,M,A,HDMA)
+        passages=<n>        : nombre de passages par scénario (NB_PASSAGES par défaut)
+        memoire=<0|1>       : mesure de la mémoire maximale (1 par défaut)
+        latenceXR=<s>       : latence simulée de chaque appel XR en secondes (0 par défaut)
+        niveauLog=<niveau>  : niveau de trace du DidonLogger du traitement, INFO (par défaut) ou DEBUG pour mesurer
+                              le surcoût des traces de résumés de structures de données
+        didon=<url>         : URL SQLAlchemy d'une base PostgreSQL de test (SQLite local par défaut)
+        sortie=<fichier>    : fichier JSON des résultats (DidonBenchMesures_resultats.json par défaut)
+        reference=<fichier> : fichier JSON de résultats de référence à comparer
+        get<Parametre>=<v>  : paramètre optionnel de DidonParametrage (ex : getNbWorkers=4 getModeRemplacement=DIFF)
+    Les modes d'écriture spécifiques PostgreSQL (getModeInsertion COPY, getModeRemplacement UPSERT, PLAGE et DIFF,
+    getSourceAgregatsMA DIDON) nécessitent <didon>
+    Scénarios de comparaison des optimisations (second lancement comparé au premier avec reference=<sortie du premier>) :
+        - insertion COPY : didon=<url> frequences=H,D getModeInsertion=TO_SQL, puis getModeInsertion=COPY
+        - agrégats M/A par lots vectorisés : frequences=M,A getTailleLotXR=1, puis getTailleLotXR=20
+        - format compact de la structure de sortie (mémoire maximale) : nbAnnees=5 frequences=H memoire=1 getTailleLotXR=20
+"""
+
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import zlib
+from sys import argv
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, event, text, MetaData, Table, Column, String, DateTime, Float, Integer
+
+from DidonDates import convertitDate
+from DidonLogger import DidonLogger
+from DidonGetMesures import DidonGetMesures
+from DidonMetriques import ETAPE_INSERTION
+
+## Valeurs par défaut des options du banc
+NB_MESURES = 20
+NB_ANNEES = 1
+FREQUENCES = 'H,D,M,A'
+NB_PASSAGES = 2
+
+## Schéma et préfixe des tables DIDON du banc
+SCHEMA_MESURE = 'mesure'
+PREFIXE_TABLE = 'bench_mesures_'
+
+## Codes de validation XR simulés et leur fréquence d'apparition, codes considérés comme valides
+CODES_XR = ['A', 'R', 'N', 'I', 'P']
+PROBABILITES_CODES_XR = [0.90, 0.04, 0.03, 0.02, 0.01]
+CODES_VALIDES_XR = ['A', 'R']
+## Valeur XR d'une mesure absente (remplacée par NaN via getDictRemplacementValeurs)
+VALEUR_ABSENTE_XR = -9999.0
+## Nombre minimal d'heures valides d'une moyenne quotidienne XR
+NB_HEURES_MIN_JOUR = 18
+
+class FauxXAIR:
+    """
+        Simulation de la connexion XR (pyair.xair.XAIR) : get_mesures retourne des données horaires ou quotidiennes
+        synthétiques, identiques d'un appel à l'autre pour une même mesure et une même heure
+    """
+
+    def __init__(self, graine=0, latence=0.0):
+        """
+            Initialisation avec la graine <graine> des générateurs aléatoires et une latence simulée <latence>
+            (secondes) par appel
+        """
+        self.graine = int(graine)
+        self.latence = float(latence)
+        self.maintenant = pd.Timestamp(datetime.datetime.now())
+        self.nbAppels = 0
+        self.nbValeurs = 0
+
+    def get_mesures(self, mes, debut, fin, freq='H', brut=False):
+        """
+            Même interface que pyair.xair.XAIR.get_mesures : mesures <mes> (nom court ou liste) du jour de <debut>
+            au jour de <fin> inclus, à la fréquence <freq> ('H' ou 'D')
+            Retourne le couple (mesures, codes) si <brut>, sinon les seules mesures valides (NaN pour les autres)
+        """
+        self.nbAppels += 1
+        if self.latence > 0:
+            time.sleep(self.latence)
+
+        nomsCourts = [mes] if isinstance(mes, str) else list(mes)
+        debutGrille = convertitDate(debut).normalize()
+        finGrille = convertitDate(fin).normalize() + pd.Timedelta(days=1)
+        index = pd.date_range(debutGrille, finGrille - pd.Timedelta(hours=1), freq=pd.Timedelta(hours=1))
+
+        valeurs, codes = {}, {}
+        for nomCourt in nomsCourts:
+            valeurs[nomCourt], codes[nomCourt] = self.genereSerie(nomCourt, index)
+        dataVal = pd.DataFrame(valeurs, index=index, columns=nomsCourts)
+        codesVal = pd.DataFrame(codes, index=index, columns=nomsCourts)
+
+        if freq == 'D':
+            dataVal, codesVal = self.moyennesQuotidiennes(dataVal, codesVal)
+        self.nbValeurs += dataVal.size
+        if brut:
+            return dataVal, codesVal
+        return dataVal.where(codesVal.isin(CODES_VALIDES_XR))
+
+    def genereSerie(self, nomCourt, index):
+        """
+            Génération des valeurs et codes horaires de la mesure <nomCourt> sur <index> :
+            niveau propre à la mesure, cycle journalier et saisonnier, bruit gaussien, valeurs arrondies au dixième
+            Le bruit et le code de chaque heure ne dépendent que de (graine, mesure, heure) : une heure a la même valeur
+            quelle que soit la fenêtre demandée
+            Les heures postérieures à l'instant présent et les mesures de code 'N' sont absentes (VALEUR_ABSENTE_XR)
+        """
+        empreinte = zlib.crc32(str(nomCourt).encode('utf-8'))
+        niveau = 10.0 + empreinte % 40
+        heures = index.hour.to_numpy()
+        jours = index.dayofyear.to_numpy()
+        numerosHeures = (index.as_unit('s').asi8 // 3600).astype(np.uint64)
+        u1, u2, u3 = (self.alea(empreinte, numerosHeures, flux) for flux in (1, 2, 3))
+        bruit = np.sqrt(-2.0*np.log(u1)) * np.cos(2*np.pi*u2)
+        valeurs = niveau * (1.0 + 0.4*np.sin(2*np.pi*(heures - 8)/24.0) + 0.2*np.cos(2*np.pi*jours/365.25)) + \
+                    niveau*0.15*bruit
+        valeurs = np.round(np.maximum(valeurs, 0.0), 1)
+        rangs = np.minimum(np.searchsorted(np.cumsum(PROBABILITES_CODES_XR), u3, side='right'), len(CODES_XR) - 1)
+        codes = np.array(CODES_XR, dtype=object)[rangs]
+        codes[index.to_numpy() > self.maintenant.to_datetime64()] = 'N'
+        valeurs[codes == 'N'] = VALEUR_ABSENTE_XR
+        return valeurs, codes
+
+    def alea(self, empreinte, numerosHeures, flux):
+        """
+            Tirages uniformes dans ]0,1[ déterministes pour chaque heure de <numerosHeures> (heures depuis l'epoch),
+            fonction de la graine, de l'<empreinte> de la mesure et du numéro de flux <flux> (mélange splitmix64)
+        """
+        def melange(z):
+            z = (z + np.uint64(0x9E3779B97F4A7C15)).astype(np.uint64)
+            z = ((z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)).astype(np.uint64)
+            z = ((z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)).astype(np.uint64)
+            return z ^ (z >> np.uint64(31))
+
+        with np.errstate(over='ignore'):
+            cle = melange(melange(melange(np.uint64(self.graine)) ^ np.uint64(empreinte)) ^ np.uint64(flux))
+            tirages = melange(np.asarray(numerosHeures, dtype=np.uint64) ^ cle)
+        return ((tirages >> np.uint64(11)).astype(np.float64) + 0.5) / float(2**53)
+
+    def moyennesQuotidiennes(self, dataVal, codesVal):
+        """
+            Calcul des moyennes quotidiennes XR des mesures horaires valides : code 'A' si au moins NB_HEURES_MIN_JOUR
+            heures valides, sinon code 'N' et valeur absente
+        """
+        valides = codesVal.isin(CODES_VALIDES_XR)
+        jours = dataVal.index.normalize()
+        moyennes = dataVal.where(valides).groupby(jours).mean().round(1)
+        completes = valides.groupby(jours).sum() >= NB_HEURES_MIN_JOUR
+        codes = pd.DataFrame(np.where(completes, 'A', 'N'), index=moyennes.index, columns=moyennes.columns).astype(object)
+        return moyennes.where(completes, VALEUR_ABSENTE_XR), codes
+
+    def disconnect(self):
+        """
+            Même interface que pyair.xair.XAIR.disconnect (sans effet)
+        """
+        pass
+
+class FauxParametrage:
+    """
+        Simulation de DidonParametrage pour le banc : <nbMesures> mesures BENCHnnn, fenêtres de <nbAnnees> années,
+        tables DIDON bench_mesures_<frequence> du schéma SCHEMA_MESURE
+        Les paramètres optionnels <optionnels> (nom d'accesseur => valeur) sont exposés comme accesseurs
+    """
+
+    def __init__(self, nbMesures, nbAnnees, didonLogger, optionnels):
+        self.nbMesures = int(nbMesures)
+        self.nbAnnees = int(nbAnnees)
+        self.didonLogger = didonLogger
+        self.optionnels = dict(optionnels)
+        self.remplacementsValeurs = {VALEUR_ABSENTE_XR: np.nan}
+        self.remplacementsCodes = {'A': 1, 'R': 1, 'N': 0, 'I': 0, 'P': 0}
+
+    def __getattr__(self, nomAccesseur):
+        ## Accesseurs des paramètres optionnels (getattr sans valeur => paramètre non défini, cf. getParametreOptionnel)
+        optionnels = self.__dict__.get('optionnels', {})
+        if nomAccesseur in optionnels:
+            return lambda: optionnels[nomAccesseur]
+        raise AttributeError(nomAccesseur)
+
+    def getDidonLogger(self):
+        return self.didonLogger
+
+    def afficheParametrages(self):
+        self.didonLogger.ecrireLog('FauxParametrage', 'afficheParametrages', 'Parametrage du banc : '+str(self.nbMesures)+\
+                                    ' mesures, '+str(self.nbAnnees)+' annees, optionnels='+str(self.optionnels))
+
+    def getLABEL_FREQ_A(self):
+        return 'A'
+
+    def getLABEL_FREQ_M(self):
+        return 'M'
+
+    def getLABEL_FREQ_D(self):
+        return 'D'
+
+    def getLABEL_FREQ_H(self):
+        return 'H'
+
+    def getFrequencesMesure(self):
+        return ['A', 'M', 'D', 'H']
+
+    def getTable(self, frequence):
+        return PREFIXE_TABLE + str(frequence).lower()
+
+    def getArrondi(self, frequence):
+        return 0 if frequence == 'A' else 1
+
+    def getRepresentativite(self, frequence):
+        return 75
+
+    def getFreqResampling(self, frequence):
+        ## Objets DateOffset plutôt qu'alias : même comportement quelle que soit la version de pandas
+        return {'D': pd.offsets.Day(), 'M': pd.offsets.MonthEnd(), 'A': pd.offsets.YearEnd()}.get(frequence)
+
+    def getNomsCourtsMesures(self):
+        return ['BENCH%03d' % numero for numero in range(1, self.nbMesures + 1)]
+
+    def getDictRemplacementValeurs(self):
+        return self.remplacementsValeurs
+
+    def remplacerValeur(self, cle):
+        return self.remplacementsValeurs[cle]
+
+    def getDictRemplacementCodes(self):
+        return self.remplacementsCodes
+
+    def remplacerCode(self, cle):
+        return self.remplacementsCodes[cle]
+
+    def getDerniereAnneeATraiter(self):
+        return datetime.datetime.now().year - 1
+
+    def getNbAnneesATraiter(self):
+        return self.nbAnnees
+
+    def getNbJoursATraiter(self):
+        return 365 * self.nbAnnees
+
+    def getIsDBinsertionActivatedBool(self):
+        return True
+
+    def getXRuser(self):
+        return 'bench'
+
+    def getXRpwd(self):
+        return 'bench'
+
+    def getXRhost(self):
+        return 'bench'
+
+    def getXRbase(self):
+        return 'bench'
+
+    def getDIDONuser(self):
+        return 'bench'
+
+    def getDIDONpwd(self):
+        return 'bench'
+
+    def getDIDONhost(self):
+        return 'bench'
+
+    def getDIDONbase(self):
+        return 'bench'
+
+    def getDIDONschemaMesure(self):
+        return SCHEMA_MESURE
+
+## ######################################
+## base DIDON du banc
+## ######################################
+
+def creeFabriqueEngine(urlDidon, repertoire):
+    """
+        Retourne une fonction sans paramètre créant l'engine de la base DIDON du banc :
+            - <urlDidon> fourni : base PostgreSQL de test
+            - sinon : base SQLite du répertoire <repertoire>, le schéma SCHEMA_MESURE étant une base SQLite attachée
+    """
+    if urlDidon:
+        return lambda: create_engine(urlDidon)
+
+    fichierBase = os.path.join(repertoire, 'didon_bench.sqlite')
+    fichierMesure = os.path.join(repertoire, 'didon_bench_'+SCHEMA_MESURE+'.sqlite')
+
+    def fabrique():
+        engine = create_engine('sqlite:///'+fichierBase, connect_args={'timeout': 60, 'check_same_thread': False})
+
+        @event.listens_for(engine, 'connect')
+        def attacheSchema(connexionSQLite, enregistrement):
+            connexionSQLite.execute('ATTACH DATABASE ? AS '+SCHEMA_MESURE, (fichierMesure,))
+
+        return engine
+    return fabrique
+
+def initialiseTables(fabriqueEngine, parametrage):
+    """
+        (Re)création vide des tables DIDON du banc (une par fréquence), clé primaire (nom_mes_court, date_mesure)
+    """
+    engine = fabriqueEngine()
+    try:
+        if engine.dialect.name == 'postgresql':
+            with engine.begin() as connexion:
+                connexion.execute(text('CREATE SCHEMA IF NOT EXISTS '+SCHEMA_MESURE))
+        metadata = MetaData(schema=SCHEMA_MESURE)
+        for frequence in parametrage.getFrequencesMesure():
+            Table(parametrage.getTable(frequence), metadata,
+                    Column('nom_mes_court', String(64), primary_key=True),
+                    Column('date_mesure', DateTime, primary_key=True),
+                    Column('valeur_mesure', Float),
+                    Column('code_validation', Integer))
+        metadata.drop_all(engine)
+        metadata.create_all(engine)
+    finally:
+        engine.dispose()
+
+def compteLignes(fabriqueEngine, parametrage, frequences):
+    """
+        Retourne le nombre de lignes des tables DIDON du banc des fréquences <frequences>
+    """
+    engine = fabriqueEngine()
+    try:
+        with engine.connect() as connexion:
+            return sum(connexion.execute(text('SELECT COUNT(*) FROM '+SCHEMA_MESURE+'.'+parametrage.getTable(frequence))).scalar()
+                        for frequence in frequences)
+    finally:
+        engine.dispose()
+
+## ######################################
+## exécution des scénarios
+## ######################################
+
+def executeScenario(frequence, options, didonLogger, repertoire, mesureMemoire):
+    """
+        Exécution des <options['passages']> passages du scénario <frequence> sur des tables vides au départ
+        Si <mesureMemoire>, chaque passage est exécuté sous tracemalloc et seule la mémoire maximale est significative
+        Retourne la liste des résultats (dictionnaires) des passages
+    """
+    parametrage = FauxParametrage(options['nbMesures'], options['nbAnnees'], didonLogger, options['optionnels'])
+    fabriqueEngine = creeFabriqueEngine(options['didon'], repertoire)
+    initialiseTables(fabriqueEngine, parametrage)
+
+    resultats = []
+    for passage in range(1, options['passages'] + 1):
+        fauxXR = FauxXAIR(latence=options['latenceXR'])
+        if mesureMemoire:
+            tracemalloc.start()
+        debut = time.perf_counter()
+        dgm = DidonGetMesures('BENCH', frequence, parametrage=parametrage, fabriqueXR=lambda: fauxXR, engineDidon=fabriqueEngine())
+        dgm.traiteMesures()
+        duree = time.perf_counter() - debut
+        pointeMemoire = None
+        if mesureMemoire:
+            pointeMemoire = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        parEtape = dgm.getMetriques().getParEtape()
+        lignesLues = fauxXR.nbValeurs
+        resultats.append({'frequence': frequence,
+                        'passage': passage,
+                        'nbMesures': options['nbMesures'],
+                        'nbAnnees': options['nbAnnees'],
+                        'niveauLog': options['niveauLog'],
+                        'duree': duree,
+                        'appelsXR': fauxXR.nbAppels,
+                        'lignesLues': lignesLues,
+                        'lignesEcrites': parEtape.get(ETAPE_INSERTION, [0.0, 0, 0, 0])[1],
+                        'lignesEnBase': compteLignes(fabriqueEngine, parametrage, dgm.getFrequencesMesure()),
+                        'lignesParSeconde': lignesLues / duree if duree > 0 else 0.0,
+                        'mesuresParSeconde': options['nbMesures'] / duree if duree > 0 else 0.0,
+                        'pointeMemoireMo': None if pointeMemoire is None else pointeMemoire / 1024.0 / 1024.0,
+                        'etapes': {etape: {'duree': cumul[0], 'lignes': cumul[1], 'octets': cumul[2], 'passages': cumul[3],
+                                            'latenceMoyenneMs': cumul[0] / cumul[3] * 1000.0 if cumul[3] > 0 else 0.0}
+                                    for etape, cumul in parEtape.items()}})
+    return resultats
+
+def afficheResultats(resultats, reference):
+    """
+        Affichage des résultats des passages et, si <reference> est fourni, des écarts par rapport aux résultats de
+        référence de même scénario et même passage
+    """
+    referenceParCle = {(resultat['frequence'], resultat['passage']): resultat for resultat in (reference or [])}
+    for resultat in resultats:
+        memoire = 'n/a' if resultat['pointeMemoireMo'] is None else '{0:.1f} Mo'.format(resultat['pointeMemoireMo'])
+        print('\nScenario {0} passage {1} : {2} mesures x {3} an(s), {4} appels XR, traces {5}'.format(resultat['frequence'],\
+                                                                            resultat['passage'], resultat['nbMesures'], resultat['nbAnnees'],\
+                                                                            resultat['appelsXR'], resultat.get('niveauLog', 'INFO')))
+        print('  duree = {0:.3f} s   {1:.0f} valeurs XR/s   {2:.2f} mesures/s   ecrites = {3}   en base = {4}   memoire max = {5}'.\
+                format(resultat['duree'], resultat['lignesParSeconde'], resultat['mesuresParSeconde'],\
+                        resultat['lignesEcrites'], resultat['lignesEnBase'], memoire))
+        print('  {0:<28} {1:>10} {2:>10} {3:>12} {4:>14}'.format('Etape', 'Duree (s)', 'Passages', 'Lignes', 'Latence (ms)'))
+        for etape, cumul in sorted(resultat['etapes'].items(), key=lambda item: -item[1]['duree']):
+            print('  {0:<28} {1:>10.3f} {2:>10} {3:>12} {4:>14.2f}'.format(etape, cumul['duree'], cumul['passages'],\
+                                                                            cumul['lignes'], cumul['latenceMoyenneMs']))
+
+        resultatReference = referenceParCle.get((resultat['frequence'], resultat['passage']))
+        if resultatReference is not None:
+            ecarts = ['duree x{0:.2f}'.format(resultat['duree'] / resultatReference['duree'])] if resultatReference['duree'] > 0 else []
+            if resultatReference['lignesParSeconde'] > 0:
+                ecarts.append('debit x{0:.2f}'.format(resultat['lignesParSeconde'] / resultatReference['lignesParSeconde']))
+            if resultat['pointeMemoireMo'] and resultatReference.get('pointeMemoireMo'):
+                ecarts.append('memoire x{0:.2f}'.format(resultat['pointeMemoireMo'] / resultatReference['pointeMemoireMo']))
+            print('  Par rapport a la reference : '+', '.join(ecarts))
+
+def convertitOption(valeur):
+    """
+        Conversion de la valeur texte d'une option : booléen (True/False), entier, réel ou texte
+    """
+    if valeur in ('True', 'False'):
+        return valeur == 'True'
+    for conversion in (int, float):
+        try:
+            return conversion(valeur)
+        except ValueError:
+            pass
+    return valeur
+
+def lisOptions(arguments):
+    """
+        Lecture des options <cle>=<valeur> de la ligne de commande
+        Retourne le dictionnaire des options du banc (paramètres optionnels DidonParametrage dans 'optionnels'),
+        None si un argument est invalide
+    """
+    options = {'nbMesures': NB_MESURES, 'nbAnnees': NB_ANNEES, 'frequences': FREQUENCES, 'passages': NB_PASSAGES,
+                'memoire': 1, 'latenceXR': 0.0, 'niveauLog': 'INFO', 'didon': None, 'reference': None,
+                'sortie': os.path.join(os.path.dirname(os.path.abspath(__file__)), 'DidonBenchMesures_resultats.json'),
+                'optionnels': {}}
+    for argument in arguments:
+        cle, separateur, valeur = argument.partition('=')
+        if not separateur:
+            return None
+        if cle.startswith('get'):
+            options['optionnels'][cle] = convertitOption(valeur)
+        elif cle in ('didon', 'reference', 'sortie', 'frequences'):
+            options[cle] = valeur
+        elif cle == 'niveauLog':
+            if valeur.upper() not in ('INFO', 'DEBUG'):
+                return None
+            options[cle] = valeur.upper()
+        elif cle in options:
+            options[cle] = convertitOption(valeur)
+        else:
+            return None
+    return options
+
+def controleModesSQLite(options):
+    """
+        Contrôle que les modes paramétrés sont utilisables sur la base SQLite locale (pas de <didon>)
+        Retourne la liste des paramètres nécessitant une base PostgreSQL
+    """
+    if options['didon']:
+        return []
+    nonSupportes = []
+    if str(options['optionnels'].get('getModeInsertion', 'TO_SQL')).upper() != 'TO_SQL':
+        nonSupportes.append('getModeInsertion')
+    if str(options['optionnels'].get('getModeRemplacement', 'UNITAIRE')).upper() != 'UNITAIRE':
+        nonSupportes.append('getModeRemplacement')
+    if str(options['optionnels'].get('getSourceAgregatsMA', 'XR')).upper() != 'XR':
+        nonSupportes.append('getSourceAgregatsMA')
+    return nonSupportes
+
+## ######################################
+## fonction principale
+## ######################################
+
+'''
+    Usage explanation
+'''
+def Usage():
+    print ("Argument invalide.")
+    print ("Usage:")
+    print (argv[0] + ' [nbMesures=<n>] [nbAnnees=<n>] [frequences=H,D,M,A,HDMA] [passages=<n>] [memoire=0|1] [latenceXR=<s>]'+\
+            ' [niveauLog=INFO|DEBUG]'+\
+            ' [didon=<url PostgreSQL>] [sortie=<json>] [reference=<json>] [get<Parametre>=<valeur> ...]')
+    exit()
+
+'''
+    main
+'''
+
+if __name__ == "__main__":
+
+    options = lisOptions(argv[1:])
+    if options is None:
+        Usage()
+    nonSupportes = controleModesSQLite(options)
+    if nonSupportes:
+        print('Parametres necessitant une base PostgreSQL (didon=<url>) : '+', '.join(nonSupportes))
+        Usage()
+
+    repertoire = tempfile.mkdtemp(prefix='didon_bench_')
+    try:
+        ## Fichiers produits par le traitement (métriques, états, caches) dans le répertoire temporaire du banc
+        for nomAccesseur, nomFichier in (('getFichierMetriques', 'metriques.json'),
+                                        ('getFichierEtatIncremental', 'etat_incremental.json'),
+                                        ('getFichierSchemaDidon', 'schema_didon.pickle'),
+                                        ('getFichierJournalRattrapage', 'journal_rattrapage.json'),
+                                        ('getRepertoireCacheXR', 'cache_xr')):
+            options['optionnels'].setdefault(nomAccesseur, os.path.join(repertoire, nomFichier))
+        options['optionnels'].setdefault('getCacheSchemaActif', False)
+        didonLogger = DidonLogger('DidonBenchMesures', repertoire+os.sep, niveau=options['niveauLog'])
+
+        resultats = []
+        for frequence in [frequence.strip() for frequence in options['frequences'].split(',') if frequence.strip()]:
+            resultatsScenario = executeScenario(frequence, options, didonLogger, repertoire, False)
+            if options['memoire']:
+                for resultat, resultatMemoire in zip(resultatsScenario, executeScenario(frequence, options, didonLogger, repertoire, True)):
+                    resultat['pointeMemoireMo'] = resultatMemoire['pointeMemoireMo']
+            resultats.extend(resultatsScenario)
+
+        reference = None
+        if options['reference']:
+            with open(options['reference'], 'r', encoding='utf-8') as fichier:
+                reference = json.load(fichier)
+        afficheResultats(resultats, reference)
+
+        with open(options['sortie'], 'w', encoding='utf-8') as fichier:
+            json.dump(resultats, fichier, indent=1)
+        print('\nResultats ecrits dans '+str(options['sortie']))
+    finally:
+        shutil.rmtree(repertoire, ignore_errors=True)
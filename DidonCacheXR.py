@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+#Nom : DidonCacheXR.py
+#Description : Classe de gestion d'un cache local des extractions XR
+#Copyright : 2026, Air Breizh
+#Auteur :  Manuel
+#Version: 1.0
+
+"""
+    Classe définissant le cache local des extractions XR (pyair.xair.XAIR.get_mesures) :
+    Les données sont stockées au format Parquet par mesure (nom court), fréquence, type (brut ou non) et mois :
+        <repertoire>/<frequence>/<nomCourt>/<AAAA-MM>[_brut].parquet
+    Seuls les mois entièrement compris dans la fenêtre demandée et terminés depuis plus de <nbJoursImmuable> jours
+    sont lus et écrits dans le cache (partitions immuables), le reste de la fenêtre est toujours récupéré depuis XR.
+    Une mesure sans donnée XR sur un mois immuable est stockée comme une partition vide (cache négatif) : elle n'est
+    pas redemandée à XR aux exécutions suivantes.
+    La taille du cache est bornée : les partitions les moins récemment utilisées sont supprimées au-delà de <tailleMaxOctets>.
+    Le cache nécessite pyarrow, il est désactivé (lecture directe XR) si pyarrow n'est pas disponible.
+"""
+
+import datetime
+import os
+import threading
+import pandas as pd
+from DidonDates import convertitDate
+
+class DidonCacheXR:
+
+## ######################################
+## Declaration de variable globales
+## ######################################
+
+    global nomClasse
+    nomClasse='DidonCacheXR'
+
+## ######################################
+## constructeur
+## ######################################
+
+    def __init__(self, repertoire, nbJoursImmuable, tailleMaxOctets, didonLogger):
+        """
+            Initialisation du cache :
+                - <repertoire> : répertoire de stockage des partitions
+                - <nbJoursImmuable> : age (en jours depuis la fin du mois) à partir duquel une partition est immuable
+                - <tailleMaxOctets> : taille maximale du cache avant éviction
+                - <didonLogger> : logger DidonLogger utilisé pour les traces
+        """
+        nomFonction='__init__'
+
+        self.repertoire = repertoire
+        self.nbJoursImmuable = nbJoursImmuable
+        self.tailleMaxOctets = tailleMaxOctets
+        self.didonLogger = didonLogger
+        self.verrou = threading.Lock()
+        self.nbHits = 0
+        self.nbMiss = 0
+
+        try:
+            import pyarrow
+            os.makedirs(self.repertoire, exist_ok=True)
+            self.actif = True
+            self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Cache XR actif dans '+str(self.repertoire))
+        except Exception as error:
+            self.actif = False
+            self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Cache XR desactive : %s'%error,'ERROR')
+
+## ######################################
+## accesseurs
+## ######################################
+
+    def isActif(self):
+        """
+            Permet de savoir si le cache est utilisable
+        """
+        return self.actif
+
+    def getNbHits(self):
+        """
+            Permet de récupérer le nombre de partitions (mesure x mois) lues dans le cache
+        """
+        return self.nbHits
+
+    def getNbMiss(self):
+        """
+            Permet de récupérer le nombre de partitions (mesure x mois) absentes du cache et récupérées depuis XR
+        """
+        return self.nbMiss
+
+    def reinitialiseCompteurs(self):
+        """
+            Remise à zéro des compteurs de partitions lues en cache (hit) et récupérées depuis XR (miss)
+        """
+        with self.verrou:
+            self.nbHits = 0
+            self.nbMiss = 0
+
+## ######################################
+## fonctions de traitement
+## ######################################
+
+    def get_mesures(self, connXR, mes, debut, fin, freq, brut=False):
+        """
+            Lecture au travers du cache de pyair.xair.XAIR.get_mesures (mêmes paramètres et même retour) :
+                - mois immuables de la fenêtre : lus dans le cache, ou récupérés depuis XR (un appel par mois pour
+                  les mesures absentes du cache) puis stockés
+                - début et fin de fenêtre non immuables : récupérés directement depuis XR
+        """
+        if not self.isActif():
+            return connXR.get_mesures(mes=mes, debut=debut, fin=fin, freq=freq, brut=brut)
+
+        nomsCourts = [mes] if isinstance(mes, str) else list(mes)
+        moisCachables = self.getMoisCachables(debut, fin)
+        if len(moisCachables) == 0:
+            return connXR.get_mesures(mes=mes, debut=debut, fin=fin, freq=freq, brut=brut)
+
+        morceaux = []
+        ## Début de fenêtre avant le premier mois immuable
+        debutMois = moisCachables[0]
+        if convertitDate(debut) < debutMois:
+            finTete = debutMois - pd.Timedelta(days=1)
+            morceaux.append(self.normalise(connXR.get_mesures(mes=nomsCourts, debut=debut, fin=finTete.strftime('%d/%m/%Y'),\
+                                                            freq=freq, brut=brut), brut))
+
+        ## Mois immuables
+        for debutMois in moisCachables:
+            morceaux.append(self.getMois(connXR, nomsCourts, debutMois, freq, brut))
+
+        ## Fin de fenêtre après le dernier mois immuable
+        finMois = moisCachables[-1] + pd.offsets.MonthEnd(1)
+        debutQueue = finMois + pd.Timedelta(days=1)
+        if debutQueue <= convertitDate(fin):
+            morceaux.append(self.normalise(connXR.get_mesures(mes=nomsCourts, debut=debutQueue.strftime('%d/%m/%Y'), fin=fin,\
+                                                            freq=freq, brut=brut), brut))
+
+        data = self.assemble([morceau[0] for morceau in morceaux], nomsCourts)
+        if not brut:
+            return data
+        return data, self.assemble([morceau[1] for morceau in morceaux], nomsCourts)
+
+    def getMoisCachables(self, debut, fin):
+        """
+            Retourne la liste (Timestamp du premier jour) des mois entièrement compris entre <debut> et <fin>
+            et terminés depuis plus de nbJoursImmuable jours
+        """
+        debutFenetre = convertitDate(debut)
+        finFenetre = convertitDate(fin).normalize()
+        limiteImmuable = pd.Timestamp(datetime.datetime.now()) - pd.Timedelta(days=self.nbJoursImmuable)
+
+        moisCachables = []
+        debutMois = debutFenetre.ceil('D') + pd.offsets.MonthBegin(0)
+        while debutMois + pd.offsets.MonthEnd(1) <= finFenetre:
+            finMois = debutMois + pd.offsets.MonthEnd(1)
+            if finMois + pd.Timedelta(days=1) <= limiteImmuable:
+                moisCachables.append(debutMois)
+            debutMois = debutMois + pd.offsets.MonthBegin(1)
+        return moisCachables
+
+    def getMois(self, connXR, nomsCourts, debutMois, freq, brut):
+        """
+            Lecture d'un mois immuable pour <nomsCourts> : partitions du cache et un appel XR pour les mesures manquantes
+            Retourne le couple (mesures, codes) du mois, codes à None si <brut> est faux
+        """
+        nomFonction='getMois'
+
+        valeurs, etats, manquantes = {}, {}, []
+        for nomCourt in nomsCourts:
+            fichier = self.getFichier(nomCourt, freq, debutMois, brut)
+            partition = None
+            if os.path.exists(fichier):
+                try:
+                    partition = pd.read_parquet(fichier)
+                    os.utime(fichier)
+                except Exception as error:
+                    self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Partition illisible '+str(fichier)+' : %s'%error,'ERROR')
+            if partition is None:
+                manquantes.append(nomCourt)
+            else:
+                valeurs[nomCourt] = partition['valeur']
+                if brut:
+                    etats[nomCourt] = partition['etat']
+
+        if len(manquantes) > 0:
+            finMois = debutMois + pd.offsets.MonthEnd(1)
+            data, codes = self.normalise(connXR.get_mesures(mes=manquantes, debut=debutMois.strftime('%d/%m/%Y'),\
+                                                            fin=finMois.strftime('%d/%m/%Y'), freq=freq, brut=brut), brut)
+            for nomCourt in manquantes:
+                if nomCourt in data.columns:
+                    valeur = data[nomCourt]
+                    etat = codes[nomCourt] if brut else None
+                else:
+                    ## Mesure absente du retour XR : partition vide stockée (cache négatif, mois immuable)
+                    valeur = pd.Series(dtype='float64', index=pd.DatetimeIndex([]))
+                    etat = pd.Series(dtype='object', index=pd.DatetimeIndex([])) if brut else None
+                partition = pd.DataFrame({'valeur': valeur})
+                valeurs[nomCourt] = valeur
+                if brut:
+                    partition['etat'] = etat
+                    etats[nomCourt] = etat
+                self.stocke(partition, self.getFichier(nomCourt, freq, debutMois, brut))
+
+        with self.verrou:
+            self.nbHits += len(nomsCourts) - len(manquantes)
+            self.nbMiss += len(manquantes)
+
+        return pd.DataFrame(valeurs), (pd.DataFrame(etats) if brut else None)
+
+    def getFichier(self, nomCourt, freq, debutMois, brut):
+        """
+            Retourne le chemin de la partition de <nomCourt> pour la fréquence <freq> et le mois <debutMois>
+        """
+        nomFichier = debutMois.strftime('%Y-%m') + ('_brut' if brut else '') + '.parquet'
+        return os.path.join(self.repertoire, str(freq), str(nomCourt).replace(os.sep, '_'), nomFichier)
+
+    def stocke(self, partition, fichier):
+        """
+            Ecriture d'une partition dans le cache (via un fichier temporaire), une erreur d'écriture est tracée sans être bloquante
+        """
+        nomFonction='stocke'
+
+        try:
+            os.makedirs(os.path.dirname(fichier), exist_ok=True)
+            fichierTemporaire = fichier + '.' + str(threading.get_ident()) + '.tmp'
+            partition.to_parquet(fichierTemporaire)
+            os.replace(fichierTemporaire, fichier)
+        except Exception as error:
+            self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Ecriture impossible de '+str(fichier)+' : %s'%error,'ERROR')
+
+    def normalise(self, resultat, brut):
+        """
+            Retourne le résultat de get_mesures sous la forme d'un couple (mesures, codes), codes à None si <brut> est faux
+        """
+        if brut:
+            return resultat
+        return resultat, None
+
+    def assemble(self, morceaux, nomsCourts):
+        """
+            Concaténation chronologique des morceaux de fenêtre, avec une colonne par mesure de <nomsCourts>
+        """
+        morceaux = [morceau for morceau in morceaux if morceau is not None and len(morceau) > 0]
+        if len(morceaux) == 0:
+            return pd.DataFrame(columns=nomsCourts)
+        resultat = pd.concat(morceaux, sort=False)
+        resultat = resultat[~resultat.index.duplicated(keep='first')].sort_index()
+        return resultat.reindex(columns=nomsCourts)
+
+    def evince(self):
+        """
+            Suppression des partitions les moins récemment utilisées tant que la taille du cache dépasse tailleMaxOctets
+        """
+        nomFonction='evince'
+
+        if not self.isActif():
+            return
+
+        with self.verrou:
+            fichiers = []
+            for racine, repertoires, noms in os.walk(self.repertoire):
+                for nom in noms:
+                    if nom.endswith('.parquet'):
+                        chemin = os.path.join(racine, nom)
+                        fichiers.append((os.path.getmtime(chemin), os.path.getsize(chemin), chemin))
+            taille = sum(fichier[1] for fichier in fichiers)
+            nbSupprimes = 0
+            for dateUtilisation, tailleFichier, chemin in sorted(fichiers):
+                if taille <= self.tailleMaxOctets:
+                    break
+                os.remove(chemin)
+                taille -= tailleFichier
+                nbSupprimes += 1
+
+        self.didonLogger.ecrireLog( nomClasse, nomFonction,\
+                                    'Taille du cache XR : '+str(taille)+' octets ('+str(nbSupprimes)+' partitions supprimees)')
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+#Nom : DidonConnexions.py
+#Description : Classes de reprise sur erreur et de reconnexion des connexions XR et DIDON
+#Copyright : 2026, Air Breizh
+#Auteur :  Manuel
+#Version: 1.0
+
+"""
+    Classes de la couche de connexion des traitements DIDON :
+        - DidonReprise : exécution d'une opération avec nouvelles tentatives en cas d'erreur, espacées d'un délai
+          exponentiel (delaiInitial, 2 x delaiInitial, 4 x delaiInitial ... borné à delaiMax), avec une fonction
+          de reconnexion optionnelle appelée avant chaque nouvelle tentative
+        - DidonConnexionXR : connexion XR (pyair.xair.XAIR) qui se reconnecte automatiquement lorsqu'un appel
+          get_mesures échoue, selon la politique de reprise DidonReprise
+    Les connexions DIDON sont gérées par le pool SQLAlchemy (contrôle de la connexion avant utilisation et recyclage,
+    voir DidonGetMesures.connectDidon) et les écritures sont rejouées via DidonReprise.
+"""
+
+import threading
+import time
+
+class DidonReprise:
+
+## ######################################
+## Declaration de variable globales
+## ######################################
+
+    global nomClasse
+    nomClasse='DidonReprise'
+
+## ######################################
+## constructeur
+## ######################################
+
+    def __init__(self, nbTentatives, delaiInitial, delaiMax, didonLogger):
+        """
+            Initialisation de la politique de reprise :
+                - <nbTentatives> : nombre maximal de tentatives d'une opération (1 = pas de nouvelle tentative)
+                - <delaiInitial> : délai (secondes) avant la deuxième tentative, doublé à chaque nouvelle tentative
+                - <delaiMax> : délai maximal (secondes) entre deux tentatives
+                - <didonLogger> : logger DidonLogger utilisé pour les traces
+        """
+        self.nbTentatives = max(1, int(nbTentatives))
+        self.delaiInitial = float(delaiInitial)
+        self.delaiMax = float(delaiMax)
+        self.didonLogger = didonLogger
+
+## ######################################
+## fonctions de traitement
+## ######################################
+
+    def getDelai(self, tentative):
+        """
+            Retourne le délai (secondes) d'attente après l'échec de la tentative numéro <tentative> (0 pour la première)
+        """
+        return min(self.delaiMax, self.delaiInitial * (2 ** tentative))
+
+    def execute(self, libelle, operation, reconnexion=None):
+        """
+            Exécution de <operation> (fonction sans paramètre) avec au plus nbTentatives tentatives :
+            en cas d'erreur, attente de getDelai(tentative) secondes, appel de <reconnexion> (fonction sans paramètre,
+            optionnelle) puis nouvelle tentative
+            Retourne le résultat de <operation>, l'erreur de la dernière tentative est propagée
+            <libelle> : libellé de l'opération dans les traces
+        """
+        nomFonction='execute'
+
+        for tentative in range(self.nbTentatives):
+            try:
+                return operation()
+            except Exception as error:
+                if tentative == self.nbTentatives - 1:
+                    raise
+                delai = self.getDelai(tentative)
+                self.didonLogger.ecrireLog( nomClasse, nomFonction,\
+                                            str(libelle)+' : tentative '+str(tentative+1)+'/'+str(self.nbTentatives)+\
+                                            ' en erreur (%s), nouvelle tentative dans '%error+str(delai)+' s','ERROR')
+                time.sleep(delai)
+                if reconnexion is not None:
+                    try:
+                        reconnexion()
+                    except Exception as errorReconnexion:
+                        self.didonLogger.ecrireLog( nomClasse, nomFonction,\
+                                                    str(libelle)+' : reconnexion en erreur : %s'%errorReconnexion,'ERROR')
+
+class DidonConnexionXR:
+
+## ######################################
+## constructeur
+## ######################################
+
+    def __init__(self, fabrique, reprise, didonLogger):
+        """
+            Initialisation d'une connexion XR avec reconnexion automatique :
+                - <fabrique> : fonction sans paramètre retournant une nouvelle connexion pyair.xair.XAIR
+                - <reprise> : politique de reprise DidonReprise (connexion initiale et appels get_mesures)
+                - <didonLogger> : logger DidonLogger utilisé pour les traces
+            La connexion initiale est établie selon la politique de reprise, l'erreur de la dernière tentative est propagée
+        """
+        self.fabrique = fabrique
+        self.reprise = reprise
+        self.didonLogger = didonLogger
+        self.verrou = threading.Lock()
+        self.nbReconnexions = 0
+        self.connexion = self.reprise.execute('Connexion XR', self.fabrique)
+
+## ######################################
+## fonctions de traitement
+## ######################################
+
+    def get_mesures(self, **parametres):
+        """
+            Appel de pyair.xair.XAIR.get_mesures (mêmes paramètres et même retour) avec reconnexion et nouvelle tentative
+            en cas d'erreur
+        """
+        return self.reprise.execute('Recuperation XR '+str(parametres.get('mes')),\
+                                    lambda: self.connexion.get_mesures(**parametres), self.reconnecte)
+
+    def reconnecte(self):
+        """
+            Fermeture (sans contrôle d'erreur) de la connexion XR courante et ouverture d'une nouvelle connexion
+        """
+        nomFonction='reconnecte'
+
+        with self.verrou:
+            try:
+                self.connexion.disconnect()
+            except Exception:
+                pass
+            self.connexion = self.fabrique()
+            self.nbReconnexions += 1
+        self.didonLogger.ecrireLog( 'DidonConnexionXR', nomFonction, 'Connexion XR retablie ('+str(self.nbReconnexions)+' reconnexions)')
+
+    def getNbReconnexions(self):
+        """
+            Permet de récupérer le nombre de reconnexions XR réalisées
+        """
+        return self.nbReconnexions
+
+    def disconnect(self):
+        """
+            Déconnexion XR (pyair.xair.XAIR.disconnect)
+        """
+        self.connexion.disconnect()
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+#Nom : DidonDates.py
+#Description : Fonctions utilitaires de conversion des dates des traitements DIDON
+#Copyright : 2026, Air Breizh
+#Auteur :  Manuel
+#Version: 1.0
+
+"""
+    Fonctions utilitaires de conversion des dates partagées par DidonGetMesures, DidonCacheXR et DidonBenchMesures
+"""
+
+import pandas as pd
+
+def convertitDate(date):
+    """
+        Conversion d'une borne de fenêtre en Timestamp : date au format jj/mm/aaaa ou date ISO (str(datetime))
+        Lève ValueError si <date> n'est pas une date valide
+    """
+    return pd.to_datetime(date, dayfirst='/' in str(date))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+#Nom : DidonEtatIncremental.py
+#Description : Classe de gestion de l'etat du traitement incremental des mesures
+#Copyright : 2026, Air Breizh
+#Auteur :  Manuel
+#Version: 1.0
+
+"""
+    Classe définissant l'état du traitement incrémental DIDON :
+    Pour chaque fréquence et chaque mesure (nom court), conserve la date de la dernière mesure chargée en base DIDON.
+    L'état est stocké dans un fichier local au format JSON :
+        { "<frequence>" : { "<nomCourt>" : "<date iso>", ... }, ... }
+"""
+
+import datetime
+import json
+import os
+import threading
+
+class DidonEtatIncremental:
+
+## ######################################
+## Declaration de variable globales
+## ######################################
+
+    global nomClasse
+    nomClasse='DidonEtatIncremental'
+
+## ######################################
+## constructeur
+## ######################################
+
+    def __init__(self, fichierEtat, didonLogger):
+        """
+            Initialisation de l'état incrémental à partir du fichier <fichierEtat> s'il existe
+            <didonLogger> : logger DidonLogger utilisé pour les traces
+            Le verrou <verrou> protège le dictionnaire des dernières dates : mis à jour mesure par mesure par les workers
+            (majDerniereDate), lu au calcul du début incrémental de chaque lot, et tenu pendant l'écriture du fichier
+            (sauvegarde) pour ne pas sérialiser un état en cours de modification
+        """
+        nomFonction='__init__'
+
+        self.fichierEtat = fichierEtat
+        self.didonLogger = didonLogger
+        self.verrou = threading.Lock()
+        self.etat = {}
+
+        if os.path.exists(self.fichierEtat):
+            try:
+                with open(self.fichierEtat, 'r', encoding='utf-8') as fichier:
+                    self.etat = json.load(fichier)
+                self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Etat incremental charge depuis '+str(self.fichierEtat))
+            except Exception as error:
+                ## Un état illisible implique un retraitement complet de la fenêtre
+                self.didonLogger.ecrireLog( nomClasse, nomFonction,\
+                                            'Etat incremental illisible ('+str(self.fichierEtat)+') : %s'%error,'ERROR')
+                self.etat = {}
+        else:
+            self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Pas d\'etat incremental existant : '+str(self.fichierEtat))
+
+## ######################################
+## fonctions de traitement
+## ######################################
+
+    def getDerniereDate(self, frequence, nomCourt):
+        """
+            Permet de récupérer la date (datetime) de la dernière mesure chargée pour <frequence> et <nomCourt>
+            Retourne None si la mesure n'a jamais été chargée
+        """
+        with self.verrou:
+            derniereDate = self.etat.get(str(frequence), {}).get(str(nomCourt))
+        if derniereDate is None:
+            return None
+        return datetime.datetime.fromisoformat(derniereDate)
+
+    def majDerniereDate(self, frequence, nomCourt, derniereDate):
+        """
+            Mise à jour de la date de la dernière mesure chargée pour <frequence> et <nomCourt>
+            La date n'est jamais reculée
+        """
+        with self.verrou:
+            dates = self.etat.setdefault(str(frequence), {})
+            actuelle = dates.get(str(nomCourt))
+            if actuelle is None or datetime.datetime.fromisoformat(actuelle) < derniereDate:
+                dates[str(nomCourt)] = derniereDate.isoformat()
+
+    def sauvegarde(self):
+        """
+            Ecriture de l'état dans le fichier <fichierEtat> (via un fichier temporaire pour ne jamais laisser un état partiel)
+        """
+        nomFonction='sauvegarde'
+
+        with self.verrou:
+            fichierTemporaire = self.fichierEtat + '.tmp'
+            with open(fichierTemporaire, 'w', encoding='utf-8') as fichier:
+                json.dump(self.etat, fichier, indent=1, sort_keys=True)
+            os.replace(fichierTemporaire, self.fichierEtat)
+        self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Etat incremental sauvegarde dans '+str(self.fichierEtat))
@@ -12,24 +12,48 @@
     python DidonGetMesures <frequence> <environnement>
     <frequence> :
         Obligatoire de valeur A (annuel) ou M (mensuel) ou D (quotidien) ou H (horaire)
+        ou combinaison de ces valeurs (ex : HDMA) pour un traitement multi-fréquences en une seule passe :
+        les mesures horaires sont récupérées une seule fois par mesure et les fréquences D, M et A en sont dérivées
         Ce paramètre permet de gérer le type de report de mesures souhaité
     <environnement> :
         Facultatif de valeur 'LOCAL' ou 'PROD' (valeur par défaut)
         Ce paramètre permet de gérer le type d'execution (prod ou locale) et donc le parametrage qui en découle
+    python DidonGetMesures <frequence> <environnement> <debut> <fin>
+    <debut> <fin> :
+        Facultatifs, dates au format jj/mm/aaaa : rattrapage (retraitement) de la fenêtre explicite [debut, fin]
+        découpée en partitions de temps x mesures, avec reprise d'un rattrapage interrompu (traiteRattrapage)
+    python DidonGetMesures <frequence> <environnement> <debut> <fin> ECHANGE
+        Rechargement complet (mono-fréquence H ou D, partitionnement actif) des partitions de la table couvrant [debut, fin]
+        par échange de partition (traiteRechargementPartitions)
+    Utilisation comme bibliothèque (ex : processus permanent conservant ses connexions et caches entre deux exécutions) :
+        paramétrage, connexion XR, engine DIDON et sorties injectables au constructeur, puis executeTraitement(nomsCourts, 
+        frequences, debut, fin) autant de fois que nécessaire (résultats structurés, sans déconnexion) et disconnect()
 """
 
-import pyair
-from pyair import stats
-from pyair import reg
+## pyair (connexion XR et statistiques) est importé à la première utilisation (creerConnexionXR, finaliseAgregatsMA, 
+## transformeMesuresXR), DidonParametrage si le paramétrage n'est pas injecté (initialiseParametrage) et le pilote 
+## psycopg2 par create_engine : le démarrage ne paie que les imports nécessaires
 import pandas as pd
 import numpy as np
-import os, sys, json, datetime, time, calendar
+import os, sys, json, datetime, time, calendar, pickle
+import threading
+import concurrent.futures
 from sys import argv
-from sqlalchemy import *
-from sqlalchemy.orm import *
+from sqlalchemy import create_engine, MetaData, Table, text, and_
+from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-import psycopg2
-from DidonParametrage import DidonParametrage
+from DidonDates import convertitDate
+from DidonEtatIncremental import DidonEtatIncremental
+from DidonCacheXR import DidonCacheXR
+from DidonConnexions import DidonReprise, DidonConnexionXR
+from DidonJournalRattrapage import DidonJournalRattrapage
+from DidonPipeline import DidonPipeline
+from DidonPartitions import DidonPartitions, LABEL_PARTITION_MOIS, LABEL_PARTITION_ANNEE
+from DidonSorties import DidonSortiePostgreSQL, DidonSortieFichiers, LABEL_SORTIE_POSTGRESQL, LABEL_SORTIE_PARQUET, LABEL_SORTIE_CSV, \
+                        COLONNES_MESURE, copieMesures
+from DidonStatistiques import DidonStatistiques, LABEL_SEUIL_HORAIRE, LABEL_SEUIL_JOURNALIER, LABEL_TOUTES_MESURES
+from DidonMetriques import DidonMetriques, ETAPE_EXTRACTION_XR, ETAPE_EXTRACTION_DIDON, ETAPE_REMPLACEMENT, \
+                            ETAPE_REECHANTILLONNAGE, ETAPE_CONTROLE_EXISTANT, ETAPE_SUPPRESSION, ETAPE_INSERTION, ETAPE_SORTIES
 
 class DidonGetMesures:
 
@@ -45,21 +69,116 @@ class DidonGetMesures:
     global nomClasse
     nomClasse='DidonGetMesures'
 
+    ## Modes d'insertion en base DIDON (DataFrame.to_sql par défaut ou COPY PostgreSQL)
+    global LABEL_INSERTION_TO_SQL
+    LABEL_INSERTION_TO_SQL = 'TO_SQL'
+    global LABEL_INSERTION_COPY
+    LABEL_INSERTION_COPY = 'COPY'
+
+    ## Modes de remplacement des mesures existantes en base DIDON :
+    ##  - UNITAIRE (par défaut) : contrôle d'existence, comptage, suppression par dates puis insertion
+    ##  - UPSERT : table de transit et INSERT ... ON CONFLICT en une transaction
+    ##  - PLAGE : suppression bornée par date_mesure puis insertion en une transaction
+    ##  - DIFF : lecture des mesures existantes de la plage, puis écriture des seules lignes insérées, modifiées 
+    ##    ou supprimées en une transaction
+    global LABEL_REMPLACEMENT_UNITAIRE
+    LABEL_REMPLACEMENT_UNITAIRE = 'UNITAIRE'
+    global LABEL_REMPLACEMENT_UPSERT
+    LABEL_REMPLACEMENT_UPSERT = 'UPSERT'
+    global LABEL_REMPLACEMENT_PLAGE
+    LABEL_REMPLACEMENT_PLAGE = 'PLAGE'
+    global LABEL_REMPLACEMENT_DIFF
+    LABEL_REMPLACEMENT_DIFF = 'DIFF'
+
+    ## Sources des données horaires utilisées pour le calcul des agrégats M et A
+    global LABEL_SOURCE_XR
+    LABEL_SOURCE_XR = 'XR'
+    global LABEL_SOURCE_DIDON
+    LABEL_SOURCE_DIDON = 'DIDON'
+
 
 ## ######################################
 ## constructeur
 ## ######################################
 
-    def __init__(self, envToParam, freqMesure): # Notre méthode constructeur
+    def __init__(self, envToParam, freqMesure, parametrage=None, fabriqueXR=None, engineDidon=None, sorties=None,\
+                    connexionImmediate=True): # Notre méthode constructeur
         """
             Initialisation de la classe DidonGetMesures :
             - initialisation du parametrage (et utilsXr)
+            - connexions XR et DIDON (connecte) si <connexionImmediate>, sinon à la charge de l'appelant
+            Dépendances injectables (paramètres optionnels, pour un traitement réutilisé entre plusieurs exécutions) :
+            - <parametrage> : paramétrage (mêmes accesseurs que DidonParametrage) utilisé à la place de DidonParametrage(envToParam)
+            - <fabriqueXR> : fonction sans paramètre retournant une nouvelle connexion XR (get_mesures et disconnect 
+              comme pyair.xair.XAIR), appelée pour la connexion principale, celle de chaque worker et les reconnexions
+            - <engineDidon> : engine SQLAlchemy de la base DIDON utilisé à la place de l'engine PostgreSQL du paramétrage
+            - <sorties> : liste de sorties supplémentaires (objets disposant d'une méthode ecrit(nomCourt, valEtCodes, frequence),
+              éventuellement d'une méthode marquePlage(nomCourt, debut, fin, frequence) informée de la plage de date_mesure
+              remplacée en base DIDON et d'une méthode termine() appelée en fin de chargement), alimentées avec les mesures 
+              écrites en base DIDON
         """
 
         nomFonction='__init__'
         ##Initialisation du paramtrage
         self.parametrage = None
-        self.parametrage = DidonParametrage(envToParam)
+        if parametrage is not None:
+            self.parametrage = parametrage
+        else:
+            self.parametrage = self.initialiseParametrage(envToParam)
+        self.fabriqueXR = fabriqueXR
+        self.engineDidonInjecte = engineDidon
+        self.sorties = list(sorties or [])
+        self.isXRConnected = False
+        self.isDIDONConnected = False
+        ## Connexion XR principale (None tant que connectXR n'a pas été appelé, cf. <connexionImmediate>)
+        self.connXR = None
+
+        ## Nombre de workers pour le traitement concurrent des mesures (1 = traitement séquentiel)
+        ## Chaque worker dispose de sa propre connexion XR, les connexions DIDON sont issues du pool de l'engine
+        self.nbWorkers = max(1, int(self.getParametreOptionnel('getNbWorkers', 1)))
+        self.localWorker = threading.local()
+        self.verrouConnexions = threading.Lock()
+        self.connexionsXRWorkers = []
+
+        ## Politique de reprise sur erreur des connexions XR et DIDON : nouvelles tentatives espacées d'un délai exponentiel
+        self.reprise = DidonReprise(int(self.getParametreOptionnel('getNbTentativesConnexion', 3)),\
+                                    float(self.getParametreOptionnel('getDelaiInitialReprise', 1)),\
+                                    float(self.getParametreOptionnel('getDelaiMaxReprise', 30)),\
+                                    self.getParametrage().getDidonLogger())
+        ## Nombre de passes de reprise, en fin de traitement, des mesures en erreur (0 = pas de reprise)
+        self.nbReprisesMesures = max(0, int(self.getParametreOptionnel('getNbReprisesMesures', 1)))
+
+        ## Sorties supplémentaires du paramétrage (getSorties), ajoutées aux sorties injectées
+        self.sortiesParametrees = self.creeSorties()
+        self.sorties += self.sortiesParametrees
+
+        ## Tables de remplacement des valeurs et des codes XR compilées une fois pour tout le traitement
+        self.compileRemplacements()
+
+        ## Mode d'insertion en base DIDON : LABEL_INSERTION_TO_SQL (par défaut) ou LABEL_INSERTION_COPY
+        self.modeInsertion = str(self.getParametreOptionnel('getModeInsertion', LABEL_INSERTION_TO_SQL)).upper()
+        ## Mode de remplacement des mesures existantes : LABEL_REMPLACEMENT_UNITAIRE (par défaut), _UPSERT, _PLAGE ou _DIFF
+        self.modeRemplacement = str(self.getParametreOptionnel('getModeRemplacement', LABEL_REMPLACEMENT_UNITAIRE)).upper()
+        ## Compteurs du mode DIFF par fréquence : [insérées, mises à jour, supprimées, inchangées]
+        self.compteursDiff = {}
+        self.verrouCompteurs = threading.Lock()
+        ## Taille des files entre les étapes extraction, transformation et chargement du mode pipeline (0 = pas de pipeline)
+        self.tailleFilePipeline = max(0, int(self.getParametreOptionnel('getTailleFilePipeline', 0)))
+        ## Nombre de mesures récupérées par appel XR (1 = un appel XR par mesure)
+        self.tailleLotXR = max(1, int(self.getParametreOptionnel('getTailleLotXR', 1)))
+        ## Nombre de mois par tranche de récupération XR pour les agrégats M et A (0 = fenêtre complète en une fois)
+        self.nbMoisParTranche = max(0, int(self.getParametreOptionnel('getNbMoisParTranche', 0)))
+        ## Source des données horaires des agrégats M et A : LABEL_SOURCE_XR (par défaut) ou LABEL_SOURCE_DIDON (table horaire DIDON)
+        self.sourceAgregatsMA = str(self.getParametreOptionnel('getSourceAgregatsMA', LABEL_SOURCE_XR)).upper()
+
+        ## Cache local des extractions XR (partitions mensuelles Parquet)
+        self.cacheXR = None
+        if self.getParametreOptionnel('getCacheXRActif', False) == True:
+            self.cacheXR = DidonCacheXR(self.getParametreOptionnel('getRepertoireCacheXR',\
+                                                                os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache_xr')),\
+                                        int(self.getParametreOptionnel('getNbJoursCacheXRImmuable', 7)),\
+                                        int(self.getParametreOptionnel('getTailleMaxCacheXRMo', 2048))*1024*1024,\
+                                        self.getParametrage().getDidonLogger())
 
         ## Declenchement du compteur de temps de traitement
         self.start_time = time.time()
@@ -68,39 +187,46 @@ class DidonGetMesures:
                                                     'Execution de l\'exportation des mesures du ' + str(self.getDateTraitement()))
         self.crFinal = '\nTraitement du '+str(self.getDateTraitement())+'\n'
 
-        ## Controle de la valeur du parametre "freqMesuree" par rapport aux valeurs autorisées dans le paramétrage
+        ## Controle de la valeur du parametre "freqMesuree" par rapport aux valeurs autorisées dans le paramétrage :
+        ## une fréquence autorisée ou une combinaison de fréquences autorisées distinctes (traitement multi-fréquences)
         if self.isFrequenceAutorisee(freqMesure):
-            self.frequenceMesure = freqMesure
-            self.tableAUtiliser=self.parametrage.getTable(self.frequenceMesure)
-            self.parametrage.getDidonLogger().ecrireLog( nomClasse,nomFonction, \
-                                                        'frequence '+freqMesure+' autorisee => table correspondante : '+self.getTableAUtiliser())
+            self.frequencesMesure = [freqMesure]
+        elif len(freqMesure) > 1 and len(set(freqMesure)) == len(freqMesure) and \
+                all(self.isFrequenceAutorisee(freq) for freq in freqMesure):
+            self.frequencesMesure = list(freqMesure)
         else:
             self.sortieFreqKO(freqMesure)
-
-        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
-                                                        'Tentative de connexion à XR')
-        try:
-            ## Initialisation de la connexion XR
-            self.connectXR()
-        except Exception as error:
-            self.getParametrage().getDidonLogger().ecrireLog( nomClasse,nomFonction,\
-                                                            'Erreur de connexion XR : %s'%error,'ERROR')
-            self.isXRConnected=False
-            sys.exit(0)
-
-        self.getParametrage().getDidonLogger().ecrireLog( nomClasse,nomFonction,\
-                                                        'Tentative de connexion à DIDON')
-        try:
-            ## Initialisation de la connexion DIDON
-            self.connectDidon()
-        except Exception as error:
-            self.getParametrage().getDidonLogger().ecrireLog( nomClasse,nomFonction,\
-                                                            'Erreur de connexion DIDON : %s'%error,'ERROR')
-            self.isDIDONConnected=False
-            sys.exit(0)
-
-        ## Affichage du statut de démarrage du programme
-        self.afficheStatut(LABEL_INITIALISATION)
+        ## Fréquence principale (traitement mono-fréquence) et table DIDON de chaque fréquence
+        self.frequenceMesure = self.frequencesMesure[0]
+        self.tablesAUtiliser = {}
+        for freq in self.frequencesMesure:
+            self.tablesAUtiliser[freq] = self.parametrage.getTable(freq)
+            self.parametrage.getDidonLogger().ecrireLog( nomClasse,nomFonction, \
+                                                        'frequence '+freq+' autorisee => table correspondante : '+self.getTableAUtiliser(freq))
+        self.tableAUtiliser = self.tablesAUtiliser[self.frequenceMesure]
+
+        ## Métriques de performance par mesure et par étape, exportées en fin de traitement
+        self.metriques = DidonMetriques(self.getLibelleFrequences(), self.getParametrage().getDidonLogger())
+
+        ## Mode incrémental (traitement mono-fréquence H ou D uniquement) : seules les mesures postérieures à la dernière date chargée
+        ## (moins une période de revalidation pour les changements tardifs de codes de validation XR) sont récupérées
+        self.etatIncremental = None
+        self.nbHeuresRevalidation = int(self.getParametreOptionnel('getNbHeuresRevalidation', 72))
+        if self.getParametreOptionnel('getModeIncremental', False) == True and len(self.frequencesMesure) == 1 and \
+                self.frequenceMesure in (self.getParametrage().getLABEL_FREQ_H(), self.getParametrage().getLABEL_FREQ_D()):
+            fichierEtat = self.getParametreOptionnel('getFichierEtatIncremental',\
+                                                    os.path.join(os.path.dirname(os.path.abspath(__file__)), nomClasse+'_etat_incremental.json'))
+            self.etatIncremental = DidonEtatIncremental(fichierEtat, self.getParametrage().getDidonLogger())
+
+        ## Gestion du partitionnement des tables DIDON par date_mesure (créée à la connexion DIDON si getPartitionsActives())
+        self.partitions = None
+        ## Statistiques réglementaires maintenues incrémentalement (sortie supplémentaire créée à la connexion DIDON 
+        ## si getStatistiquesActives())
+        self.statistiques = None
+
+        ## Connexions XR et DIDON
+        if connexionImmediate:
+            self.connecte()
 
 ## ######################################
 ## accesseurs
@@ -127,8 +253,10 @@ class DidonGetMesures:
     def getConnXR(self):
         """
             Permet de récupérer la connexion XR initialisée au début du programme
+            Dans un worker du traitement concurrent, c'est la connexion XR propre au worker qui est retournée
         """
-        return self.connXR
+        connXR = getattr(self.localWorker, 'connXR', None)
+        return connXR if connXR is not None else self.connXR
 
     def getConnDidon(self):
         """
@@ -136,11 +264,34 @@ class DidonGetMesures:
         """
         return self.connDidon
 
-    def getTableAUtiliser(self):
+    def getTableAUtiliser(self,frequence=None):
         """
             Permet de récupérer le nom de la table DIDON mise à jour par le programme
+            pour la fréquence <frequence> (fréquence principale par défaut)
+        """
+        if frequence is None:
+            return self.tableAUtiliser
+        return self.tablesAUtiliser[frequence]
+
+    def getMesureDB(self,frequence=None):
+        """
+            Permet de récupérer la classe SQLAlchemy de la table DIDON de la fréquence <frequence> (fréquence principale par défaut)
+        """
+        if frequence is None:
+            return self.mesureDBDidon
+        return self.mesuresDBDidon[frequence]
+
+    def getFrequencesMesure(self):
         """
-        return self.tableAUtiliser
+            Permet de récupérer la liste des fréquences traitées (plusieurs fréquences en traitement multi-fréquences)
+        """
+        return self.frequencesMesure
+
+    def getLibelleFrequences(self):
+        """
+            Permet de récupérer le libellé des fréquences traitées (ex : H ou HDMA) utilisé dans les traces et les métriques
+        """
+        return ''.join(self.frequencesMesure)
 
     def getXRConnected(self):
         """
@@ -153,11 +304,151 @@ class DidonGetMesures:
             Permet de récupérer le booleen indiquant si la connexion DIDON est effective
         """
         return self.isDIDONConnected
+
+    def getNbWorkers(self):
+        """
+            Permet de récupérer le nombre de workers utilisés pour le traitement des mesures
+        """
+        return self.nbWorkers
+
+    def getEtatIncremental(self):
+        """
+            Permet de récupérer l'état du mode incrémental (None si le mode incrémental n'est pas actif)
+        """
+        return self.etatIncremental
+
+    def getMetriques(self):
+        """
+            Permet de récupérer les métriques de performance du traitement
+        """
+        return self.metriques
+
+    def getCacheXR(self):
+        """
+            Permet de récupérer le cache local des extractions XR (None si le cache n'est pas actif)
+        """
+        return self.cacheXR
+
+    def getSourceAgregatsMA(self):
+        """
+            Permet de récupérer la source des données horaires des agrégats M et A (LABEL_SOURCE_XR ou LABEL_SOURCE_DIDON)
+        """
+        return self.sourceAgregatsMA
+
+    def getNbMoisParTranche(self):
+        """
+            Permet de récupérer le nombre de mois par tranche de récupération des agrégats M et A (0 si non découpé)
+        """
+        return self.nbMoisParTranche
+
+    def getTailleLotXR(self):
+        """
+            Permet de récupérer le nombre de mesures récupérées par appel XR
+        """
+        return self.tailleLotXR
+
+    def getTailleFilePipeline(self):
+        """
+            Permet de récupérer la taille des files du mode pipeline (0 = pas de pipeline)
+        """
+        return self.tailleFilePipeline
+
+    def getPartitions(self):
+        """
+            Permet de récupérer la gestion du partitionnement des tables DIDON (DidonPartitions, None si inactive)
+        """
+        return self.partitions
+
+    def getStatistiques(self):
+        """
+            Permet de récupérer les statistiques réglementaires maintenues incrémentalement (DidonStatistiques, None si inactives)
+        """
+        return self.statistiques
+
+    def getModeInsertion(self):
+        """
+            Permet de récupérer le mode d'insertion en base DIDON (LABEL_INSERTION_TO_SQL ou LABEL_INSERTION_COPY)
+        """
+        return self.modeInsertion
+
+    def getModeRemplacement(self):
+        """
+            Permet de récupérer le mode de remplacement des mesures existantes en base DIDON
+            (LABEL_REMPLACEMENT_UNITAIRE, LABEL_REMPLACEMENT_UPSERT, LABEL_REMPLACEMENT_PLAGE ou LABEL_REMPLACEMENT_DIFF)
+        """
+        return self.modeRemplacement
+
+    def getReprise(self):
+        """
+            Permet de récupérer la politique de reprise sur erreur (DidonReprise) des connexions XR et DIDON
+        """
+        return self.reprise
+
+    def getNbReprisesMesures(self):
+        """
+            Permet de récupérer le nombre de passes de reprise des mesures en erreur en fin de traitement
+        """
+        return self.nbReprisesMesures
+
+    def initialiseParametrage(self, envToParam):
+        """
+            Fonction de création du paramétrage DidonParametrage de l'environnement <envToParam> ('LOCAL' ou 'PROD')
+        """
+        from DidonParametrage import DidonParametrage
+        return DidonParametrage(envToParam)
+
+    def getParametreOptionnel(self, nomAccesseur, valeurDefaut):
+        """
+            Permet de récupérer un paramètre optionnel via l'accesseur <nomAccesseur> de DidonParametrage
+            Si l'accesseur n'est pas défini dans le paramétrage, <valeurDefaut> est retournée
+        """
+        accesseur = getattr(self.getParametrage(), nomAccesseur, None)
+        if accesseur is None:
+            return valeurDefaut
+        return accesseur()
         
 ## ######################################
 ## fonctions de traitement
 ## ######################################
 
+    def creeSorties(self):
+        """
+            Fonction de création des sorties supplémentaires décrites par getSorties() (aucune par défaut), liste de 
+            dictionnaires { 'type' : LABEL_SORTIE_POSTGRESQL, LABEL_SORTIE_PARQUET ou LABEL_SORTIE_CSV, ... } :
+                - LABEL_SORTIE_POSTGRESQL : 'url' (URL SQLAlchemy de la base cible), 'schema' (schéma des mesures DIDON 
+                  par défaut), 'tables' ({ frequence : table }, tables DIDON des fréquences du paramétrage par défaut)
+                - LABEL_SORTIE_PARQUET et LABEL_SORTIE_CSV : 'repertoire', 'tailleGroupe' (lignes par groupe, 1000000 par 
+                  défaut), 'granularites' ({ frequence : LABEL_PARTITION_MOIS ou LABEL_PARTITION_ANNEE }, mensuelle pour 
+                  H et annuelle sinon par défaut)
+            Une sortie impossible à créer (type inconnu, pyarrow absent ...) est tracée en erreur et ignorée
+            Retourne la liste des sorties créées
+        """
+
+        nomFonction='creeSorties'
+
+        sorties = []
+        for description in self.getParametreOptionnel('getSorties', []):
+            typeSortie = str(description.get('type', '')).upper()
+            try:
+                if typeSortie == LABEL_SORTIE_POSTGRESQL:
+                    sortie = DidonSortiePostgreSQL(description['url'],\
+                                                    description.get('schema', self.getParametrage().getDIDONschemaMesure()),\
+                                                    description.get('tables', {freq: self.getParametrage().getTable(freq) \
+                                                                                for freq in self.getParametrage().getFrequencesMesure()}),\
+                                                    self.getParametrage().getDidonLogger())
+                elif typeSortie in (LABEL_SORTIE_PARQUET, LABEL_SORTIE_CSV):
+                    sortie = DidonSortieFichiers(description['repertoire'], typeSortie, int(description.get('tailleGroupe', 1000000)),\
+                                                description.get('granularites', {self.getParametrage().getLABEL_FREQ_H(): LABEL_PARTITION_MOIS}),\
+                                                self.getParametrage().getDidonLogger())
+                else:
+                    raise ValueError('Type de sortie inconnu : '+typeSortie)
+                sorties.append(sortie)
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'Sortie supplementaire : '+sortie.getLibelle())
+            except Exception as error:
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                'Sortie '+typeSortie+' ignoree : %s'%error,'ERROR')
+        return sorties
+
     def isFrequenceAutorisee(self,freq):
         """
             Fonction de controle de la frequence passee en parametre par rapport aux valeurs autorisées dans le paramétrage
@@ -171,6 +462,40 @@ class DidonGetMesures:
         else:
             return False
         
+    def connecte(self):
+        """
+            Fonction d'établissement des connexions XR (connectXR) et DIDON (connectDidon) puis d'affichage du statut 
+            de démarrage
+            Les erreurs de connexion sont tracées et n'interrompent pas le programme
+            Retourne True si les deux connexions sont établies, False sinon
+        """
+
+        nomFonction='connecte'
+
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                        'Tentative de connexion à XR')
+        try:
+            ## Initialisation de la connexion XR
+            self.connectXR()
+        except Exception as error:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse,nomFonction,\
+                                                            'Erreur de connexion XR : %s'%error,'ERROR')
+            self.isXRConnected=False
+
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse,nomFonction,\
+                                                        'Tentative de connexion à DIDON')
+        try:
+            ## Initialisation de la connexion DIDON
+            self.connectDidon()
+        except Exception as error:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse,nomFonction,\
+                                                            'Erreur de connexion DIDON : %s'%error,'ERROR')
+            self.isDIDONConnected=False
+
+        ## Affichage du statut de démarrage du programme
+        self.afficheStatut(LABEL_INITIALISATION)
+        return self.getXRConnected() and self.getDIDONConnected()
+
     def connectXR(self):
         """
             Fonction de onnexion XR
@@ -181,10 +506,7 @@ class DidonGetMesures:
 
         try:
             ## Initialisation de la connexion XR et de l'indicateur de connexion etablie
-            self.connXR = pyair.xair.XAIR(user=self.getParametrage().getXRuser(),\
-                                            pwd=self.getParametrage().getXRpwd(),\
-                                            adr=self.getParametrage().getXRhost(),\
-                                            base=self.getParametrage().getXRbase())
+            self.connXR = self.creerConnexionXR()
             self.isXRConnected=True
             self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
                                                             'Connexion XR établie ...')
@@ -193,6 +515,27 @@ class DidonGetMesures:
                                                             'Erreur de connexion XR : %s'%error,'ERROR')
             self.isXRConnected=False
 
+    def creerConnexionXR(self):
+        """
+            Fonction de création d'une connexion XR avec reconnexion automatique (DidonConnexionXR) selon la politique
+            de reprise getReprise()
+            Utilisée pour la connexion principale et pour la connexion propre à chaque worker du traitement concurrent
+        """
+        return DidonConnexionXR(self.ouvreConnexionXR, self.getReprise(), self.getParametrage().getDidonLogger())
+
+    def ouvreConnexionXR(self):
+        """
+            Fonction d'ouverture d'une connexion XR via la fabrique injectée au constructeur, ou à défaut via la classe 
+            pyair.xair.XAIR avec le paramétrage de DidonParametrage
+        """
+        if self.fabriqueXR is not None:
+            return self.fabriqueXR()
+        from pyair import xair
+        return xair.XAIR(user=self.getParametrage().getXRuser(),\
+                                pwd=self.getParametrage().getXRpwd(),\
+                                adr=self.getParametrage().getXRhost(),\
+                                base=self.getParametrage().getXRbase())
+
 
     def connectDidon(self):
         """
@@ -205,21 +548,27 @@ class DidonGetMesures:
 
         try:
             ## Initialisation de la connexion DIDON et de l'indicateur de connexion etablie
-            self.urlDidon = "postgres://{0}:{1}@{2}/{3}".format(self.getParametrage().getDIDONuser(),\
-                                                                self.getParametrage().getDIDONpwd(),\
-                                                                self.getParametrage().getDIDONhost(),\
-                                                                self.getParametrage().getDIDONbase())
+            ## La session est propre à chaque thread (scoped_session)
             self.schemaMesureDidon = self.getParametrage().getDIDONschemaMesure()
-            self.engineDidon   = create_engine(self.urlDidon)
-            self.metadataDidon = MetaData(self.engineDidon,schema=self.schemaMesureDidon)
+            self.engineDidon   = self.creerEngineDidon()
+            self.getReprise().execute('Connexion DIDON', self.verifieConnexionDidon)
+            ## Schéma des tables issu du cache local ou de la réflexion en base (chargeSchemaDidon)
+            self.metadataDidon = self.getReprise().execute('Schema DIDON', self.chargeSchemaDidon)
             self.BaseDidon     = declarative_base(metadata=self.metadataDidon)
-            self.sessionDidon  = sessionmaker(bind=self.engineDidon)()
+            self.sessionDidon  = scoped_session(sessionmaker(bind=self.engineDidon))
             self.isDIDONConnected=True
-            class MesureDB(self.BaseDidon):
-                __tablename__ = self.getTableAUtiliser()
-                __table_args__ = {'autoload':True}
+            if self.getParametreOptionnel('getPartitionsActives', False) == True:
+                self.partitions = self.creePartitionsDidon()
+            if self.getParametreOptionnel('getStatistiquesActives', False) == True and self.statistiques is None:
+                self.statistiques = self.creeStatistiquesDidon()
+                self.sorties.append(self.statistiques)
+            ## Une classe par table DIDON à mettre à jour (une par fréquence en traitement multi-fréquences)
+            self.mesuresDBDidon = {}
+            self.prepareFrequences(self.getFrequencesMesure())
+            if self.getModeRemplacement() == LABEL_REMPLACEMENT_UPSERT:
+                self.verifieContrainteUpsert()
         
-            self.mesureDBDidon = MesureDB
+            self.mesureDBDidon = self.mesuresDBDidon[self.frequenceMesure]
             self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
                                                             'Connexion Didon établie ...')
         except Exception as error:
@@ -227,23 +576,188 @@ class DidonGetMesures:
             self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,
                                                             'Erreur de connexion DIDON : %s'%error,'ERROR')
 
+    def creerEngineDidon(self):
+        """
+            Fonction de création de l'engine SQLAlchemy de la base DIDON (PostgreSQL) avec le paramétrage de DidonParametrage
+            Le pool de connexions est dimensionné sur le nombre de workers du traitement concurrent
+            Chaque connexion est contrôlée avant utilisation (pool_pre_ping) et renouvelée après 
+            getDureeRecyclageConnexions() secondes (pool_recycle)
+            L'engine injecté au constructeur est utilisé tel quel s'il est fourni
+        """
+        if self.engineDidonInjecte is not None:
+            self.urlDidon = str(self.engineDidonInjecte.url)
+            return self.engineDidonInjecte
+        self.urlDidon = "postgres://{0}:{1}@{2}/{3}".format(self.getParametrage().getDIDONuser(),\
+                                                            self.getParametrage().getDIDONpwd(),\
+                                                            self.getParametrage().getDIDONhost(),\
+                                                            self.getParametrage().getDIDONbase())
+        return create_engine(self.urlDidon, pool_size=max(5, self.getNbWorkers()), max_overflow=self.getNbWorkers(),\
+                                pool_pre_ping=True,\
+                                pool_recycle=int(self.getParametreOptionnel('getDureeRecyclageConnexions', 1800)))
+
+    def creePartitionsDidon(self):
+        """
+            Fonction de création de la gestion du partitionnement des tables DIDON (DidonPartitions) :
+                - granularité par fréquence getGranularitesPartitions(), par défaut mensuelle pour H et annuelle pour D
+                - getNbPartitionsAvance() partitions créées par avance lors de la maintenance (3 par défaut)
+                - attente des verrous d'un échange de partition bornée à getDelaiVerrouPartitions() secondes (30 par défaut)
+        """
+        granularites = self.getParametreOptionnel('getGranularitesPartitions',\
+                                                {self.getParametrage().getLABEL_FREQ_H(): LABEL_PARTITION_MOIS,\
+                                                self.getParametrage().getLABEL_FREQ_D(): LABEL_PARTITION_ANNEE})
+        return DidonPartitions(self.engineDidon, self.schemaMesureDidon, granularites,\
+                                int(self.getParametreOptionnel('getNbPartitionsAvance', 3)),\
+                                float(self.getParametreOptionnel('getDelaiVerrouPartitions', 30)),\
+                                self.getParametrage().getDidonLogger())
+
+    def creeStatistiquesDidon(self):
+        """
+            Fonction de création des statistiques réglementaires maintenues incrémentalement (DidonStatistiques) à partir 
+            de la table horaire DIDON :
+                - tables getTableStatistiquesJour() et getTableStatistiquesAnnee() du schéma getSchemaStatistiques()
+                  (schéma des mesures DIDON par défaut)
+                - seuils getSeuilsStatistiques(), par défaut 200 en horaire et 50 en moyenne journalière pour toutes les mesures
+                - percentiles getPercentilesStatistiques() (50, 90.4, 98 et 99.8 par défaut), histogramme en classes de
+                  getLargeurClasseStatistiques() (1 par défaut)
+                - jour valide à partir de getNbHeuresMinJourStatistiques() heures valides (18 par défaut)
+        """
+        return DidonStatistiques(self.engineDidon, self.getParametreOptionnel('getSchemaStatistiques', self.schemaMesureDidon),\
+                                self.getTableQualifiee(self.getParametrage().getTable(self.getParametrage().getLABEL_FREQ_H())),\
+                                self.getParametrage().getLABEL_FREQ_H(),\
+                                self.getParametreOptionnel('getTableStatistiquesJour', 'statistiques_jour'),\
+                                self.getParametreOptionnel('getTableStatistiquesAnnee', 'statistiques_annee'),\
+                                self.getParametreOptionnel('getSeuilsStatistiques', {LABEL_TOUTES_MESURES: {LABEL_SEUIL_HORAIRE: [200],\
+                                                                                                        LABEL_SEUIL_JOURNALIER: [50]}}),\
+                                self.getParametreOptionnel('getPercentilesStatistiques', [50, 90.4, 98, 99.8]),\
+                                float(self.getParametreOptionnel('getLargeurClasseStatistiques', 1)),\
+                                int(self.getParametreOptionnel('getNbHeuresMinJourStatistiques', 18)),\
+                                self.getParametrage().getDidonLogger())
+
+    def preparePartitions(self,fenetres):
+        """
+            Fonction de création des partitions manquantes des tables DIDON couvrant les fenêtres <fenetres> 
+            ({ frequence : (debut, fin) }) avant l'écriture des mesures, si le partitionnement est actif
+            Une erreur est tracée sans interrompre le traitement (les mesures hors partition seront alors en erreur)
+        """
+
+        nomFonction='preparePartitions'
+
+        if self.getPartitions() is None:
+            return
+        for freq, (debut, fin) in fenetres.items():
+            try:
+                ## Le jour suivant la fin est couvert : date_mesure est l'heure de fin de la période mesurée, la dernière
+                ## mesure horaire du jour de fin est datée du lendemain 00h (même convention que DidonStatistiques)
+                self.getPartitions().creePartitions(self.getTableAUtiliser(freq), freq, convertitDate(debut),\
+                                                    convertitDate(fin) + pd.Timedelta(days=1))
+            except Exception as error:
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                'Erreur de creation des partitions de '+str(self.getTableAUtiliser(freq))+\
+                                                                ' : %s'%error,'ERROR')
+
+    def prepareFrequences(self,frequences):
+        """
+            Fonction de préparation des fréquences <frequences> pour l'écriture en base DIDON (connexion DIDON établie) :
+            pour chaque fréquence non encore préparée, contrôle de la fréquence, table DIDON de la fréquence (getTable), 
+            schéma de la table (réflexion en base si elle est absente du schéma chargé) et classe de mise à jour
+            Lève ValueError si une fréquence n'est pas autorisée dans le paramétrage
+        """
+        for freq in frequences:
+            if freq in self.mesuresDBDidon:
+                continue
+            if not self.isFrequenceAutorisee(freq):
+                raise ValueError('Frequence non autorisee : '+str(freq))
+            self.tablesAUtiliser[freq] = self.getParametrage().getTable(freq)
+            nomTable = self.getTableAUtiliser(freq)
+            if self.schemaMesureDidon+'.'+nomTable not in self.metadataDidon.tables:
+                self.getReprise().execute('Schema DIDON '+nomTable,\
+                                            lambda: Table(nomTable, self.metadataDidon, autoload_with=self.engineDidon))
+            ## Clé (nom_mes_court, date_mesure) déclarée explicitement : une table partitionnée sans clé primaire 
+            ## (index non unique en cas de doublons, voir DidonPartitions.creeIndex) reste utilisable
+            tableDidon = self.metadataDidon.tables[self.schemaMesureDidon+'.'+nomTable]
+            self.mesuresDBDidon[freq] = type('MesureDB'+str(freq), (self.BaseDidon,),\
+                                            {'__table__': tableDidon,\
+                                             '__mapper_args__': {'primary_key': [tableDidon.c.nom_mes_court, tableDidon.c.date_mesure]}})
+
+    def verifieConnexionDidon(self):
+        """
+            Fonction de contrôle de la connexion à la base DIDON : ouverture puis restitution au pool d'une connexion
+        """
+        connexion = self.engineDidon.connect()
+        connexion.close()
+
+    def chargeSchemaDidon(self):
+        """
+            Fonction de chargement du schéma (MetaData SQLAlchemy) des tables DIDON à mettre à jour :
+                - depuis le cache local getFichierSchemaDidon() s'il correspond à la même base, au même schéma et aux mêmes 
+                  tables et date de moins de getDureeCacheSchemaHeures() heures (24 par défaut, 0 = sans expiration)
+                - sinon par réflexion en base des tables, puis écriture du cache
+            Le cache est désactivé (réflexion à chaque exécution) si getCacheSchemaActif() est faux
+            Retourne le MetaData contenant les tables
+        """
+
+        nomFonction='chargeSchemaDidon'
+
+        tables = sorted(set(self.getTableAUtiliser(freq) for freq in self.getFrequencesMesure()))
+        cle = [self.getParametrage().getDIDONhost(), self.getParametrage().getDIDONbase(), self.schemaMesureDidon, tables]
+        fichierSchema = self.getParametreOptionnel('getFichierSchemaDidon',\
+                                                os.path.join(os.path.dirname(os.path.abspath(__file__)), nomClasse+'_schema_didon.pickle'))
+        cacheActif = self.getParametreOptionnel('getCacheSchemaActif', True) == True
+        dureeCache = float(self.getParametreOptionnel('getDureeCacheSchemaHeures', 24))*3600
+
+        if cacheActif and os.path.exists(fichierSchema):
+            try:
+                with open(fichierSchema, 'rb') as fichier:
+                    cache = pickle.load(fichier)
+                if cache['cle'] == cle and (dureeCache <= 0 or time.time() - cache['date'] < dureeCache):
+                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                    'Schema des tables '+str(tables)+' charge depuis '+str(fichierSchema))
+                    return cache['metadata']
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'Cache du schema perime ou different : '+str(fichierSchema))
+            except Exception as error:
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                'Cache du schema illisible ('+str(fichierSchema)+') : %s'%error,'ERROR')
+
+        ## Réflexion en base des tables à mettre à jour
+        metadata = MetaData(schema=self.schemaMesureDidon)
+        for nomTable in tables:
+            Table(nomTable, metadata, autoload_with=self.engineDidon)
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'Schema des tables '+str(tables)+' lu en base DIDON')
+
+        if cacheActif:
+            try:
+                fichierTemporaire = fichierSchema + '.tmp'
+                with open(fichierTemporaire, 'wb') as fichier:
+                    pickle.dump({'cle': cle, 'date': time.time(), 'metadata': metadata}, fichier)
+                os.replace(fichierTemporaire, fichierSchema)
+            except Exception as error:
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                'Ecriture impossible du cache du schema ('+str(fichierSchema)+') : %s'%error,'ERROR')
+        return metadata
+
     def disconnect(self):
         """
             Fonction de déconnexion à la base Didon et au serveur XR
-            Permet de couper les deux connexions établies pour les traitements
+            Permet de couper les deux connexions établies pour les traitements, puis de fermer les sorties supplémentaires
+            du paramétrage
         """
 
         nomFonction='disconnect'
 
         try:
             ## deconnexion DIDON
+            self.sessionDidon.remove()
             self.engineDidon.dispose()
             isDIDONConnected=False
             self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
                                                             'Deconnexion DIDON effectuee ')
 
-            ## deconnexion XR
-            self.connXR.disconnect()
+            ## deconnexion XR (connexion principale absente si connectXR n'a pas été appelé)
+            if self.connXR is not None:
+                self.connXR.disconnect()
+            for connXRWorker in self.connexionsXRWorkers:
+                connXRWorker.disconnect()
+            self.connexionsXRWorkers = []
             isXRConnected=False
             self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
                                                             'Deconnexion XR effectuee ')
@@ -251,6 +765,14 @@ class DidonGetMesures:
             self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
                                                             'Erreur lors de la deconnexion DIDON et/ou XR : %s'%error,'ERROR')
 
+        ## Fermeture des sorties supplémentaires du paramétrage
+        for sortie in self.sortiesParametrees:
+            try:
+                sortie.ferme()
+            except Exception as error:
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                'Erreur de fermeture de la sortie '+sortie.getLibelle()+' : %s'%error,'ERROR')
+
     def afficheStatut(self, etape):
         """
             fonction d'affichage d'un statut permettant de tracer les donnees importantes en début et fin de traitement
@@ -268,9 +790,10 @@ class DidonGetMesures:
         if etape == LABEL_INITIALISATION:
             self.getParametrage().afficheParametrages()
             self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
-                                                        'Fréquence à traiter : '+str(self.frequenceMesure))
+                                                        'Fréquence à traiter : '+self.getLibelleFrequences())
             self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
-                                                        'Table à utiliser : '+str(self.getTableAUtiliser()))
+                                                        'Table à utiliser : '+', '.join(self.getTableAUtiliser(freq) \
+                                                                                        for freq in self.getFrequencesMesure()))
         self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'Etat des connexions')
         self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
                                                         'Connexion XR : '+str(self.getXRConnected()))
@@ -282,6 +805,78 @@ class DidonGetMesures:
         self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'')
         self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'')
 
+    def compileRemplacements(self):
+        """
+            Fonction de compilation des dictionnaires de remplacement du paramétrage (getDictRemplacementValeurs et
+            getDictRemplacementCodes) en tables de correspondance (index des clés, tableau des valeurs de remplacement)
+            utilisées par appliqueRemplacements
+        """
+        clesValeurs = list(self.getParametrage().getDictRemplacementValeurs())
+        self.remplacementsValeurs = (pd.Index(clesValeurs, dtype=object),
+                                    np.array([self.getParametrage().remplacerValeur(cle) for cle in clesValeurs]+[None], dtype=object))
+        clesCodes = list(self.getParametrage().getDictRemplacementCodes())
+        self.remplacementsCodes = (pd.Index(clesCodes, dtype=object),
+                                    np.array([self.getParametrage().remplacerCode(cle) for cle in clesCodes]+[None], dtype=object))
+
+    def appliqueRemplacements(self,structure,remplacements):
+        """
+            Fonction de remplacement en une seule passe vectorisée des valeurs de <structure> présentes dans les clés
+            de la table de correspondance <remplacements> (issue de compileRemplacements), toutes colonnes confondues
+            Les valeurs absentes des clés sont conservées. Contrairement aux remplacements successifs clé par clé, 
+            une valeur de remplacement n'est pas elle-même remplacée
+            Retourne une nouvelle structure de données (mêmes index et colonnes)
+        """
+        cles, valeursRemplacement = remplacements
+        if len(cles) == 0 or structure is None or structure.size == 0:
+            return structure
+
+        brutes = structure.to_numpy()
+        indices = cles.get_indexer(brutes.ravel()).reshape(brutes.shape)
+        trouves = indices >= 0
+        if not trouves.any():
+            return structure
+        remplacees = np.where(trouves, valeursRemplacement[indices], brutes)
+        return pd.DataFrame(remplacees, index=structure.index, columns=structure.columns).infer_objects()
+
+    def construitSortie(self,nomCourt,dates,valeurs,codes,arrondi):
+        """
+            Fonction de construction en une seule allocation de la structure de données de sortie d'une mesure
+            (colonnes valeur_mesure, code_validation, nom_mes_court et date_mesure) dans un format compact :
+                - valeur_mesure en float32 si toutes les valeurs sont à la précision de <arrondi> décimales et représentables 
+                  exactement en float32 (restituées en float64 arrondi au chargement, voir prepareChargement), float64 sinon
+                - code_validation en entier nullable Int8 (codes non numériques éventuels conservés tels quels)
+                - nom_mes_court en catégorie (une seule chaine pour toutes les lignes)
+                - date_mesure en colonne uniquement (index par défaut, la date n'est pas dupliquée dans l'index)
+        """
+        valeurs = np.asarray(valeurs, dtype=np.float64)
+        try:
+            decimales = int(arrondi)
+            finies = valeurs[~np.isnan(valeurs)]
+            if len(finies) == 0 or (np.abs(finies).max() * 10.0**decimales < 2**24 and np.array_equal(np.round(finies, decimales), finies)):
+                valeurs = valeurs.astype(np.float32)
+        except (TypeError, ValueError):
+            pass
+
+        try:
+            codes = pd.array(np.asarray(codes), dtype='Int8')
+        except (TypeError, ValueError):
+            codes = np.asarray(codes)
+
+        return pd.DataFrame({'valeur_mesure': valeurs,
+                            'code_validation': codes,
+                            'nom_mes_court': pd.Categorical.from_codes(np.zeros(len(valeurs), dtype=np.int8), categories=[nomCourt]),
+                            'date_mesure': np.asarray(dates)})
+
+    def prepareChargement(self,valEtCodes,frequence):
+        """
+            Fonction de préparation de la structure de sortie pour un chargement par DataFrame.to_sql :
+            les valeurs stockées en float32 sont restituées en float64 arrondi à la précision de la fréquence <frequence>
+        """
+        if valEtCodes['valeur_mesure'].dtype == np.float32:
+            return valEtCodes.assign(valeur_mesure=valEtCodes['valeur_mesure'].astype(np.float64).\
+                                        round(int(self.getParametrage().getArrondi(frequence))))
+        return valEtCodes
+
     def getMesuresFromXR(self,nomCourt,debut,fin,frequence, arrondi, representativite):
         """
             Fonction de récuperation des données dans XR pour une mesure (nomCourt), une période (debut à fin), une fréquence (H, D, M ou A) 
@@ -297,7 +892,7 @@ class DidonGetMesures:
                                 - remplacement des valeurs à probleme dans la mesure en fonction du parametrage
                                 - remplacement des codes récupérés d'XR par 0 (invalide) ou 1 (valide) en fonction du paramétrage
                                 - renommage des colonnes pour préparer la structure de données de sortie
-                                - fusion des dataframes de mesures et de codes pour finaliser la structure de données de sortie
+                                - construction de la structure de données de sortie à partir des mesures et des codes (construitSortie)
                             1.2.2/ elle ne contient pas de donnée
                     - 2/ Sinon (la fréquence en entrée est M ou A) : récupération des données (uniquement mesures) 
                         2.1/ récupération de la données avec les parametres <nomcourt>, <debut>, <fin>, et la fréquence 'HORAIRE'
@@ -321,11 +916,11 @@ class DidonGetMesures:
                                 - renommage des colonnes dans la structure de données de sortie
                                 - Ajout d'une colonne 'code_validation' contenant le code de validation avec la valeur 1
                                     (validation non récupérée donc ajoutée explicitement)
-                                - Pas de fusion necessaire mais copie pour finalisation de la structure de données de sortie
+                                - Pas de fusion necessaire : construction directe de la structure de données de sortie (construitSortie)
                                 - sélection des données pour lesquelles le comptage est supérieur ou égal au taux de representativité
                             2.2.2/ elle contient pas de donnée
                     - 3/ Controle de la structure de sortie 
-                        3.1/ Traitements si la structure de sortie contient des données : 
+                        3.1/ Traitements si la structure de sortie contient des données (construitSortie) : 
                             - Ajout d'une colonne 'nom_mes_court' contenant nomCourt
                             - Ajout d'une colonne 'date_mesure' contenant la date de la mesure
                         3.2/ Traitement si la structure de sortie ne contient aucune donnée
@@ -337,16 +932,284 @@ class DidonGetMesures:
                         ', frequence='+str(frequence)+', arrondi='+str(arrondi)+' et representativite='+str(representativite)
         self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
 
-        dataVal, codesVal, dfmerge = None, None, None
+        ## 1.1/ et 2.1/ Récupération des données XR
+        dataVal, codesVal = self.lireMesuresXR(nomCourt,debut,fin,frequence)
+        return self.transformeMesuresXR(nomCourt,dataVal,codesVal,frequence,arrondi,representativite)
+
+    def getMesuresFromXRParLot(self,nomsCourts,debut,fin,frequence, arrondi, representativite):
+        """
+            Fonction de récuperation des données dans XR pour un lot de mesures (nomsCourts) en un seul appel XR
+            sur la période (debut à fin) et pour la fréquence (H, D, M ou A)
+            Le résultat XR (une colonne par mesure) est :
+                - cas H ou D : découpé par mesure puis chaque mesure est traitée comme dans getMesuresFromXR (transformeMesuresXR)
+                - cas M ou A : agrégé pour toutes les mesures en une seule passe (agregeMesuresMA)
+            Retourne un dictionnaire nomCourt => structure de sortie (None si aucune donnée)
+        """
+
+        nomFonction='getMesuresFromXRParLot'
+        etapeTravail='debut avec nomsCourts='+str(nomsCourts)+', debut='+str(debut)+', fin='+str(fin)+\
+                        ', frequence='+str(frequence)+', arrondi='+str(arrondi)+' et representativite='+str(representativite)
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
+
+        dataLot, codesLot = self.lireMesuresXR(list(nomsCourts),debut,fin,frequence)
+        return self.transformeLotXR(nomsCourts,dataLot,codesLot,frequence,arrondi,representativite)
+
+    def transformeLotXR(self,nomsCourts,dataLot,codesLot,frequence,arrondi,representativite):
+        """
+            Fonction de transformation du résultat XR (dataLot, codesLot) d'un lot de mesures (nomsCourts) en structures
+            de sortie, comme décrit dans getMesuresFromXRParLot
+            Retourne un dictionnaire nomCourt => structure de sortie (None si aucune donnée)
+        """
+
+        ## Cas M ou A : agrégation de toutes les mesures du lot en une seule passe
+        if frequence == self.getParametrage().getLABEL_FREQ_M() or frequence == self.getParametrage().getLABEL_FREQ_A():
+            resultats = {}
+            if dataLot is not None and dataLot.size > 0:
+                top = self.getMetriques().top()
+                dataLot = self.appliqueRemplacements(dataLot, self.remplacementsValeurs)
+                self.getMetriques().enregistre(self.getLibelleMesures(nomsCourts), ETAPE_REMPLACEMENT, top,\
+                                                len(dataLot), self.getMetriques().tailleOctets(dataLot))
+                resultats = self.agregeMesuresMA(dataLot,frequence,arrondi,representativite)
+            return {nomCourt: resultats.get(nomCourt) for nomCourt in nomsCourts}
+
+        ## Découpage du résultat XR en structures par mesure
+        resultats = {}
+        for nomCourt in nomsCourts:
+            dataVal, codesVal = pd.DataFrame(), None
+            if dataLot is not None and nomCourt in dataLot.columns:
+                dataVal = dataLot[[nomCourt]].copy()
+                if codesLot is not None:
+                    codesVal = codesLot[[nomCourt]].copy()
+            resultats[nomCourt] = self.transformeMesuresXR(nomCourt,dataVal,codesVal,frequence,arrondi,representativite)
+        return resultats
+
+    def agregeMesuresMA(self,dataLot,frequence,arrondi,representativite):
+        """
+            Fonction d'agrégation M ou A (ou D en traitement multi-fréquences) de données horaires (valeurs déjà remplacées) de plusieurs mesures (une colonne par mesure)
+            Les étapes du cas 2.2.1/ de getMesuresFromXR sont appliquées à toutes les colonnes en une seule passe :
+                - moyennes arrondies à la fréquence demandée (getRegleReechantillonnage)
+                - nombre de mesures valides et nombre total de mesures par période, taux de représentativité
+                - sélection des moyennes dont le taux est supérieur ou égal à <representativite>
+                - code de validation à 0 si la moyenne n'est pas retenue, 1 sinon
+            Les périodes sans aucune mesure sont écartées comme dans getMesuresFromXR
+            Retourne un dictionnaire nomCourt => structure de sortie identique à celle de getMesuresFromXR
+        """
+
+        nomFonction='agregeMesuresMA'
+        etapeTravail='reechantillonnage de '+str(len(dataLot.columns))+' mesures (cas M ou A)'
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
+
+        top = self.getMetriques().top()
+        reechantillonnage = dataLot.resample(self.getRegleReechantillonnage(frequence))
+        resultats = self.finaliseAgregatsMA(reechantillonnage.mean(),reechantillonnage.count().astype(float),\
+                                            reechantillonnage.size().astype(float),arrondi,representativite)
+        self.getMetriques().enregistre(self.getLibelleMesures(list(dataLot.columns)), ETAPE_REECHANTILLONNAGE, top,\
+                                        len(dataLot), self.getMetriques().tailleOctets(dataLot))
+        return resultats
+
+    def getRegleReechantillonnage(self,frequence):
+        """
+            Permet de récupérer la règle de rééchantillonnage pandas de la fréquence <frequence> (getFreqResampling du paramétrage)
+            Pour la fréquence D (dérivée des mesures horaires en traitement multi-fréquences), la règle quotidienne 'D' 
+            est utilisée si elle n'est pas définie dans le paramétrage
+        """
+        try:
+            regle = self.getParametrage().getFreqResampling(frequence)
+        except Exception:
+            if frequence != self.getParametrage().getLABEL_FREQ_D():
+                raise
+            regle = None
+        if not regle and frequence == self.getParametrage().getLABEL_FREQ_D():
+            return 'D'
+        return regle
+
+    def cumulsPartielsMA(self,dataLot,frequence):
+        """
+            Fonction de calcul des cumuls partiels M ou A de données horaires (valeurs déjà remplacées) de plusieurs mesures :
+            somme des valeurs, nombre de mesures valides (par mesure) et nombre total de mesures (par période)
+            Les cumuls de tranches successives s'additionnent (voir getMesuresXRParTranches)
+            Retourne le triplet (sommes, nbMes, nbTot)
+        """
+        reechantillonnage = dataLot.resample(self.getRegleReechantillonnage(frequence))
+        return reechantillonnage.sum(), reechantillonnage.count().astype(float), reechantillonnage.size().astype(float)
+
+    def finaliseAgregatsMA(self,moyennes,nbMes,nbTot,arrondi,representativite):
+        """
+            Fonction de finalisation des agrégats M ou A à partir des moyennes (non arrondies) et des comptages par période :
+                - arrondi des moyennes, taux de représentativité
+                - sélection des moyennes dont le taux est supérieur ou égal à <representativite>
+                - code de validation à 0 si la moyenne n'est pas retenue, 1 sinon
+            Les périodes sans aucune mesure sont écartées comme dans getMesuresFromXR
+            Retourne un dictionnaire nomCourt => structure de sortie identique à celle de getMesuresFromXR
+        """
+        from pyair import stats
+        moyennes = stats.getRound(moyennes,arrondi)
+        taux = stats.getRound(nbMes.div(nbTot,axis=0)*100,0)
+        valeurs = moyennes.where(taux >= float(representativite))
+
+        resultats = {}
+        for nomCourt in moyennes.columns:
+            presents = moyennes[nomCourt].notna()
+            valeursRetenues = valeurs.loc[presents, nomCourt]
+            resultats[nomCourt] = self.construitSortie(nomCourt,valeursRetenues.index,valeursRetenues,\
+                                                        np.select( [valeursRetenues.isna()], [0] , 1),arrondi)
+        return resultats
+
+    def getTranches(self,debut,fin,nbMois):
+        """
+            Fonction de découpage de la fenêtre [debut, fin] en tranches de <nbMois> mois alignées sur les débuts de mois
+            Retourne la liste des triplets (debutTranche, finTranche, debutTrancheSuivante), debutTrancheSuivante à None 
+            pour la dernière tranche
+        """
+        finFenetre = convertitDate(fin)
+        courant = convertitDate(debut).normalize()
+        debutTranche = debut
+        tranches = []
+        while True:
+            suivant = courant + pd.offsets.MonthBegin(nbMois)
+            if suivant > finFenetre:
+                tranches.append((debutTranche, fin, None))
+                return tranches
+            tranches.append((debutTranche, (suivant - pd.Timedelta(days=1)).strftime('%d/%m/%Y'), suivant))
+            debutTranche = suivant.strftime('%d/%m/%Y')
+            courant = suivant
+
+    def getMesuresXRParTranches(self,nomsCourts,debut,fin,frequence,arrondi,representativite):
+        """
+            Générateur de récupération M ou A par tranches de getNbMoisParTranche() mois d'un lot de mesures (nomsCourts) :
+                - récupération des données horaires d'une tranche (un appel pour le lot) et remplacement des valeurs
+                - addition des cumuls partiels de la tranche (cumulsPartielsMA) aux cumuls des périodes en cours
+                - finalisation et restitution (yield) des périodes terminées, qui sont retirées des cumuls
+            La mémoire utilisée est bornée par la taille d'une tranche et non par la longueur de la fenêtre
+            Chaque élément produit est un dictionnaire nomCourt => structure de sortie (comme getMesuresFromXRParLot)
+        """
+
+        nomFonction='getMesuresXRParTranches'
+        regle = self.getRegleReechantillonnage(frequence)
+        sommes, nbMes, nbTot = None, None, None
+        derniereDate = None
+
+        for debutTranche, finTranche, debutSuivante in self.getTranches(debut,fin,self.getNbMoisParTranche()):
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Tranche ['+str(debutTranche)+','+str(finTranche)+'] pour '+str(nomsCourts))
+            dataTranche, codesTranche = self.lireMesuresXR(list(nomsCourts),debutTranche,finTranche,frequence)
+            if dataTranche is not None and dataTranche.size > 0:
+                ## Une heure en limite de tranche n'est comptée qu'une fois
+                if derniereDate is not None:
+                    dataTranche = dataTranche[dataTranche.index > derniereDate]
+                if len(dataTranche) > 0:
+                    derniereDate = dataTranche.index.max()
+                    top = self.getMetriques().top()
+                    dataTranche = self.appliqueRemplacements(dataTranche, self.remplacementsValeurs).\
+                                        reindex(columns=list(nomsCourts)).astype(float)
+                    sommesTranche, nbMesTranche, nbTotTranche = self.cumulsPartielsMA(dataTranche,frequence)
+                    if sommes is None:
+                        sommes, nbMes, nbTot = sommesTranche, nbMesTranche, nbTotTranche
+                    else:
+                        sommes = sommes.add(sommesTranche, fill_value=0)
+                        nbMes = nbMes.add(nbMesTranche, fill_value=0)
+                        nbTot = nbTot.add(nbTotTranche, fill_value=0)
+                    self.getMetriques().enregistre(self.getLibelleMesures(nomsCourts), ETAPE_REECHANTILLONNAGE, top,\
+                                                    len(dataTranche), self.getMetriques().tailleOctets(dataTranche))
+                del dataTranche, codesTranche
+
+            if sommes is None or len(sommes) == 0:
+                continue
+
+            ## Périodes terminées : antérieures à la période contenant le début de la tranche suivante
+            if debutSuivante is None:
+                terminees = sommes.index == sommes.index
+            else:
+                periodeSuivante = pd.Series([0.0], index=[debutSuivante]).resample(regle).sum().index[0]
+                terminees = sommes.index < periodeSuivante
+            if terminees.any():
+                yield self.finaliseAgregatsMA(sommes[terminees].div(nbMes[terminees].where(nbMes[terminees] > 0)),\
+                                            nbMes[terminees], nbTot[terminees], arrondi, representativite)
+                sommes, nbMes, nbTot = sommes[~terminees], nbMes[~terminees], nbTot[~terminees]
+
+
+    def lireMesuresXR(self,mes,debut,fin,frequence):
+        """
+            Fonction de récupération des données brutes dans XR pour une mesure ou une liste de mesures (mes) :
+                - fréquence H ou D : mesures et codes de validation à la fréquence demandée
+                - fréquence M ou A : mesures horaires uniquement (les codes sont recalculés), codes à None
+                  lues dans la table horaire DIDON si getSourceAgregatsMA() vaut LABEL_SOURCE_DIDON
+            Retourne le couple (mesures, codes)
+        """
+        if frequence == self.getParametrage().getLABEL_FREQ_H() or frequence == self.getParametrage().getLABEL_FREQ_D():
+            return self.getMesuresXR(mes,debut,fin,frequence,True)
+        if self.getSourceAgregatsMA() == LABEL_SOURCE_DIDON:
+            return self.lireMesuresHorairesDidon(mes,debut,fin), None
+        return self.getMesuresXR(mes,debut,fin,str(self.getParametrage().getLABEL_FREQ_H()),False), None
+
+    def getMesuresXR(self,mes,debut,fin,frequence,brut):
+        """
+            Appel de pyair.xair.XAIR.get_mesures sur la connexion XR courante, au travers du cache local s'il est actif
+        """
+        top = self.getMetriques().top()
+        if self.getCacheXR() is not None:
+            resultat = self.getCacheXR().get_mesures(self.getConnXR(),mes,debut,fin,frequence,brut)
+        else:
+            resultat = self.getConnXR().get_mesures(mes=mes,debut=debut,fin=fin,freq=frequence,brut=brut)
+        self.getMetriques().enregistre(self.getLibelleMesures(mes), ETAPE_EXTRACTION_XR, top,\
+                                        len(resultat[0] if brut else resultat), self.getMetriques().tailleOctets(resultat))
+        return resultat
+
+    def getLibelleMesures(self,mes):
+        """
+            Retourne le libellé d'une mesure ou d'un lot de mesures (mes) utilisé dans les métriques
+        """
+        if isinstance(mes, str):
+            return mes
+        return '+'.join(str(nomCourt) for nomCourt in mes)
+
+    def lireMesuresHorairesDidon(self,mes,debut,fin):
+        """
+            Fonction de lecture dans la table horaire DIDON (getTable(H)) des mesures horaires d'une mesure ou d'une liste 
+            de mesures (mes) du jour de <debut> au jour de <fin> inclus, en remplacement de la récupération horaire XR
+            Seules les mesures de code de validation 1 sont conservées (comme les données validées XR), les autres 
+            heures de la grille horaire (de <debut> 00h à <fin> 23h) sont à NaN
+            Retourne une structure de données horaires avec une colonne par mesure
+        """
+
+        nomFonction='lireMesuresHorairesDidon'
+
+        nomsCourts = [mes] if isinstance(mes, str) else list(mes)
+        debutGrille = convertitDate(debut).normalize()
+        finGrille = convertitDate(fin).normalize() + pd.Timedelta(days=1)
+        tableHoraire = self.getTableQualifiee(self.getParametrage().getTable(self.getParametrage().getLABEL_FREQ_H()))
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                        'Lecture de '+str(len(nomsCourts))+' mesures dans '+tableHoraire+\
+                                                        ' de '+str(debutGrille)+' a '+str(finGrille))
+
+        top = self.getMetriques().top()
+        requete = text('SELECT nom_mes_court, date_mesure, valeur_mesure FROM '+tableHoraire+\
+                        ' WHERE nom_mes_court = ANY(:noms) AND date_mesure >= :debut AND date_mesure < :fin AND code_validation = 1')
+        with self.engineDidon.connect() as connexion:
+            horaires = pd.read_sql(requete, connexion, params={'noms': nomsCourts,
+                                                                'debut': debutGrille.to_pydatetime(),
+                                                                'fin': finGrille.to_pydatetime()})
+        self.getMetriques().enregistre(self.getLibelleMesures(nomsCourts), ETAPE_EXTRACTION_DIDON, top,\
+                                        len(horaires), self.getMetriques().tailleOctets(horaires))
+
+        grille = pd.date_range(debutGrille, finGrille - pd.Timedelta(hours=1), freq='h')
+        return horaires.pivot(index='date_mesure', columns='nom_mes_court', values='valeur_mesure').\
+                    reindex(index=grille, columns=nomsCourts).astype(float)
+
+    def transformeMesuresXR(self,nomCourt,dataVal,codesVal,frequence, arrondi, representativite):
+        """
+            Fonction de transformation des données XR (dataVal, codesVal) d'une mesure (nomCourt) en structure de sortie
+            Correspond aux étapes 1.2/ à 4/ décrites dans getMesuresFromXR
+        """
+
+        nomFonction='transformeMesuresXR'
+        dfmerge = None
 
         ## Traitement de l'arrondi et remplacement des valeurs de mesures selon la représentativité
         ## TODO cas du C6H6 qu'il faut arrondir à la décimale même si moyenne annuelle
 
         ## 1/ Si cas HORAIRE ou JOURNALIER : 
         if frequence == self.getParametrage().getLABEL_FREQ_H() or frequence == self.getParametrage().getLABEL_FREQ_D():
-            ## 1.1/ Récupération de la données avec les parametres <nomcourt>, <debut>, <fin>, et <frequence> d'appel
-            ## mesures et codes de validation sont récupérés
-            dataVal, codesVal = self.getConnXR().get_mesures(mes=nomCourt,debut=debut,fin=fin,freq=frequence,brut=True)
             etapeTravail='avant_remplacement_valeurs (cas D ou H)'
             self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
 
@@ -354,12 +1217,12 @@ class DidonGetMesures:
             if dataVal.size > 0:
                 ## 1.2.1/ Elle contient des données
                 ## Remplacement des valeurs à probleme dans la mesure en fonction du parametrage
-                for cleVal in self.getParametrage().getDictRemplacementValeurs():
-                    dataVal.replace(to_replace=cleVal,value=self.getParametrage().remplacerValeur(cleVal), inplace=True)
+                top = self.getMetriques().top()
+                dataVal = self.appliqueRemplacements(dataVal, self.remplacementsValeurs)
 
                 ## Remplacement des codes récupérés d'XR par 0 (invalide) ou 1 (valide) en fonction du paramétrage
-                for cleCode in self.getParametrage().getDictRemplacementCodes():
-                    codesVal.replace(to_replace=cleCode,value=self.getParametrage().remplacerCode(cleCode), inplace=True)
+                codesVal = self.appliqueRemplacements(codesVal, self.remplacementsCodes)
+                self.getMetriques().enregistre(nomCourt, ETAPE_REMPLACEMENT, top, len(dataVal), self.getMetriques().tailleOctets(dataVal, codesVal))
 
                 etapeTravail='avant_traitement_arrondis_et_representativite(cas D ou H)'
                 self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
@@ -367,16 +1230,24 @@ class DidonGetMesures:
                 ## Renommage des colonnes pour préparer la structure de données de sortie
                 etapeTravail='avant_renommage colonnes (cas D ou H)'
                 self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
-                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,str(dataVal))
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                lambda: self.getParametrage().getDidonLogger().resumeDataFrame(dataVal),'DEBUG')
                 dataVal.columns = ['valeur_mesure']
                 codesVal.columns = ['code_validation']
 
                 ## Fusion des dataframes de mesures et de codes pour finaliser la structure de données de sortie
                 etapeTravail='avant_fusion_dataframe (cas D ou H)'
                 self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
-                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'dataVal avant traitement : \n'+str(dataVal))
-                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'codesVal avant traitement : \n'+str(codesVal))
-                dfmerge=dataVal.join(codesVal)
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                lambda: 'dataVal avant traitement : \n'+\
+                                                                        self.getParametrage().getDidonLogger().resumeDataFrame(dataVal),'DEBUG')
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                lambda: 'codesVal avant traitement : \n'+\
+                                                                        self.getParametrage().getDidonLogger().resumeDataFrame(codesVal),'DEBUG')
+                codes = codesVal['code_validation']
+                if not codesVal.index.equals(dataVal.index):
+                    codes = codes.reindex(dataVal.index)
+                dfmerge=self.construitSortie(nomCourt,dataVal.index,dataVal['valeur_mesure'],codes,arrondi)
             else:
                 ## 1.2.2/ Elle contient des données
                 etapeTravail='cas de dataframe vide (cas D ou H)'
@@ -389,17 +1260,19 @@ class DidonGetMesures:
             ## la fréquence HORAIRE est utilisée car les mesures M et A sont recalculées et recontrolées par rapport
             ## au taux de représentativité (ce qui est automatique dans le cas 1/
             ## Seules les mesures sont récupérées (les codes sont recalculés) 
-            dataVal = self.getConnXR().get_mesures(mes=nomCourt,debut=debut,fin=fin,freq=str(self.getParametrage().getLABEL_FREQ_H()))
+            ## => récupération réalisée dans lireMesuresXR
 
             ## 2.2/ Contrôle de la structure de données récupérées
             if dataVal.size > 0:
                 ## 2.2.1/ Elle contient des données
+                from pyair import stats
                 etapeTravail='avant_remplacement_valeurs (cas M ou A)'
                 self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
 
                 ## Remplacement des valeurs à probleme dans la mesure en fonction du parametrage
-                for cleVal in self.getParametrage().getDictRemplacementValeurs():
-                    dataVal.replace(to_replace=cleVal,value=self.getParametrage().remplacerValeur(cleVal), inplace=True)
+                top = self.getMetriques().top()
+                dataVal = self.appliqueRemplacements(dataVal, self.remplacementsValeurs)
+                self.getMetriques().enregistre(nomCourt, ETAPE_REMPLACEMENT, top, len(dataVal), self.getMetriques().tailleOctets(dataVal))
 
                 ## Traitement des arrondis et reechantillonage de la donnée selon la fréaquence demandée
                 ## Ce traitement implique une nouvelle structure de données rééchantillonnées
@@ -407,6 +1280,8 @@ class DidonGetMesures:
                 self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
 
                 ## Calcul des moyennes à la frequence demandée sur la nouvelle structure de données
+                top = self.getMetriques().top()
+                nbLignesHoraires = len(dataVal)
                 resampleDF=stats.getRound(dataVal.resample(self.getParametrage().getFreqResampling(frequence)).mean(),arrondi)
                 etapeTravail='arrondi et reechantillonage (cas M ou A)'
                 self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
@@ -427,7 +1302,7 @@ class DidonGetMesures:
                 ## Fusion des structures de stockage du rééchantillonage de mesures et de statistiques
                 resampleDF=resampleDF.join(comptagesDF)
                 ## calcul du taux 
-                resampleDF['taux']=stats.getRound((resampleDF['nbMes'].astype(pd.np.float)/resampleDF['nbTot'].astype(pd.np.float)*100),0)
+                resampleDF['taux']=stats.getRound((resampleDF['nbMes'].astype(float)/resampleDF['nbTot'].astype(float)*100),0)
                 # self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'????????'+representativite+'?????????'+str(resampleDF))
 
                 ## Sélection des données pour lesquelles le comptage est supérieur ou égal au taux de representativité
@@ -439,6 +1314,7 @@ class DidonGetMesures:
 
                 ## Reaffectation des données rééchantillongées et recalculées pour préparer la structure de données de sortie
                 dataVal=pd.DataFrame(resampleDF,columns=[nomCourt],index=resampleDF.index)
+                self.getMetriques().enregistre(nomCourt, ETAPE_REECHANTILLONNAGE, top, nbLignesHoraires, self.getMetriques().tailleOctets(resampleDF))
                 ## Renommage des colonnes dans la structure de données de sortie
                 etapeTravail='avant_renommage colonnes (cas M ou A)'
                 self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
@@ -448,26 +1324,20 @@ class DidonGetMesures:
                 ## (validation non récupérée donc ajoutée explicitement)
                 etapeTravail='avant_ajout_colonnes_code_validation (cas M ou A)'
                 self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
-                dataVal['code_validation']=np.select( [dataVal['valeur_mesure'].isna()], [0] , 1)
+                codesCalcules=np.select( [dataVal['valeur_mesure'].isna()], [0] , 1)
 
-                ## Pas de fusion necessaire mais copie pour finalisation de la structure de données de sortie
-                etapeTravail='recopie_dataframe (cas M ou A)'
+                ## Pas de fusion necessaire : construction directe de la structure de données de sortie
+                etapeTravail='construction_structure_sortie (cas M ou A)'
                 self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
-                # self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'dataVal avant traitement : \n'+str(dataVal))
-                dfmerge=dataVal.copy()
+                dfmerge=self.construitSortie(nomCourt,dataVal.index,dataVal['valeur_mesure'],codesCalcules,arrondi)
             else:
                 ## 2.2.2/ Elle contient pas de donnée
-                SetapeTravail='cas de dataframe vide (cas M ou A)'
+                etapeTravail='cas de dataframe vide (cas M ou A)'
                 self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
 
         ## 3/ Controle de la structure de sortie
-        if (dfmerge is not None and dfmerge.size > 0):
-            ## 3.1/ Traitements si la structure de sortie contient des données : 
-            ## Ajout d'une colonne 'nom_mes_court' contenant nomCourt
-            dfmerge['nom_mes_court']=nomCourt
-            ## Ajout d'une colonne 'date_mesure' contenant la date de la mesure
-            dfmerge['date_mesure']=dfmerge.index.values
-        else:
+        ## 3.1/ Les colonnes 'nom_mes_court' et 'date_mesure' sont ajoutées par construitSortie
+        if (dfmerge is None or dfmerge.size == 0):
             ## 3.2/ Traitements si la structure de sortie ne contenant aucune donnée
             etapeTravail='cas de dataframe merge vide'
             self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
@@ -485,24 +1355,34 @@ class DidonGetMesures:
             Fonction de traitement et insertion en base de données DIDON 
             Cette fonction permet d'enchainer les differentes étapes :
                 - Controle de connexion : si l'une des 2 connexion XR ou Didon n'est pas établie alors arrêt du programme
-                    - Connexions Etablies 
+                    - Connexions Etablies : traitement de toutes les mesures du paramétrage sur les fenêtres des fréquences
+                      demandées (executeTraitement)
+                        - Plusieurs fréquences demandées (ex : HDMA) : traitement multi-fréquences (traiteLotMultiFrequences)
+                          avec les mêmes étapes d'écriture pour chaque fréquence, sinon :
                         - Traitements des parametres debut, fin representativite et arrondi (pour appel de getMesuresFromXR)
-                        - Boucle sur le nombre de mesures
+                        - Boucle sur les lots de getTailleLotXR() mesures (traiteLotMesures), séquentielle ou concurrente 
+                          si getNbWorkers() > 1
                             Appel de la fonction getMesuresFromXR permettant de récupérer la structure de données
                                 contenant le nom court, la date, la valeur et le code de validité de la mesure
                                 pour les paramêtres nomCourt, debut, fin, frequence, arrondi et representativite
                             Controle de la taille de la structure de données recuperee
-                            Traitements si la structure contient bien des données :
+                            Traitements si la structure contient bien des données en mode UPSERT ou PLAGE :
+                                Suppression et insertion du lot complet en une transaction (remplaceMesuresDidon)
+                            Traitements si la structure contient bien des données en mode UNITAIRE :
                                 Vérification de la présence de mesures en table DIDON pour la date_mesure. Si oui, suppression avant l'import
                                 Si il existe au moins un enregistrement alors suppression de tous les enregistrements
                                 Filtrage des mesures sans valeurs et sans code 
                                     (cas des mesures invalidées ou non remontées ie. station KO ou pas de station)
                                     Reconstruire une structure de données ne conservant que les lignes pour lesquelles 
                                     le code de validation est non null
-                                Insertion en base de données
+                                Insertion en base de données (to_sql ou COPY selon getModeInsertion())
                                     l'insertion peut être désactivée par parametrage (pour tests)
                             Traitement si la structure ne contient aucune données
+                        - Reprise des mesures en erreur (repriseMesuresEnErreur)
                         - Construction du cr final pour affichage dans les logs
+                        - Sauvegarde de l'état du mode incrémental (fréquences H et D)
+                        - Récapitulatif et export des métriques de performance
+                        - Eviction et compte rendu du cache XR
                     - L'une des deux connexions n'est pas établie
                 - Deconnexion XR et DIDON
                 - Affichage du statut de démarrage du programme
@@ -518,133 +1398,548 @@ class DidonGetMesures:
 
         ## Controle de connexion : si l'une des 2 connexion XR ou Didon n'est pas établie alors arrêt du programme
         if (self.getDIDONConnected() and self.getXRConnected()):
-            ## Connexions établies
+            ## Connexions établies : traitement des mesures du paramétrage sur les fenêtres des fréquences demandées
+            resultats = self.executeTraitement()
+
+            ## Construction du cr final pour affichage dans les logs (une section par fréquence en multi-fréquences)
+            for freq, resultat in resultats['frequences'].items():
+                self.ajouteCrFrequence(freq,resultat['debut'],resultat['fin'],resultats['nomsCourts'],\
+                                        [resultat['statuts'][nomCourt] for nomCourt in resultats['nomsCourts']])
+                if len(resultats['frequences']) > 1:
+                    self.crFinal += '\n'
+            if resultats['pipeline'] is not None:
+                self.crFinal += '\nPipeline (files de '+str(self.getTailleFilePipeline())+' lots) :\n'+\
+                                '\n'.join('  '+etape+' : traitement '+str(round(cumul[0], 3))+' s, attente entree '+\
+                                            str(round(cumul[1], 3))+' s, attente sortie '+str(round(cumul[2], 3))+' s, '+\
+                                            str(cumul[3])+' lots' for etape, cumul in resultats['pipeline'].items())+'\n'
+
+            ## Mode incrémental, métriques, cache XR et reconnexions
+            self.bilanTraitement()
+        else :
+            ## L'une des deux connexions n'est pas établie
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'Traitement impossible connexion XR et/ou Didon non établie')
+            self.crFinal += 'Erreur sur les connexions XR et/ou DIDON\nConnexion XR : ' + str(self.getXRConnected()) + \
+                            '\nConnexion DIDON : ' + str(self.getDIDONConnected())
+
+        ## Deconnexion XR et DIDON
+        self.disconnect()
+        ## Affichage du statut de démarrage du programme
+        self.afficheStatut(LABEL_FINALISATION)
+
+
+    def getFenetre(self,frequence):
+        """
+            Fonction de calcul de la fenêtre de traitement (debut, fin) de la fréquence <frequence> :
+            Cas A :
+                 date début = 01/01 de la derniereAnneeATraiter  (paramétrage) - NbAnneeATraiter (paramétrage)
+                 date fin = 31/12 de la derniereAnneeATraiter
+            Cas M :
+                 date début = date du traitement - le nbJrAtraiter (paramétrage)
+                 date fin = date de fin du mois de la date de traitement
+            Cas D :
+                 date début = date du traitement - le nbJrAtraiter (paramétrage)
+                 date fin = date du traitement
+            Cas H :
+                 date début = date du traitement - le nbJrAtraiter (paramétrage)
+                 date fin = date du traitement
+            Retourne le couple (debut, fin) de chaines vides si la fréquence est inconnue
+        """
+
+        nomFonction='getFenetre'
+
+        debut=''
+        fin=''
+        if str(frequence) == self.getParametrage().getLABEL_FREQ_A():
+            debut = '01/01/' + str(self.getParametrage().getDerniereAnneeATraiter() - \
+                                    self.getParametrage().getNbAnneesATraiter() + 1)
+            fin = '31/12/' + str(self.getParametrage().getDerniereAnneeATraiter())
+        elif str(frequence) == self.getParametrage().getLABEL_FREQ_M():
+            debut = str(self.getDateTraitement() - datetime.timedelta(self.getParametrage().getNbJoursATraiter()))
+            firstdayOfMonth, lastdayOfMonth=calendar.monthrange(self.getDateTraitement().year, self.getDateTraitement().month)
+            fin = str(lastdayOfMonth)+'/'+str(self.getDateTraitement().month)+'/'+str(self.getDateTraitement().year)
+        elif str(frequence) == self.getParametrage().getLABEL_FREQ_D():
+            debut = str(self.getDateTraitement() - datetime.timedelta(self.getParametrage().getNbJoursATraiter()))
+            fin = str(self.getDateTraitement())
+        elif str(frequence) == self.getParametrage().getLABEL_FREQ_H():
+            debut = str(self.getDateTraitement() - datetime.timedelta(self.getParametrage().getNbJoursATraiter()))
+            fin = str(self.getDateTraitement())
+        else :
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Traitement impossible - choix de la frequence erroné')
+            self.crFinal += 'Erreur sur le choix de la frequence : '+ str(frequence)
+        return debut, fin
+
+    def getLotsMesures(self,nomsCourts):
+        """
+            Fonction de découpage des mesures <nomsCourts> en lots de getTailleLotXR() mesures
+        """
+        return [nomsCourts[i:i+self.getTailleLotXR()] for i in range(0, len(nomsCourts), self.getTailleLotXR())]
+
+    def ajouteCrFrequence(self,frequence,debut,fin,nomsCourts,statuts):
+        """
+            Fonction d'ajout au cr final du compte rendu de la fréquence <frequence> sur la fenêtre [debut, fin]
+            à partir des statuts de traiteMesure des mesures <nomsCourts> (dans le même ordre) :
+            les mesures traitées et non traitées sont listées dans l'ordre du paramétrage
+            puis les mesures restées en erreur après reprise (repriseMesuresEnErreur)
+        """
+        mesuresTraitees = [nomCourt for nomCourt, statut in zip(nomsCourts, statuts) if statut is True]
+        mesuresNonTraitees = [nomCourt for nomCourt, statut in zip(nomsCourts, statuts) if statut is False]
+        mesuresEnErreur = [nomCourt for nomCourt, statut in zip(nomsCourts, statuts) if statut is None]
+
+        self.crFinal += 'Sur frequence = "' + str(frequence) + '" (table mise a jour : '+self.getTableAUtiliser(frequence)+') \nDate de debut : '+\
+                        debut+'\nDate de fin : '+fin+ '\nDurée de traitement : %s seconds ' % round((time.time() - self.start_time))+'\n' + \
+                        str(len(mesuresTraitees))+' mesures traitées sur '+str(len(nomsCourts))+'\n'
+
+        self.crFinal +=  'Mesures traitees : '+str(mesuresTraitees)+'\n'
+        if len(mesuresNonTraitees) > 0:
+            self.crFinal +=  'Mesures non traitees : '+str(mesuresNonTraitees)
+        if len(mesuresEnErreur) > 0:
+            self.crFinal +=  '\nMesures en erreur : '+str(mesuresEnErreur)
+
+    def isStatutEnErreur(self,statut):
+        """
+            Permet de savoir si le statut d'une mesure est en erreur : None, ou au moins une fréquence en erreur 
+            (statut None) en traitement multi-fréquences
+        """
+        return statut is None or (isinstance(statut, dict) and None in statut.values())
+
+    def repriseMesuresEnErreur(self,traitementLot,nomsCourts,statuts,*parametres):
+        """
+            Fonction de reprise en fin de traitement des mesures en erreur (statut None, ou au moins une fréquence 
+            en erreur en traitement multi-fréquences) : jusqu'à getNbReprisesMesures() passes, chaque mesure en erreur
+            est retraitée seule par <traitementLot> (traiteLotMesures ou traiteLotMultiFrequences) avec les <parametres>,
+            après un délai exponentiel de la politique de reprise
+            Retourne les statuts mis à jour dans l'ordre de <nomsCourts>
+        """
+
+        nomFonction='repriseMesuresEnErreur'
+
+        statuts = list(statuts)
+        for passe in range(self.getNbReprisesMesures()):
+            enErreur = [i for i, statut in enumerate(statuts) if self.isStatutEnErreur(statut)]
+            if len(enErreur) == 0:
+                break
+            delai = self.getReprise().getDelai(passe)
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Reprise '+str(passe+1)+'/'+str(self.getNbReprisesMesures())+' dans '+\
+                                                            str(delai)+' s des mesures en erreur : '+str([nomsCourts[i] for i in enErreur]))
+            time.sleep(delai)
+            lots = [[nomsCourts[i]] for i in enErreur]
+            if self.getNbWorkers() > 1:
+                statutsLots = self.traiteLotsEnParallele(traitementLot,lots,*parametres)
+            else:
+                statutsLots = [traitementLot(lot,*parametres) for lot in lots]
+            for i, statutsLot in zip(enErreur, statutsLots):
+                statuts[i] = statutsLot[0]
+        return statuts
+
+    def executeTraitement(self,nomsCourts=None,frequences=None,debut=None,fin=None):
+        """
+            Fonction de traitement (récupération XR, transformation et écriture en base DIDON et dans les sorties) 
+            des mesures <nomsCourts> pour les fréquences <frequences>, réutilisable entre plusieurs exécutions : 
+            les connexions XR et DIDON, le schéma des tables et le cache XR sont conservés (pas de déconnexion)
+                - <nomsCourts> : liste des mesures (toutes les mesures du paramétrage par défaut)
+                - <frequences> : liste des fréquences (fréquences du constructeur par défaut), préparées si besoin 
+                  (prepareFrequences)
+                - <debut> <fin> : fenêtre explicite commune à toutes les fréquences (dates jj/mm/aaaa), à défaut 
+                  fenêtre de chaque fréquence calculée à partir du paramétrage (getFenetre)
+            Etapes :
+                - une fréquence : boucle sur les lots de getTailleLotXR() mesures (traiteLotMesures), le mode incrémental
+                  n'étant utilisé que pour la fréquence du constructeur sans fenêtre explicite
+                - plusieurs fréquences : traitement multi-fréquences en une seule passe (traiteLotMultiFrequences)
+                  avec une seule récupération horaire par lot dont sont dérivées toutes les fréquences
+                - traitement en pipeline si getTailleFilePipeline() > 0 (creePipeline, hors traitement M ou A 
+                  par tranches), sinon séquentiel ou concurrent si getNbWorkers() > 1, puis reprise des mesures en erreur 
+                  (repriseMesuresEnErreur)
+                - fin de chargement des sorties supplémentaires (termineSorties)
+                - sauvegarde de l'état du mode incrémental
+            Les partitions des tables DIDON couvrant les fenêtres sont créées au préalable (preparePartitions)
+            Les métriques de performance, les compteurs du mode DIFF et les compteurs du cache XR sont réinitialisés
+            à chaque exécution
+            Retourne le dictionnaire des résultats :
+                { 'nomsCourts' : liste des mesures,
+                  'frequences' : { frequence : { 'debut', 'fin', 'statuts' : { nomCourt : statut de traiteMesure } } },
+                  'metriques' : métriques cumulées par étape (DidonMetriques.getParEtape),
+                  'pipeline' : temps de traitement et d'attente par étape du pipeline (DidonPipeline.getParEtape, None sans pipeline),
+                  'duree' : durée du traitement (secondes) }
+            Lève RuntimeError si les connexions XR et DIDON ne sont pas établies, ValueError si une fréquence n'est pas autorisée
+        """
+
+        nomFonction='executeTraitement'
+
+        if not (self.getDIDONConnected() and self.getXRConnected()):
+            raise RuntimeError('Traitement impossible connexion XR et/ou Didon non etablie')
+        debutTraitement = time.time()
+        nomsCourts = list(self.getParametrage().getNomsCourtsMesures() if nomsCourts is None else nomsCourts)
+        frequences = list(self.getFrequencesMesure() if frequences is None else frequences)
+        self.prepareFrequences(frequences)
+        self.metriques = DidonMetriques(''.join(frequences), self.getParametrage().getDidonLogger())
+        with self.verrouCompteurs:
+            self.compteursDiff = {}
+        if self.getCacheXR() is not None:
+            self.getCacheXR().reinitialiseCompteurs()
+
+        fenetres = {}
+        for freq in frequences:
+            fenetres[freq] = (debut, fin) if debut is not None and fin is not None else self.getFenetre(freq)
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            '[debut,fin]=['+str(fenetres[freq][0])+','+str(fenetres[freq][1])+'] ; freq='+str(freq)+\
+                                                            ' pour '+str(len(nomsCourts))+' mesures')
+        self.preparePartitions(fenetres)
+
+        lots = self.getLotsMesures(nomsCourts)
+        if len(frequences) > 1:
+            ## Traitement multi-fréquences en une seule passe
+            traitementLot, parametres = self.traiteLotMultiFrequences, (fenetres,)
+        else:
             ## Traitements des parametres debut, fin representativite et arrondi (pour appel de getMesuresFromXR)
-            arrondi=self.getParametrage().getArrondi(self.frequenceMesure)
-            representativite=str(self.getParametrage().getRepresentativite(str(self.frequenceMesure)))
-            ## Cas A :
-            ##      date début = 01/01 de la derniereAnneeATraiter  (paramétrage) - NbAnneeATraiter (paramétrage)
-            ##      date fin = 31/12 de la derniereAnneeATraiter
-            ## Cas M :
-            ##      date début = date du traitement - le nbJrAtraiter (paramétrage)
-            ##      date fin = date de fin du mois de la date de traitement
-            ## Cas D :
-            ##      date début = date du traitement - le nbJrAtraiter (paramétrage)
-            ##      date fin = date du traitement
-            ## Cas H :
-            ##      date début = date du traitement - le nbJrAtraiter (paramétrage)
-            ##      date fin = date du traitement
-            debut=''
-            fin=''
-            if str(self.frequenceMesure) == self.getParametrage().getLABEL_FREQ_A():
-                debut = '01/01/' + str(self.getParametrage().getDerniereAnneeATraiter() - \
-                                        self.getParametrage().getNbAnneesATraiter() + 1)
-                fin = '31/12/' + str(self.getParametrage().getDerniereAnneeATraiter())
-            elif str(self.frequenceMesure) == self.getParametrage().getLABEL_FREQ_M():
-                debut = str(self.getDateTraitement() - datetime.timedelta(self.getParametrage().getNbJoursATraiter()))
-                firstdayOfMonth, lastdayOfMonth=calendar.monthrange(self.getDateTraitement().year, self.getDateTraitement().month)
-                fin = str(lastdayOfMonth)+'/'+str(self.getDateTraitement().month)+'/'+str(self.getDateTraitement().year)
-            elif str(self.frequenceMesure) == self.getParametrage().getLABEL_FREQ_D():
-                debut = str(self.getDateTraitement() - datetime.timedelta(self.getParametrage().getNbJoursATraiter()))
-                fin = fin = str(self.getDateTraitement())
-            elif str(self.frequenceMesure) == self.getParametrage().getLABEL_FREQ_H():
-                debut = str(self.getDateTraitement() - datetime.timedelta(self.getParametrage().getNbJoursATraiter()))
-                fin = fin = str(self.getDateTraitement())
-            else :
-                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
-                                                                'Traitement impossible - choix de la frequence erroné')
-                self.crFinal += 'Erreur sur le choix de la frequence : '+ str(self.frequenceMesure)
+            ## Fréquence None : fréquence du constructeur avec mode incrémental (traiteLotMesures)
+            freq = frequences[0]
+            arrondi=self.getParametrage().getArrondi(freq)
+            representativite=str(self.getParametrage().getRepresentativite(str(freq)))
+            frequenceLot = None if freq == self.frequenceMesure and debut is None and fin is None else freq
+            traitementLot, parametres = self.traiteLotMesures, (fenetres[freq][0],fenetres[freq][1],arrondi,representativite,frequenceLot)
+
+        ## Boucle sur les lots de mesures (en pipeline, séquentielle ou concurrente selon le nombre de workers)
+        pipeline = None
+        parTranches = self.getNbMoisParTranche() > 0 and len(frequences) == 1 and \
+                        str(frequences[0]) in (self.getParametrage().getLABEL_FREQ_M(), self.getParametrage().getLABEL_FREQ_A())
+        if self.getTailleFilePipeline() > 0 and not parTranches:
+            pipeline = self.creePipeline(fenetres,frequenceLot if len(frequences) == 1 else None)
+            statutsLots = pipeline.execute(lots, self.erreurLotPipeline)
+        elif self.getNbWorkers() > 1:
+            statutsLots = self.traiteLotsEnParallele(traitementLot,lots,*parametres)
+        else:
+            statutsLots = [traitementLot(lot,*parametres) for lot in lots]
+        statuts = [statut for statutsLot in statutsLots for statut in statutsLot]
+        statuts = self.repriseMesuresEnErreur(traitementLot,nomsCourts,statuts,*parametres)
+        self.termineSorties()
+
+        ## Sauvegarde de l'état du mode incrémental
+        if self.getEtatIncremental() is not None:
+            self.getEtatIncremental().sauvegarde()
+
+        ## Statuts par fréquence : statut None (erreur) pour toutes les fréquences si le lot multi-fréquences est en erreur
+        resultats = {'nomsCourts': nomsCourts, 'frequences': {}}
+        for freq in frequences:
+            if len(frequences) > 1:
+                statutsFreq = [statut.get(freq) if isinstance(statut, dict) else statut for statut in statuts]
+            else:
+                statutsFreq = statuts
+            resultats['frequences'][freq] = {'debut': fenetres[freq][0], 'fin': fenetres[freq][1],
+                                            'statuts': dict(zip(nomsCourts, statutsFreq))}
+        resultats['metriques'] = self.getMetriques().getParEtape()
+        resultats['pipeline'] = None if pipeline is None else pipeline.getParEtape()
+        resultats['duree'] = time.time() - debutTraitement
+        return resultats
+
+    def creePipeline(self,fenetres,frequenceLot):
+        """
+            Fonction de création du pipeline (DidonPipeline, files de getTailleFilePipeline() lots) de traitement des lots 
+            de mesures sur les fenêtres <fenetres> (frequence => (debut, fin)) :
+                - une fréquence (<frequenceLot> : fréquence de traiteLotMesures, None pour la fréquence principale) :
+                    - extraction : début incrémental du lot et récupération XR (lireMesuresXR)
+                    - transformation : transformeMesuresXR pour un lot d'une mesure, transformeLotXR sinon
+                    - chargement : écriture de chaque mesure via traiteMesure
+                - plusieurs fréquences : lireMesuresMultiFrequences, deriveMesuresMultiFrequences puis ecritLotMultiFrequences
+            Les étapes sont celles de traiteLotMesures et traiteLotMultiFrequences, avec les mêmes statuts
+        """
+        if len(fenetres) > 1:
+            return DidonPipeline(lambda lot: self.lireMesuresMultiFrequences(lot,fenetres),\
+                                lambda lot, lecture: self.deriveMesuresMultiFrequences(lot,fenetres,*lecture),\
+                                lambda lot, lotsXR: self.ecritLotMultiFrequences(lot,fenetres,lotsXR),\
+                                self.getTailleFilePipeline(), self.getParametrage().getDidonLogger())
+
+        freq = list(fenetres)[0]
+        debut, fin = fenetres[freq]
+        arrondi=self.getParametrage().getArrondi(freq)
+        representativite=str(self.getParametrage().getRepresentativite(str(freq)))
+
+        def extraction(lot):
+            debutLot = self.getDebutIncremental(lot, debut) if frequenceLot is None else debut
+            dataVal, codesVal = self.lireMesuresXR(lot[0] if len(lot) == 1 else list(lot),debutLot,fin,str(freq))
+            return debutLot, dataVal, codesVal
+
+        def transformation(lot, lecture):
+            debutLot, dataVal, codesVal = lecture
+            if len(lot) == 1:
+                return debutLot, {lot[0]: self.transformeMesuresXR(lot[0],dataVal,codesVal,str(freq),arrondi,representativite)}
+            return debutLot, self.transformeLotXR(lot,dataVal,codesVal,str(freq),arrondi,representativite)
+
+        def chargement(lot, transformes):
+            debutLot, lotXR = transformes
+            return [self.traiteMesure(nomCourt,debutLot,fin,arrondi,representativite,lotXR,frequenceLot) for nomCourt in lot]
+
+        return DidonPipeline(extraction, transformation, chargement, self.getTailleFilePipeline(), self.getParametrage().getDidonLogger())
+
+    def erreurLotPipeline(self,nomsCourts,etape,erreur):
+        """
+            Fonction de traitement de l'erreur <erreur> de l'étape <etape> du pipeline sur le lot <nomsCourts> : 
+            trace de l'erreur et statut None (erreur) pour chaque mesure du lot
+        """
+
+        nomFonction='erreurLotPipeline'
+
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                        'Erreur de l\'etape '+str(etape)+' du pipeline pour le lot '+str(nomsCourts),'ERROR')
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                        'Exception levée : %s'%erreur,'ERROR')
+        return [None for nomCourt in nomsCourts]
+
+    def traiteLotMultiFrequences(self,nomsCourts,fenetres):
+        """
+            Fonction de traitement multi-fréquences d'un lot de mesures (nomsCourts) :
+                - récupération horaire et dérivation de toutes les fréquences (getMesuresMultiFrequences)
+                - écriture de chaque fréquence dans sa table DIDON via traiteMesure
+            Retourne la liste, dans l'ordre de <nomsCourts>, des dictionnaires frequence => statut de traiteMesure
+            (None pour chaque mesure si la récupération du lot est en erreur)
+        """
+
+        nomFonction='traiteLotMultiFrequences'
+
+        try:
+            lotsXR = self.getMesuresMultiFrequences(nomsCourts,fenetres)
+        except Exception as error:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Erreur lors de la récupération XR multi-fréquences du lot '+str(nomsCourts),'ERROR')
             self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
-                                                            '[debut,fin]=['+debut+','+fin+'] ; freq='+str(self.frequenceMesure)+\
-                                                            ' et arrondi='+str(arrondi))
+                                                            'Exception levée : %s'%error,'ERROR')
+            return [None for nomCourt in nomsCourts]
+        return self.ecritLotMultiFrequences(nomsCourts,fenetres,lotsXR)
 
-            ## Boucle sur le nombre de mesures
-            mesuresNonTraitees = []
-            mesuresTraitees = []
-            for nomCourt in self.getParametrage().getNomsCourtsMesures():
+    def ecritLotMultiFrequences(self,nomsCourts,fenetres,lotsXR):
+        """
+            Fonction d'écriture de chaque fréquence de <fenetres> des structures de sortie <lotsXR> (issues de 
+            getMesuresMultiFrequences) d'un lot de mesures (nomsCourts) dans sa table DIDON via traiteMesure
+            Retourne la liste, dans l'ordre de <nomsCourts>, des dictionnaires frequence => statut de traiteMesure
+        """
+        statuts = [{} for nomCourt in nomsCourts]
+        for freq in fenetres:
+            debut, fin = fenetres[freq]
+            arrondi=self.getParametrage().getArrondi(freq)
+            representativite=str(self.getParametrage().getRepresentativite(str(freq)))
+            for statut, nomCourt in zip(statuts, nomsCourts):
+                statut[freq] = self.traiteMesure(nomCourt,debut,fin,arrondi,representativite,lotsXR[freq],freq)
+        return statuts
+
+    def getBornesFenetre(self,frequence,debut,fin):
+        """
+            Fonction de conversion de la fenêtre [debut, fin] de la fréquence <frequence> en bornes (Timestamp) de sélection 
+            des mesures horaires [debutFenetre, finFenetre[ : jour de <debut> et jour suivant <fin>, quelle que soit 
+            la fréquence et même si <debut> ou <fin> sont horodatés (fenêtre getFenetre de la fréquence H), comme 
+            la récupération XR mono-fréquence qui porte sur des jours entiers
+        """
+        debutFenetre = convertitDate(debut).normalize()
+        finFenetre = convertitDate(fin).normalize() + pd.Timedelta(days=1)
+        return debutFenetre, finFenetre
 
-                try:
-                    ##creation d'une variable utilisee en cas d'exception
-                    etapeTravail='etape_avant_get_mesure'
-                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail+' nomCourt='+str(nomCourt))
-
-                    ## Appel de la fonction getMesuresFromXR permettant de récupérer la structure de données
-                    ## contenant le nom court, la date, la valeur et le code de validité de la mesure
-                    ## pour les paramêtres nomCourt, debut, fin, frequence, arrondi et representativite
-                    valEtCodes = self.getMesuresFromXR(nomCourt,debut,fin,str(self.frequenceMesure), arrondi, representativite)
-                    etapeTravail='etape_apres_get_mesure'
-                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
+    def getMesuresMultiFrequences(self,nomsCourts,fenetres):
+        """
+            Fonction de récupération en un seul appel des mesures horaires d'un lot de mesures (nomsCourts) sur la fenêtre 
+            englobant les fenêtres <fenetres> (frequence => (debut, fin)) de toutes les fréquences traitées, 
+            puis de dérivation de chaque fréquence sur sa propre fenêtre (getBornesFenetre) :
+                - H : structure de sortie des mesures et codes horaires (comme transformeMesuresXR)
+                - D, M et A : agrégation (agregeMesuresMA) des seules mesures horaires valides (code de validation 1 après 
+                  remplacement des codes), selon la règle de rééchantillonnage et la représentativité de la fréquence
+            Les mesures horaires sont récupérées dans XR avec leurs codes de validation, ou, si la fréquence H n'est pas 
+            traitée et que getSourceAgregatsMA() vaut LABEL_SOURCE_DIDON, dans la table horaire DIDON (mesures valides)
+            Retourne un dictionnaire frequence => { nomCourt => structure de sortie (None si aucune donnée) }
+        """
 
-                    ## Controle de la taille de la structure de données recuperee
-                    if (valEtCodes  is not None and valEtCodes.size > 0):
-                        ## Traitements si la structure contient bien des données :
-                        ## Vérification de la présence de mesures en table DIDON pour la date_mesure. Si oui, suppression avant l'import
-                        etapeTravail='avant_controle_donnes_existantes'
-                        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
-                        records = self.sessionDidon.query(self.mesureDBDidon).\
-                                filter(self.mesureDBDidon.date_mesure.in_(valEtCodes.date_mesure),
-                                    self.mesureDBDidon.nom_mes_court.in_(valEtCodes.nom_mes_court)).first()
-
-                        if records is not None:
-                            ## Si il existe au moins un enregistrement alors suppression de tous les enregistrements
-                            etapeTravail='avant_recuperation_nb_donnees_existantes'
-                            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
-                            nb = self.sessionDidon.query(self.mesureDBDidon).\
-                                filter(self.mesureDBDidon.date_mesure.in_(valEtCodes.date_mesure),
-                                    self.mesureDBDidon.nom_mes_court.in_(valEtCodes.nom_mes_court)).count()
-                            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,str(nb)+' mesures déja existantes dans la table ' + \
-                                                                            str(self.getTableAUtiliser()) + ' pour ' + str(nomCourt))
-
-                            etapeTravail='avant_supression_donnees_existantes'
-                            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
-                            self.sessionDidon.query(self.mesureDBDidon).\
-                                filter(and_(self.mesureDBDidon.date_mesure.in_(valEtCodes.date_mesure),
-                                        self.mesureDBDidon.nom_mes_court.in_(valEtCodes.nom_mes_court))).delete(synchronize_session=False)
-                            self.sessionDidon.commit()
-                            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'Suppression des mesures '+ str(nomCourt) +' dans ' + \
-                                                                            str(self.getTableAUtiliser()) + ' avant ré-injection terminée')
-                        else:
-                            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'Pas de suppression à realiser')
-
-                        ## Filtrage des mesures sans valeurs et sans code 
-                        ## (cas des mesures invalidées ou non remontées ie. station KO ou pas de station)
-                        ## Reconstruire une structure de données ne conservant que les lignes pour lesquelles 
-                        ## le code de validation est non null
-                        etapeTravail='avant_retrait_donnes_sans_mesure'
-                        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
-                        valEtCodes=valEtCodes[valEtCodes['code_validation'].notna()]
-                        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'apres nettoyage : \n'+str(valEtCodes))
-
-                        ## Insertion en base de données
-                        ## l'insertion peut être désactivée par parametrage (pour tests)
-                        etapeTravail='avant_insertion_nouvelles_donnees'
-                        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
-                        if self.getParametrage().getIsDBinsertionActivatedBool() == True:
-                            valEtCodes.to_sql(self.getTableAUtiliser(),self.engineDidon, schema='mesure', if_exists='append', index=False, index_label='date_mesure')
-                        else:
-                            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'!! DEBUG !! !! DEBUG !! !! DEBUG !!insertion en base desactivee !! DEBUG !! !! DEBUG !! !! DEBUG !!')
-                        mesuresTraitees.append(nomCourt)
-                        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'dataframe insérées en base DIDON ')
-                    else:
-                        ## Traitement si la structure ne contient aucune donnée
-                        mesuresNonTraitees.append(nomCourt)
-                        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
-                                                                        'nomCourt='+str(nomCourt)+' : aucune donnee recuperee depuis XR')
-                except Exception as error:
-                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
-                                                                    'Erreur lors des traitements en base DIDON du dataframe en base DIDON : '+etapeTravail,'ERROR')
-                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
-                                                                    'Exception levée : %s'%error,'ERROR')
-                    print(error)
+        dataLot, codesLot, bornes = self.lireMesuresMultiFrequences(nomsCourts,fenetres)
+        return self.deriveMesuresMultiFrequences(nomsCourts,fenetres,dataLot,codesLot,bornes)
 
-            ## Construction du cr final pour affichage dans les logs
-            self.crFinal += 'Sur frequence = "' + self.frequenceMesure + '" (table mise a jour : '+self.getTableAUtiliser()+') \nDate de debut : '+\
-                            debut+'\nDate de fin : '+fin+ '\nDurée de traitement : %s seconds ' % round((time.time() - self.start_time))+'\n' + \
-                            str(len(mesuresTraitees))+' mesures traitées sur '+str(len(self.getParametrage().getNomsCourtsMesures()))+'\n'
+    def lireMesuresMultiFrequences(self,nomsCourts,fenetres):
+        """
+            Fonction de récupération en un seul appel des mesures horaires d'un lot de mesures (nomsCourts) sur la fenêtre 
+            englobant les fenêtres <fenetres> de toutes les fréquences traitées (première étape de getMesuresMultiFrequences)
+            Retourne le triplet (mesures, codes, bornes de la fenêtre de chaque fréquence)
+        """
+
+        nomFonction='lireMesuresMultiFrequences'
 
-            self.crFinal +=  'Mesures traitees : '+str(mesuresTraitees)+'\n'
-            if len(mesuresNonTraitees) > 0:
-                self.crFinal +=  'Mesures non traitees : '+str(mesuresNonTraitees)
+        bornes = {}
+        for freq in fenetres:
+            bornes[freq] = self.getBornesFenetre(freq,fenetres[freq][0],fenetres[freq][1])
+        debutLecture = min(debutFenetre for debutFenetre, finFenetre in bornes.values())
+        finLecture = max(finFenetre for debutFenetre, finFenetre in bornes.values()) - pd.Timedelta(hours=1)
+        debut, fin = debutLecture.strftime('%d/%m/%Y'), finLecture.strftime('%d/%m/%Y')
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                        'Lecture horaire de '+str(nomsCourts)+' de '+debut+' a '+fin+\
+                                                        ' pour les frequences '+''.join(fenetres))
+
+        frequenceH = self.getParametrage().getLABEL_FREQ_H()
+        if frequenceH not in fenetres and self.getSourceAgregatsMA() == LABEL_SOURCE_DIDON:
+            dataLot, codesLot = self.lireMesuresHorairesDidon(list(nomsCourts),debut,fin), None
+        else:
+            dataLot, codesLot = self.getMesuresXR(list(nomsCourts),debut,fin,str(frequenceH),True)
+        return dataLot, codesLot, bornes
+
+    def deriveMesuresMultiFrequences(self,nomsCourts,fenetres,dataLot,codesLot,bornes):
+        """
+            Fonction de dérivation de chaque fréquence de <fenetres> sur ses bornes <bornes> à partir des mesures horaires
+            (dataLot, codesLot) d'un lot de mesures (nomsCourts), comme décrit dans getMesuresMultiFrequences
+            Retourne un dictionnaire frequence => { nomCourt => structure de sortie (None si aucune donnée) }
+        """
+        frequenceH = self.getParametrage().getLABEL_FREQ_H()
+        resultats = {}
+        for freq in fenetres:
+            resultats[freq] = {nomCourt: None for nomCourt in nomsCourts}
+        if dataLot is None or dataLot.size == 0:
+            return resultats
+
+        ## Remplacement des valeurs et des codes en une passe pour toutes les fréquences
+        top = self.getMetriques().top()
+        dataLot = self.appliqueRemplacements(dataLot.reindex(columns=list(nomsCourts)), self.remplacementsValeurs)
+        if codesLot is not None:
+            codesLot = self.appliqueRemplacements(codesLot.reindex(index=dataLot.index, columns=list(nomsCourts)), self.remplacementsCodes)
+        self.getMetriques().enregistre(self.getLibelleMesures(nomsCourts), ETAPE_REMPLACEMENT, top,\
+                                        len(dataLot), self.getMetriques().tailleOctets(dataLot, codesLot))
+
+        for freq in fenetres:
+            debutFenetre, finFenetre = bornes[freq]
+            periode = (dataLot.index >= debutFenetre) & (dataLot.index < finFenetre)
+            if not periode.any():
+                continue
+            arrondi=self.getParametrage().getArrondi(freq)
+            if freq == frequenceH:
+                dataFreq, codesFreq = dataLot.loc[periode], codesLot.loc[periode]
+                for nomCourt in nomsCourts:
+                    resultats[freq][nomCourt] = self.construitSortie(nomCourt,dataFreq.index,dataFreq[nomCourt],codesFreq[nomCourt],arrondi)
+            else:
+                valides = dataLot.loc[periode]
+                if codesLot is not None:
+                    valides = valides.where(codesLot.loc[periode].apply(pd.to_numeric, errors='coerce') == 1)
+                resultats[freq].update(self.agregeMesuresMA(valides.astype(float),freq,arrondi,\
+                                                            str(self.getParametrage().getRepresentativite(str(freq)))))
+        return resultats
+
+    def bilanTraitement(self):
+        """
+            Fonction de fin de traitement commune à traiteMesures et traiteRattrapage :
+                - compte rendu du mode incrémental (fréquences H et D, état sauvegardé par executeTraitement)
+                - récapitulatif et export des métriques de performance
+                - éviction et compte rendu du cache XR
+                - compte rendu des différences écrites en mode DIFF
+                - compte rendu des sorties supplémentaires du paramétrage
+                - compte rendu des statistiques réglementaires recalculées
+                - compte rendu des reconnexions XR
+        """
+        ## Compte rendu du mode incrémental
+        if self.getEtatIncremental() is not None:
+            self.crFinal += '\nMode incremental (revalidation de '+str(self.nbHeuresRevalidation)+' heures)'
+
+        ## Récapitulatif et export des métriques de performance
+        self.exporteMetriques()
+
+        ## Compte rendu et éviction du cache XR
+        if self.getCacheXR() is not None:
+            self.getCacheXR().evince()
+            self.crFinal += '\nCache XR : '+str(self.getCacheXR().getNbHits())+' partitions lues en cache (hit), '+\
+                            str(self.getCacheXR().getNbMiss())+' partitions recuperees depuis XR (miss)'
+
+        ## Compte rendu des différences écrites en mode DIFF
+        if self.getModeRemplacement() == LABEL_REMPLACEMENT_DIFF:
+            for freq in self.getFrequencesMesure():
+                compteurs = self.compteursDiff.get(freq, [0, 0, 0, 0])
+                self.crFinal += '\nMode DIFF (frequence '+str(freq)+') : '+str(compteurs[0])+' lignes inserees, '+\
+                                str(compteurs[1])+' mises a jour, '+str(compteurs[2])+' supprimees, '+str(compteurs[3])+' inchangees'
+
+        ## Compte rendu des sorties supplémentaires du paramétrage
+        for sortie in self.sortiesParametrees:
+            self.crFinal += '\nSortie '+sortie.getLibelle()+' : '+str(sortie.getNbLignes())+' lignes ecrites'
+
+        ## Compte rendu des statistiques réglementaires
+        if self.getStatistiques() is not None:
+            self.crFinal += '\nStatistiques : '+str(self.getStatistiques().getNbJoursMaj())+' jours et '+\
+                            str(self.getStatistiques().getNbAnneesMaj())+' annees recalcules'
+
+        ## Compte rendu des reconnexions XR
+        nbReconnexions = sum(connXR.getNbReconnexions() for connXR in [self.connXR]+self.connexionsXRWorkers \
+                            if connXR is not None)
+        if nbReconnexions > 0:
+            self.crFinal += '\nReconnexions XR : '+str(nbReconnexions)
+
+    def traiteRattrapage(self,debut,fin):
+        """
+            Fonction de rattrapage (retraitement) sur une fenêtre explicite [debut, fin] (dates jj/mm/aaaa) à la place 
+            des fenêtres calculées à partir du paramétrage (getFenetre)
+            Cette fonction permet d'enchainer les differentes étapes :
+                - Controle de connexion : si l'une des 2 connexion XR ou Didon n'est pas établie alors arrêt du programme
+                    - Connexions Etablies 
+                        - Découpage de la fenêtre en partitions de temps (getPartitionsRattrapage) et des mesures en lots
+                          de getTailleLotXR() mesures
+                        - Traitement des unités de travail (partition x lot) non terminées d'après le journal de reprise 
+                          (DidonJournalRattrapage), séquentiel ou concurrent si getNbWorkers() > 1 (traitePartitionRattrapage) :
+                          chaque unité est traitée et écrite en base DIDON comme une fenêtre de traiteMesures
+                        - Construction du cr final : unités déjà terminées (reprise), traitées et en erreur
+                        - Métriques, cache XR et reconnexions (bilanTraitement)
+                    - L'une des deux connexions n'est pas établie
+                - Deconnexion XR et DIDON
+                - Affichage du statut de fin du programme
+            Les unités en erreur ne sont pas enregistrées dans le journal : elles sont retraitées au lancement suivant
+            du même rattrapage. Le mode incrémental n'est pas utilisé en rattrapage
+        """
+
+        nomFonction='traiteRattrapage'
+
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                        'Debut du rattrapage ['+str(debut)+','+str(fin)+'] avec connexion XR : '+\
+                                                        str(self.getXRConnected())+' et connexion DIDON : '+str(self.getDIDONConnected()))
+
+        if (self.getDIDONConnected() and self.getXRConnected()):
+            self.etatIncremental = None
+            fenetre = self.convertitFenetre(debut,fin)
+            partitions = self.getPartitionsRattrapage(debut,fin) if fenetre is not None else []
+            if len(partitions) == 0:
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                'Rattrapage impossible - fenetre ['+str(debut)+','+str(fin)+'] erronee','ERROR')
+                self.crFinal += 'Erreur sur la fenetre de rattrapage : ['+str(debut)+','+str(fin)+']'
+            else:
+                fichierJournal = self.getParametreOptionnel('getFichierJournalRattrapage',\
+                                                            os.path.join(os.path.dirname(os.path.abspath(__file__)),\
+                                                                        nomClasse+'_rattrapage_'+self.getLibelleFrequences()+'.json'))
+                journal = DidonJournalRattrapage(fichierJournal, self.getLibelleFrequences()+'|'+fenetre[0].strftime('%Y-%m-%d')+'|'+\
+                                                fenetre[1].strftime('%Y-%m-%d'), self.getParametrage().getDidonLogger())
+                self.preparePartitions({freq: (debut, fin) for freq in self.getFrequencesMesure()})
+
+                ## Unités de travail restantes : lots réduits aux mesures non terminées de chaque partition
+                nomsCourts = list(self.getParametrage().getNomsCourtsMesures())
+                unites = []
+                for partition in partitions:
+                    for lot in self.getLotsMesures(nomsCourts):
+                        lotRestant = [nomCourt for nomCourt in lot if not journal.isTerminee(partition[0], partition[1], nomCourt)]
+                        if len(lotRestant) > 0:
+                            unites.append((lotRestant, partition))
+                nbRestantes = sum(len(lot) for lot, partition in unites)
+                nbDejaTerminees = len(partitions) * len(nomsCourts) - nbRestantes
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                str(len(partitions))+' partitions x '+str(len(nomsCourts))+' mesures : '+\
+                                                                str(nbDejaTerminees)+' unites deja terminees, '+str(len(unites))+' lots a traiter')
+
+                if self.getNbWorkers() > 1:
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=self.getNbWorkers()) as executeur:
+                        futures = [executeur.submit(self.traiteLotWorker,self.traitePartitionRattrapage,lot,partition,journal) \
+                                    for lot, partition in unites]
+                        statutsUnites = [future.result() for future in futures]
+                else:
+                    statutsUnites = [self.traitePartitionRattrapage(lot,partition,journal) for lot, partition in unites]
+                self.termineSorties()
+                unitesEnErreur = [(partition[0], nomCourt) for (lot, partition), statuts in zip(unites, statutsUnites) \
+                                    for nomCourt, statut in zip(lot, statuts) if self.isStatutEnErreur(statut)]
+
+                ## Construction du cr final pour affichage dans les logs
+                self.crFinal += 'Rattrapage sur frequence = "' + self.getLibelleFrequences() + '" (tables mises a jour : '+\
+                                ', '.join(self.getTableAUtiliser(freq) for freq in self.getFrequencesMesure())+') \nDate de debut : '+\
+                                str(debut)+'\nDate de fin : '+str(fin)+ '\nDurée de traitement : %s seconds ' % round((time.time() - self.start_time))+'\n' + \
+                                str(len(partitions))+' partitions x '+str(len(nomsCourts))+' mesures : '+str(nbDejaTerminees)+\
+                                ' unites deja terminees (reprise), '+str(nbRestantes - len(unitesEnErreur))+' unites traitees, '+\
+                                str(len(unitesEnErreur))+' unites en erreur\n'
+                if len(unitesEnErreur) > 0:
+                    self.crFinal += 'Unites en erreur (a reprendre) : '+str(unitesEnErreur)+'\n'
+
+            ## Métriques, cache XR et reconnexions
+            self.bilanTraitement()
         else :
             ## L'une des deux connexions n'est pas établie
             self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'Traitement impossible connexion XR et/ou Didon non établie')
@@ -653,13 +1948,809 @@ class DidonGetMesures:
 
         ## Deconnexion XR et DIDON
         self.disconnect()
-        ## Affichage du statut de démarrage du programme
+        ## Affichage du statut de fin du programme
         self.afficheStatut(LABEL_FINALISATION)
 
+    def convertitFenetre(self,debut,fin):
+        """
+            Fonction de contrôle et de conversion de la fenêtre explicite [debut, fin] (dates jj/mm/aaaa ou ISO) en 
+            couple (debutFenetre, finFenetre) de Timestamp (jours)
+            Retourne None (avec trace d'erreur) si une des dates est invalide ou si la fin est antérieure au début
+        """
+
+        nomFonction='convertitFenetre'
+
+        try:
+            debutFenetre, finFenetre = convertitDate(debut).normalize(), convertitDate(fin).normalize()
+        except (ValueError, TypeError, OverflowError) as error:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Fenetre ['+str(debut)+','+str(fin)+'] invalide : %s'%error,'ERROR')
+            return None
+        if finFenetre < debutFenetre:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Fenetre ['+str(debut)+','+str(fin)+'] invalide : fin anterieure au debut','ERROR')
+            return None
+        return debutFenetre, finFenetre
+
+    def getPartitionsRattrapage(self,debut,fin):
+        """
+            Fonction de découpage de la fenêtre de rattrapage [debut, fin] en partitions de temps alignées sur les débuts de mois
+            Retourne la liste des couples (debutPartition, finPartition) au format jj/mm/aaaa :
+                - fréquence A traitée : partitions annuelles, la fenêtre est étendue aux années complètes
+                - fréquence M traitée : partitions de getNbMoisParPartitionRattrapage() mois (1 par défaut), 
+                  la fenêtre est étendue aux mois complets
+                - sinon (H et D) : partitions de getNbMoisParPartitionRattrapage() mois
+            Retourne une liste vide si la fin de la fenêtre est antérieure à son début
+        """
+        debutFenetre = convertitDate(debut).normalize()
+        finFenetre = convertitDate(fin).normalize()
+        if finFenetre < debutFenetre:
+            return []
+
+        nbMois = max(1, int(self.getParametreOptionnel('getNbMoisParPartitionRattrapage', 1)))
+        if self.getParametrage().getLABEL_FREQ_A() in self.getFrequencesMesure():
+            nbMois = 12
+            debutFenetre = debutFenetre.replace(month=1, day=1)
+            finFenetre = finFenetre.replace(month=12, day=31)
+        elif self.getParametrage().getLABEL_FREQ_M() in self.getFrequencesMesure():
+            debutFenetre = debutFenetre.replace(day=1)
+            finFenetre = finFenetre + pd.offsets.MonthEnd(0)
+        return [(debutPartition, finPartition) for debutPartition, finPartition, debutSuivante in \
+                self.getTranches(debutFenetre.strftime('%d/%m/%Y'), finFenetre.strftime('%d/%m/%Y'), nbMois)]
+
+    def traitePartitionRattrapage(self,nomsCourts,partition,journal):
+        """
+            Fonction de traitement d'une unité de travail du rattrapage : lot de mesures <nomsCourts> sur la partition 
+            de temps <partition> (debut, fin)
+                - traitement multi-fréquences (traiteLotMultiFrequences) ou mono-fréquence (traiteLotMesures)
+                - enregistrement dans le journal <journal> des mesures terminées (hors mesures en erreur)
+            Retourne la liste des statuts dans l'ordre de <nomsCourts>
+        """
+        debut, fin = partition
+        if len(self.getFrequencesMesure()) > 1:
+            statuts = self.traiteLotMultiFrequences(nomsCourts,{freq: partition for freq in self.getFrequencesMesure()})
+        else:
+            arrondi=self.getParametrage().getArrondi(self.frequenceMesure)
+            representativite=str(self.getParametrage().getRepresentativite(str(self.frequenceMesure)))
+            statuts = self.traiteLotMesures(nomsCourts,debut,fin,arrondi,representativite)
+        journal.marqueTerminees(debut, fin, [nomCourt for nomCourt, statut in zip(nomsCourts, statuts) if not self.isStatutEnErreur(statut)])
+        return statuts
+
+    def traiteRechargementPartitions(self,debut,fin):
+        """
+            Fonction de rechargement complet (retraitement) des partitions de la table DIDON de la fréquence principale 
+            (traitement mono-fréquence, partitionnement actif) couvrant la fenêtre [debut, fin] (dates jj/mm/aaaa), 
+            par échange de partition au lieu de suppressions ligne à ligne :
+                - Controle de connexion : si l'une des 2 connexion XR ou Didon n'est pas établie alors arrêt du programme
+                    - Connexions Etablies 
+                        - Maintenance de la table (DidonPartitions.maintient : partitionnement, partitions et index)
+                        - Pour chaque partition : chargement de toutes les mesures dans une table de transit 
+                          (chargePartitionTransit) puis échange avec la partition existante (DidonPartitions.echangePartition)
+                        - Construction du cr final : partitions échangées et en erreur
+                        - Métriques, cache XR et reconnexions (bilanTraitement)
+                    - L'une des deux connexions n'est pas établie ou le partitionnement n'est pas possible
+                - Deconnexion XR et DIDON
+                - Affichage du statut de fin du programme
+            Une partition dont une mesure est en erreur n'est pas échangée (partition existante inchangée) : elle est 
+            retraitée au lancement suivant. Le mode incrémental n'est pas utilisé
+        """
+
+        nomFonction='traiteRechargementPartitions'
+
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                        'Debut du rechargement par partitions ['+str(debut)+','+str(fin)+'] avec connexion XR : '+\
+                                                        str(self.getXRConnected())+' et connexion DIDON : '+str(self.getDIDONConnected()))
+
+        frequence = self.frequenceMesure
+        if not (self.getDIDONConnected() and self.getXRConnected()):
+            ## L'une des deux connexions n'est pas établie
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'Traitement impossible connexion XR et/ou Didon non établie')
+            self.crFinal += 'Erreur sur les connexions XR et/ou DIDON\nConnexion XR : ' + str(self.getXRConnected()) + \
+                            '\nConnexion DIDON : ' + str(self.getDIDONConnected())
+        elif self.getPartitions() is None or len(self.getFrequencesMesure()) > 1 or self.getPartitions().getGranularite(frequence) is None:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Rechargement impossible - partitionnement inactif ou frequence '+\
+                                                            self.getLibelleFrequences()+' non partitionnee','ERROR')
+            self.crFinal += 'Erreur : rechargement par partitions impossible pour la frequence '+self.getLibelleFrequences()
+        elif self.getParametrage().getIsDBinsertionActivatedBool() != True:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'!! DEBUG !! !! DEBUG !! !! DEBUG !!insertion en base desactivee !! DEBUG !! !! DEBUG !! !! DEBUG !!')
+        elif self.convertitFenetre(debut,fin) is None:
+            self.crFinal += 'Erreur sur la fenetre de rechargement : ['+str(debut)+','+str(fin)+']'
+        else:
+            self.etatIncremental = None
+            table = self.getTableAUtiliser(frequence)
+            bornes = self.getPartitions().getBornesPartitions(frequence, convertitDate(debut), convertitDate(fin))
+            nomsCourts = list(self.getParametrage().getNomsCourtsMesures())
+            if len(bornes) > 0:
+                self.getPartitions().maintient(table, frequence, bornes[0][0], bornes[-1][0])
+            else:
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                'Rechargement impossible - fenetre ['+str(debut)+','+str(fin)+'] erronee','ERROR')
+
+            partitionsEchangees, partitionsEnErreur, nbLignes = [], [], 0
+            for debutPartition, finPartition in bornes:
+                try:
+                    nbLignes += self.getPartitions().echangePartition(table, frequence, debutPartition,\
+                                                                        lambda tableTransit: self.chargePartitionTransit(nomsCourts,\
+                                                                                                debutPartition, finPartition, frequence, tableTransit))
+                    partitionsEchangees.append(str(debutPartition.date()))
+                except Exception as error:
+                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                    'Partition de '+str(debutPartition.date())+' non echangee : %s'%error,'ERROR')
+                    partitionsEnErreur.append(str(debutPartition.date()))
+            self.termineSorties()
+
+            ## Construction du cr final pour affichage dans les logs
+            self.crFinal += 'Rechargement par partitions sur frequence = "' + str(frequence) + '" (table mise a jour : '+table+\
+                            ') \nDate de debut : '+str(debut)+'\nDate de fin : '+str(fin)+\
+                            '\nDurée de traitement : %s seconds ' % round((time.time() - self.start_time))+'\n' + \
+                            str(len(partitionsEchangees))+' partitions echangees ('+str(nbLignes)+' lignes), '+\
+                            str(len(partitionsEnErreur))+' partitions en erreur\n'
+            if len(partitionsEnErreur) > 0:
+                self.crFinal += 'Partitions en erreur (a reprendre) : '+str(partitionsEnErreur)+'\n'
+
+            ## Métriques, cache XR et reconnexions
+            self.bilanTraitement()
+
+        ## Deconnexion XR et DIDON
+        self.disconnect()
+        ## Affichage du statut de fin du programme
+        self.afficheStatut(LABEL_FINALISATION)
+
+    def chargePartitionTransit(self,nomsCourts,debutPartition,finPartition,frequence,tableTransit):
+        """
+            Fonction de chargement dans la table de transit <tableTransit> (nom qualifié) des mesures <nomsCourts> de la 
+            partition [debutPartition, finPartition[ pour la fréquence <frequence>, par lots de getTailleLotXR() mesures 
+            (chargeLotTransit), séquentiel ou concurrent si getNbWorkers() > 1
+            La récupération XR débute la veille de <debutPartition> : date_mesure étant l'heure de fin de la période mesurée 
+            (même convention que DidonStatistiques), la dernière mesure horaire de la veille est datée du premier jour de la 
+            partition à 00h
+            Lève RuntimeError si une mesure est en erreur (la partition ne doit pas être échangée)
+            Retourne le nombre de lignes chargées
+        """
+        debut = (debutPartition - pd.Timedelta(days=1)).strftime('%d/%m/%Y')
+        fin = (finPartition - pd.Timedelta(days=1)).strftime('%d/%m/%Y')
+        arrondi=self.getParametrage().getArrondi(frequence)
+        representativite=str(self.getParametrage().getRepresentativite(str(frequence)))
+        parametres = (debut,fin,frequence,arrondi,representativite,debutPartition,finPartition,tableTransit)
+        lots = self.getLotsMesures(nomsCourts)
+        if self.getNbWorkers() > 1:
+            statutsLots = self.traiteLotsEnParallele(self.chargeLotTransit,lots,*parametres)
+        else:
+            statutsLots = [self.chargeLotTransit(lot,*parametres) for lot in lots]
+        statuts = [statut for statutsLot in statutsLots for statut in statutsLot]
+        enErreur = [nomCourt for nomCourt, statut in zip(nomsCourts, statuts) if statut is None]
+        if len(enErreur) > 0:
+            raise RuntimeError('Mesures en erreur : '+str(enErreur))
+        return sum(statuts)
+
+    def chargeLotTransit(self,nomsCourts,debut,fin,frequence,arrondi,representativite,debutPartition,finPartition,tableTransit):
+        """
+            Fonction de chargement d'un lot de mesures (nomsCourts) dans la table de transit <tableTransit> d'un échange 
+            de partition : récupération XR du lot (unitaire pour un lot d'une seule mesure), puis pour chaque mesure 
+            copie des lignes avec code de validation comprises dans [debutPartition, finPartition[ et écriture dans les 
+            sorties supplémentaires (ecritSorties)
+            Retourne la liste dans l'ordre de <nomsCourts> du nombre de lignes chargées (None en cas d'erreur)
+        """
+
+        nomFonction='chargeLotTransit'
+
+        try:
+            if len(nomsCourts) == 1:
+                lotXR = {nomsCourts[0]: self.getMesuresFromXR(nomsCourts[0],debut,fin,str(frequence),arrondi,representativite)}
+            else:
+                lotXR = self.getMesuresFromXRParLot(nomsCourts,debut,fin,str(frequence),arrondi,representativite)
+        except Exception as error:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Erreur lors de la récupération XR du lot '+str(nomsCourts)+' : %s'%error,'ERROR')
+            return [None for nomCourt in nomsCourts]
+
+        statuts = []
+        for nomCourt in nomsCourts:
+            try:
+                ## Toute la partition est remplacée, y compris pour une mesure sans donnée XR
+                self.marquePlageSorties(nomCourt, debutPartition, finPartition - pd.Timedelta(hours=1), frequence)
+                valEtCodes = lotXR.get(nomCourt)
+                if valEtCodes is None or valEtCodes.size == 0:
+                    statuts.append(0)
+                    continue
+                dates = pd.to_datetime(valEtCodes['date_mesure'])
+                valides = valEtCodes[valEtCodes['code_validation'].notna() & (dates >= debutPartition) & (dates < finPartition)]
+                top = self.getMetriques().top()
+                self.getReprise().execute('Insertion transit '+str(nomCourt),\
+                                            lambda: self.insereMesuresDidonCopy(valides, frequence, tableTransit))
+                self.getMetriques().enregistre(nomCourt, ETAPE_INSERTION, top, len(valides), self.getMetriques().tailleOctets(valides))
+                self.ecritSorties(nomCourt, valides, frequence)
+                statuts.append(len(valides))
+            except Exception as error:
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                'Erreur de chargement de '+str(nomCourt)+' dans '+str(tableTransit)+\
+                                                                ' : %s'%error,'ERROR')
+                statuts.append(None)
+        return statuts
+
+    def exporteMetriques(self):
+        """
+            Fonction de restitution des métriques de performance en fin de traitement :
+                - tableau récapitulatif par étape dans les logs et le cr final
+                - export JSON (getFichierMetriques) et, si paramétré, fichier texte Prometheus (getFichierMetriquesPrometheus)
+        """
+
+        nomFonction='exporteMetriques'
+
+        resume = self.getMetriques().getResume()
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'Metriques de performance :\n'+resume)
+        self.crFinal += '\nMetriques de performance :\n'+resume
+
+        fichierJson = self.getParametreOptionnel('getFichierMetriques',\
+                                                os.path.join(os.path.dirname(os.path.abspath(__file__)),\
+                                                            nomClasse+'_metriques_'+self.getLibelleFrequences()+'.json'))
+        if fichierJson:
+            self.getMetriques().exporteJson(fichierJson)
+        fichierPrometheus = self.getParametreOptionnel('getFichierMetriquesPrometheus', None)
+        if fichierPrometheus:
+            self.getMetriques().exportePrometheus(fichierPrometheus)
+
+    def traiteLotMesures(self,nomsCourts,debut,fin,arrondi,representativite,frequence=None):
+        """
+            Fonction de traitement d'un lot de mesures (nomsCourts) pour la fréquence <frequence> 
+            (None : fréquence principale, avec mode incrémental s'il est actif) :
+                - en mode incrémental, le début de la fenêtre est avancé via getDebutIncremental
+                - cas M ou A avec getNbMoisParTranche() > 0 : traitement par tranches (traiteLotMesuresParTranches)
+                - lot d'une seule mesure : traiteMesure avec récupération XR unitaire
+                - sinon récupération XR du lot en un seul appel (getMesuresFromXRParLot) puis traiteMesure pour chaque mesure
+            Retourne la liste des statuts de traiteMesure dans l'ordre de <nomsCourts>
+        """
+
+        nomFonction='traiteLotMesures'
+
+        ## Mode incrémental (fréquence principale) : réduction du début de la fenêtre de récupération XR
+        if frequence is None:
+            debut = self.getDebutIncremental(nomsCourts, debut)
+        freq = self.frequenceMesure if frequence is None else frequence
+
+        ## Cas M ou A par tranches de mois
+        if self.getNbMoisParTranche() > 0 and str(freq) in (self.getParametrage().getLABEL_FREQ_M(), self.getParametrage().getLABEL_FREQ_A()):
+            return self.traiteLotMesuresParTranches(nomsCourts,debut,fin,arrondi,representativite,frequence)
+
+        if len(nomsCourts) == 1:
+            return [self.traiteMesure(nomsCourts[0],debut,fin,arrondi,representativite,None,frequence)]
+
+        try:
+            lotXR = self.getMesuresFromXRParLot(nomsCourts,debut,fin,str(freq), arrondi, representativite)
+        except Exception as error:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Erreur lors de la récupération XR du lot '+str(nomsCourts),'ERROR')
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Exception levée : %s'%error,'ERROR')
+            return [None for nomCourt in nomsCourts]
+        return [self.traiteMesure(nomCourt,debut,fin,arrondi,representativite,lotXR,frequence) for nomCourt in nomsCourts]
+
+    def traiteLotMesuresParTranches(self,nomsCourts,debut,fin,arrondi,representativite,frequence=None):
+        """
+            Fonction de traitement M ou A d'un lot de mesures (nomsCourts) par tranches de getNbMoisParTranche() mois 
+            pour la fréquence <frequence> (None : fréquence principale) :
+            chaque lot d'agrégats terminés produit par getMesuresXRParTranches est écrit en base DIDON via traiteMesure
+            Statut d'une mesure : None si une écriture est en erreur, sinon True si au moins une écriture a été réalisée,
+            False si aucune donnée n'a été récupérée
+            Retourne la liste des statuts dans l'ordre de <nomsCourts>
+        """
+
+        nomFonction='traiteLotMesuresParTranches'
+
+        statuts = {nomCourt: False for nomCourt in nomsCourts}
+        try:
+            for lotXR in self.getMesuresXRParTranches(nomsCourts,debut,fin,str(self.frequenceMesure if frequence is None else frequence),\
+                                                        arrondi,representativite):
+                for nomCourt in nomsCourts:
+                    if statuts[nomCourt] is None:
+                        continue
+                    statut = self.traiteMesure(nomCourt,debut,fin,arrondi,representativite,lotXR,frequence)
+                    if statut is None or statut is True:
+                        statuts[nomCourt] = statut
+        except Exception as error:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Erreur lors de la récupération XR par tranches du lot '+str(nomsCourts),'ERROR')
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Exception levée : %s'%error,'ERROR')
+            return [None for nomCourt in nomsCourts]
+        return [statuts[nomCourt] for nomCourt in nomsCourts]
+
+    def traiteMesure(self,nomCourt,debut,fin,arrondi,representativite,lotXR=None,frequence=None):
+        """
+            Fonction de traitement et insertion en base de données DIDON d'une mesure (nomCourt)
+            Si <lotXR> est fourni (dictionnaire issu de getMesuresFromXRParLot), la structure de données de la mesure
+            y est lue au lieu d'être récupérée dans XR
+            La mesure est écrite dans la table de la fréquence <frequence> (fréquence principale par défaut, avec mise à jour
+            de l'état du mode incrémental s'il est actif) puis dans les sorties supplémentaires (ecritSorties)
+            Retourne :
+                - True si la mesure a été traitée
+                - False si aucune donnée n'a été récupérée depuis XR
+                - None en cas d'erreur (tracée dans les logs), l'erreur n'interrompt pas le traitement des autres mesures
+        """
+
+        nomFonction='traiteMesure'
+        incremental = frequence is None
+        if frequence is None:
+            frequence = self.frequenceMesure
+        mesureDB = self.getMesureDB(frequence)
+
+        try:
+            ##creation d'une variable utilisee en cas d'exception
+            etapeTravail='etape_avant_get_mesure'
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail+' nomCourt='+str(nomCourt))
+
+            ## Appel de la fonction getMesuresFromXR permettant de récupérer la structure de données
+            ## contenant le nom court, la date, la valeur et le code de validité de la mesure
+            ## pour les paramêtres nomCourt, debut, fin, frequence, arrondi et representativite
+            if lotXR is None:
+                valEtCodes = self.getMesuresFromXR(nomCourt,debut,fin,str(frequence), arrondi, representativite)
+            else:
+                valEtCodes = lotXR.get(nomCourt)
+            etapeTravail='etape_apres_get_mesure'
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
+
+            ## Controle de la taille de la structure de données recuperee
+            if (valEtCodes  is not None and valEtCodes.size > 0) and self.getModeRemplacement() != LABEL_REMPLACEMENT_UNITAIRE:
+                ## Traitements si la structure contient bien des données en mode transactionnel (UPSERT, PLAGE ou DIFF) :
+                ## suppression et insertion du lot complet (ou des seules différences) en une seule transaction
+                etapeTravail='avant_remplacement_transactionnel'
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
+                self.getReprise().execute('Remplacement DIDON '+str(nomCourt),\
+                                            lambda: self.remplaceMesuresDidon(nomCourt, valEtCodes, frequence))
+                self.ecritSorties(nomCourt, valEtCodes, frequence)
+                if incremental:
+                    self.majEtatIncremental(nomCourt, valEtCodes)
+                return True
+            elif (valEtCodes  is not None and valEtCodes.size > 0):
+                ## Traitements si la structure contient bien des données :
+                ## Vérification de la présence de mesures en table DIDON pour la date_mesure. Si oui, suppression avant l'import
+                ## (table DIDON non consultée si l'insertion est désactivée : alimentation des seules sorties supplémentaires)
+                etapeTravail='avant_controle_donnes_existantes'
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
+                top = self.getMetriques().top()
+                records = None
+                if self.getParametrage().getIsDBinsertionActivatedBool() == True:
+                    records = self.sessionDidon.query(mesureDB).\
+                            filter(mesureDB.date_mesure.in_(valEtCodes.date_mesure),
+                                mesureDB.nom_mes_court.in_(valEtCodes.nom_mes_court)).first()
+
+                if records is not None:
+                    ## Si il existe au moins un enregistrement alors suppression de tous les enregistrements
+                    etapeTravail='avant_recuperation_nb_donnees_existantes'
+                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
+                    nb = self.sessionDidon.query(mesureDB).\
+                        filter(mesureDB.date_mesure.in_(valEtCodes.date_mesure),
+                            mesureDB.nom_mes_court.in_(valEtCodes.nom_mes_court)).count()
+                    self.getMetriques().enregistre(nomCourt, ETAPE_CONTROLE_EXISTANT, top, nb)
+                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,str(nb)+' mesures déja existantes dans la table ' + \
+                                                                    str(self.getTableAUtiliser(frequence)) + ' pour ' + str(nomCourt))
+
+                    etapeTravail='avant_supression_donnees_existantes'
+                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
+                    top = self.getMetriques().top()
+                    self.sessionDidon.query(mesureDB).\
+                        filter(and_(mesureDB.date_mesure.in_(valEtCodes.date_mesure),
+                                mesureDB.nom_mes_court.in_(valEtCodes.nom_mes_court))).delete(synchronize_session=False)
+                    self.sessionDidon.commit()
+                    self.getMetriques().enregistre(nomCourt, ETAPE_SUPPRESSION, top, nb)
+                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'Suppression des mesures '+ str(nomCourt) +' dans ' + \
+                                                                    str(self.getTableAUtiliser(frequence)) + ' avant ré-injection terminée')
+                else:
+                    self.getMetriques().enregistre(nomCourt, ETAPE_CONTROLE_EXISTANT, top)
+                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'Pas de suppression à realiser')
+
+                ## Filtrage des mesures sans valeurs et sans code 
+                ## (cas des mesures invalidées ou non remontées ie. station KO ou pas de station)
+                ## Reconstruire une structure de données ne conservant que les lignes pour lesquelles 
+                ## le code de validation est non null
+                etapeTravail='avant_retrait_donnes_sans_mesure'
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
+                ## Structure complète conservée pour les sorties supplémentaires (plage remplacée, lignes sans code incluses)
+                valEtCodesXR = valEtCodes
+                valEtCodes=valEtCodes[valEtCodes['code_validation'].notna()]
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                lambda: 'apres nettoyage : \n'+\
+                                                                        self.getParametrage().getDidonLogger().resumeDataFrame(valEtCodes),'DEBUG')
+
+                ## Insertion en base de données
+                ## l'insertion peut être désactivée par parametrage (pour tests)
+                etapeTravail='avant_insertion_nouvelles_donnees'
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,etapeTravail)
+                if self.getParametrage().getIsDBinsertionActivatedBool() == True:
+                    top = self.getMetriques().top()
+                    self.getReprise().execute('Insertion DIDON '+str(nomCourt), lambda: self.insereMesuresDidon(valEtCodes, frequence))
+                    self.getMetriques().enregistre(nomCourt, ETAPE_INSERTION, top, len(valEtCodes), self.getMetriques().tailleOctets(valEtCodes))
+                else:
+                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'!! DEBUG !! !! DEBUG !! !! DEBUG !!insertion en base desactivee !! DEBUG !! !! DEBUG !! !! DEBUG !!')
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'dataframe insérées en base DIDON ')
+                etapeTravail='avant_ecriture_sorties'
+                self.ecritSorties(nomCourt, valEtCodesXR, frequence)
+                if incremental:
+                    self.majEtatIncremental(nomCourt, valEtCodes)
+                return True
+            else:
+                ## Traitement si la structure ne contient aucune donnée
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                'nomCourt='+str(nomCourt)+' : aucune donnee recuperee depuis XR')
+                return False
+        except Exception as error:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Erreur lors des traitements en base DIDON du dataframe en base DIDON : '+etapeTravail,'ERROR')
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Exception levée : %s'%error,'ERROR')
+            ## Annulation de la transaction en cours pour ne pas impacter les mesures suivantes
+            self.sessionDidon.rollback()
+        return None
+
+    def ecritSorties(self,nomCourt,valEtCodes,frequence):
+        """
+            Fonction d'écriture des lignes avec code de validation de la structure de sortie <valEtCodes> de la mesure <nomCourt>
+            dans les sorties supplémentaires injectées au constructeur (méthode ecrit(nomCourt, valEtCodes, frequence)), 
+            après signalement de la plage [min, max] de date_mesure de <valEtCodes> (lignes sans code incluses), remplacée
+            en base DIDON (marquePlageSorties)
+            L'erreur d'une sortie est propagée : la mesure est alors en erreur (traiteMesure)
+        """
+        if len(self.sorties) == 0:
+            return
+        if len(valEtCodes) > 0:
+            dates = pd.to_datetime(valEtCodes['date_mesure'])
+            self.marquePlageSorties(nomCourt, dates.min(), dates.max(), frequence)
+        top = self.getMetriques().top()
+        valides = self.prepareChargement(valEtCodes[valEtCodes['code_validation'].notna()], frequence)
+        for sortie in self.sorties:
+            sortie.ecrit(nomCourt, valides, frequence)
+        self.getMetriques().enregistre(nomCourt, ETAPE_SORTIES, top, len(valides)*len(self.sorties), self.getMetriques().tailleOctets(valides))
+
+    def marquePlageSorties(self,nomCourt,debut,fin,frequence):
+        """
+            Fonction de signalement aux sorties supplémentaires qui en disposent (méthode marquePlage) de la plage 
+            [debut, fin] de date_mesure de la mesure <nomCourt> remplacée en base DIDON pour la fréquence <frequence>, 
+            y compris les dates dont toutes les lignes ont été supprimées (ex : statistiques des jours modifiés)
+        """
+        for sortie in self.sorties:
+            marquePlage = getattr(sortie, 'marquePlage', None)
+            if marquePlage is not None:
+                marquePlage(nomCourt, pd.Timestamp(debut), pd.Timestamp(fin), frequence)
+
+    def termineSorties(self):
+        """
+            Fonction de fin de chargement des sorties supplémentaires : appel de la méthode termine() des sorties qui en 
+            disposent (ex : recalcul des statistiques des périodes modifiées)
+            L'erreur d'une sortie est tracée sans interrompre le traitement
+        """
+
+        nomFonction='termineSorties'
+
+        for sortie in self.sorties:
+            termine = getattr(sortie, 'termine', None)
+            if termine is None:
+                continue
+            try:
+                termine()
+            except Exception as error:
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                'Erreur de fin de chargement de la sortie '+type(sortie).__name__+\
+                                                                ' : %s'%error,'ERROR')
+
+    def getDebutIncremental(self,nomsCourts,debut):
+        """
+            Fonction de calcul du début de la fenêtre de récupération XR en mode incrémental pour le lot <nomsCourts> :
+                début = max(<debut>, dernière date chargée - getNbHeuresRevalidation heures) pour chaque mesure
+            Le début retenu pour le lot est le plus ancien des débuts de ses mesures
+            Si le mode incrémental n'est pas actif ou si une mesure n'a jamais été chargée, <debut> est retourné
+        """
+        if self.getEtatIncremental() is None:
+            return debut
+
+        debutFenetre = pd.Timestamp(debut)
+        debutLot = None
+        for nomCourt in nomsCourts:
+            derniereDate = self.getEtatIncremental().getDerniereDate(self.frequenceMesure, nomCourt)
+            if derniereDate is None:
+                return debut
+            debutMesure = max(debutFenetre, pd.Timestamp(derniereDate) - pd.Timedelta(hours=self.nbHeuresRevalidation))
+            if debutLot is None or debutMesure < debutLot:
+                debutLot = debutMesure
+        return str(debutLot.to_pydatetime())
+
+    def majEtatIncremental(self,nomCourt,valEtCodes):
+        """
+            Mise à jour en mode incrémental de la dernière date chargée pour <nomCourt>
+            (date de la dernière mesure avec valeur de <valEtCodes>), uniquement si l'insertion en base est activée
+        """
+        if self.getEtatIncremental() is None or self.getParametrage().getIsDBinsertionActivatedBool() != True:
+            return
+
+        dates = valEtCodes.loc[valEtCodes['valeur_mesure'].notna(), 'date_mesure']
+        if len(dates) > 0:
+            self.getEtatIncremental().majDerniereDate(self.frequenceMesure, nomCourt, pd.Timestamp(dates.max()).to_pydatetime())
+
+    def verifieContrainteUpsert(self):
+        """
+            Fonction de contrôle, à la sélection du mode LABEL_REMPLACEMENT_UPSERT, de la contrainte d'unicité sur
+            (nom_mes_court, date_mesure) nécessaire à INSERT ... ON CONFLICT pour la table DIDON de chaque fréquence traitée :
+            un index unique est créé s'il n'en existe pas (clé primaire ou index unique)
+            Si l'index ne peut pas être créé (doublons existants), le mode LABEL_REMPLACEMENT_PLAGE est utilisé à la place
+            (erreur tracée)
+        """
+
+        nomFonction='verifieContrainteUpsert'
+
+        for frequence in self.getFrequencesMesure():
+            table = self.getTableAUtiliser(frequence)
+            connexion = self.engineDidon.raw_connection()
+            try:
+                curseur = connexion.cursor()
+                curseur.execute('SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indrelid '+\
+                                'JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = %s AND c.relname = %s '+\
+                                'AND i.indisunique AND i.indpred IS NULL AND (SELECT array_agg(a.attname::text ORDER BY a.attname) '+\
+                                'FROM pg_attribute a WHERE a.attrelid = c.oid AND a.attnum = ANY(i.indkey)) = '+\
+                                'ARRAY[\'date_mesure\', \'nom_mes_court\']', (str(self.schemaMesureDidon), str(table)))
+                if curseur.fetchone() is None:
+                    curseur.execute('CREATE UNIQUE INDEX IF NOT EXISTS "'+str(table)+'_mesure_date_key" ON '+\
+                                    self.getTableQualifiee(table)+' (nom_mes_court, date_mesure)')
+                    connexion.commit()
+                    self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                    'Index unique (nom_mes_court, date_mesure) cree sur '+str(table))
+            except Exception as error:
+                connexion.rollback()
+                self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                                'Contrainte d\'unicite (nom_mes_court, date_mesure) impossible sur '+\
+                                                                str(table)+' : %s'%error+' => mode de remplacement '+\
+                                                                LABEL_REMPLACEMENT_PLAGE,'ERROR')
+                self.modeRemplacement = LABEL_REMPLACEMENT_PLAGE
+                return
+            finally:
+                connexion.close()
+
+    def remplaceMesuresDidon(self,nomCourt,valEtCodes,frequence):
+        """
+            Fonction de remplacement en une seule transaction des mesures <nomCourt> de la table DIDON de la fréquence <frequence>
+            par la structure de données de sortie <valEtCodes>, selon le mode de remplacement :
+                - LABEL_REMPLACEMENT_UPSERT :
+                    - copie des lignes avec code de validation dans une table de transit temporaire
+                    - INSERT ... ON CONFLICT (nom_mes_court, date_mesure) DO UPDATE depuis la table de transit
+                      (contrainte d'unicité sur (nom_mes_court, date_mesure) contrôlée par verifieContrainteUpsert)
+                    - suppression des mesures de la plage [min,max] de date_mesure absentes de la table de transit
+                      (mesures invalidées ou non remontées)
+                - LABEL_REMPLACEMENT_PLAGE :
+                    - suppression des mesures de la plage [min,max] de date_mesure
+                    - copie des lignes avec code de validation dans la table
+                - LABEL_REMPLACEMENT_DIFF :
+                    - écriture des seules différences avec les mesures existantes de la plage (ecritDifferences)
+            Les nombres de lignes insérées/mises à jour et supprimées sont tracés
+        """
+
+        nomFonction='remplaceMesuresDidon'
+
+        ## Bornes de la plage couverte par le lot (y compris les lignes sans code de validation)
+        dateDebut = pd.Timestamp(valEtCodes['date_mesure'].min()).to_pydatetime()
+        dateFin = pd.Timestamp(valEtCodes['date_mesure'].max()).to_pydatetime()
+        valides = valEtCodes[valEtCodes['code_validation'].notna()]
+
+        if self.getParametrage().getIsDBinsertionActivatedBool() != True:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,'!! DEBUG !! !! DEBUG !! !! DEBUG !!insertion en base desactivee !! DEBUG !! !! DEBUG !! !! DEBUG !!')
+            return
+
+        table = self.getTableQualifiee(self.getTableAUtiliser(frequence))
+        connexion = self.engineDidon.raw_connection()
+        try:
+            curseur = connexion.cursor()
+            top = self.getMetriques().top()
+            if self.getModeRemplacement() == LABEL_REMPLACEMENT_UPSERT:
+                curseur.execute('CREATE TEMPORARY TABLE didon_transit (LIKE '+table+' INCLUDING DEFAULTS) ON COMMIT DROP')
+                copieMesures(curseur, valides, 'didon_transit')
+                curseur.execute('INSERT INTO '+table+' ('+','.join(COLONNES_MESURE)+') '+\
+                                'SELECT '+','.join(COLONNES_MESURE)+' FROM didon_transit '+\
+                                'ON CONFLICT (nom_mes_court, date_mesure) DO UPDATE '+\
+                                'SET valeur_mesure = EXCLUDED.valeur_mesure, code_validation = EXCLUDED.code_validation')
+                nbEcrites = curseur.rowcount
+                self.getMetriques().enregistre(nomCourt, ETAPE_INSERTION, top, nbEcrites, self.getMetriques().tailleOctets(valides))
+                top = self.getMetriques().top()
+                curseur.execute('DELETE FROM '+table+' t WHERE t.nom_mes_court = %s AND t.date_mesure BETWEEN %s AND %s '+\
+                                'AND NOT EXISTS (SELECT 1 FROM didon_transit s WHERE s.date_mesure = t.date_mesure)',
+                                (nomCourt, dateDebut, dateFin))
+                nbSupprimees = curseur.rowcount
+                self.getMetriques().enregistre(nomCourt, ETAPE_SUPPRESSION, top, nbSupprimees)
+            elif self.getModeRemplacement() == LABEL_REMPLACEMENT_DIFF:
+                compteurs = self.ecritDifferences(curseur, table, nomCourt, valides, dateDebut, dateFin, frequence)
+                nbEcrites, nbSupprimees = compteurs[0] + compteurs[1], compteurs[2]
+            else:
+                curseur.execute('DELETE FROM '+table+' WHERE nom_mes_court = %s AND date_mesure BETWEEN %s AND %s',
+                                (nomCourt, dateDebut, dateFin))
+                nbSupprimees = curseur.rowcount
+                self.getMetriques().enregistre(nomCourt, ETAPE_SUPPRESSION, top, nbSupprimees)
+                top = self.getMetriques().top()
+                nbEcrites = copieMesures(curseur, valides, table)
+            connexion.commit()
+            if self.getModeRemplacement() == LABEL_REMPLACEMENT_DIFF:
+                self.ajouteCompteursDiff(frequence, compteurs)
+            elif self.getModeRemplacement() != LABEL_REMPLACEMENT_UPSERT:
+                self.getMetriques().enregistre(nomCourt, ETAPE_INSERTION, top, nbEcrites, self.getMetriques().tailleOctets(valides))
+        except Exception:
+            connexion.rollback()
+            raise
+        finally:
+            connexion.close()
+
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                        'Remplacement ('+self.getModeRemplacement()+') des mesures '+str(nomCourt)+' dans '+\
+                                                        str(self.getTableAUtiliser(frequence))+' : '+str(nbEcrites)+' lignes inserees/mises a jour, '+\
+                                                        str(nbSupprimees)+' lignes supprimees')
+
+    def ecritDifferences(self,curseur,table,nomCourt,valides,dateDebut,dateFin,frequence):
+        """
+            Fonction d'écriture (mode LABEL_REMPLACEMENT_DIFF) des seules différences entre les lignes avec code de validation
+            <valides> de la mesure <nomCourt> et les mesures existantes de la plage [dateDebut, dateFin] de <table>,
+            via le curseur psycopg2 <curseur>, sans validation de la transaction :
+                - lecture des mesures existantes de la plage en une requête
+                - comparaison vectorisée sur la valeur et le code de validation (calculeDifferences)
+                - suppression des dates existantes absentes de <valides> (mesures invalidées ou non remontées)
+                - mise à jour des lignes modifiées via une table de transit temporaire
+                - copie des nouvelles lignes dans la table
+            Retourne la liste des nombres de lignes [insérées, mises à jour, supprimées, inchangées]
+        """
+
+        nomFonction='ecritDifferences'
+
+        top = self.getMetriques().top()
+        curseur.execute('SELECT date_mesure, valeur_mesure, code_validation FROM '+table+\
+                        ' WHERE nom_mes_court = %s AND date_mesure BETWEEN %s AND %s', (nomCourt, dateDebut, dateFin))
+        existants = pd.DataFrame(curseur.fetchall(), columns=['date_mesure', 'valeur_mesure', 'code_validation'])
+        aInserer, aMettreAJour, datesASupprimer, nbInchangees = \
+            self.calculeDifferences(existants, valides, self.getParametrage().getArrondi(frequence))
+        self.getMetriques().enregistre(nomCourt, ETAPE_CONTROLE_EXISTANT, top, len(existants), self.getMetriques().tailleOctets(existants))
+
+        top = self.getMetriques().top()
+        nbSupprimees = 0
+        if len(datesASupprimer) > 0:
+            curseur.execute('DELETE FROM '+table+' WHERE nom_mes_court = %s AND date_mesure = ANY(%s)',
+                            (nomCourt, [date.to_pydatetime() for date in datesASupprimer]))
+            nbSupprimees = curseur.rowcount
+        self.getMetriques().enregistre(nomCourt, ETAPE_SUPPRESSION, top, nbSupprimees)
+
+        top = self.getMetriques().top()
+        if len(aMettreAJour) > 0:
+            curseur.execute('CREATE TEMPORARY TABLE didon_transit (LIKE '+table+' INCLUDING DEFAULTS) ON COMMIT DROP')
+            copieMesures(curseur, aMettreAJour, 'didon_transit')
+            curseur.execute('UPDATE '+table+' t SET valeur_mesure = s.valeur_mesure, code_validation = s.code_validation '+\
+                            'FROM didon_transit s WHERE t.nom_mes_court = s.nom_mes_court AND t.date_mesure = s.date_mesure')
+        if len(aInserer) > 0:
+            copieMesures(curseur, aInserer, table)
+        self.getMetriques().enregistre(nomCourt, ETAPE_INSERTION, top, len(aInserer) + len(aMettreAJour),\
+                                        self.getMetriques().tailleOctets(aInserer, aMettreAJour))
+
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                        'Differences pour '+str(nomCourt)+' : '+str(len(aInserer))+' inserees, '+\
+                                                        str(len(aMettreAJour))+' mises a jour, '+str(nbSupprimees)+' supprimees, '+\
+                                                        str(nbInchangees)+' inchangees')
+        return [len(aInserer), len(aMettreAJour), nbSupprimees, nbInchangees]
+
+    def calculeDifferences(self,existants,valides,arrondi):
+        """
+            Fonction de comparaison vectorisée des lignes avec code de validation <valides> (structure de sortie) et des mesures
+            existantes <existants> (colonnes date_mesure, valeur_mesure, code_validation) d'une même mesure, par date_mesure :
+                - lignes à insérer : dates de <valides> absentes de <existants>
+                - lignes à mettre à jour : dates communes dont la valeur (arrondie à <arrondi> décimales) ou le code diffère
+                - dates à supprimer : dates de <existants> absentes de <valides>
+            Deux valeurs manquantes sont considérées comme égales
+            Retourne le quadruplet (lignes à insérer, lignes à mettre à jour, dates à supprimer, nombre de lignes inchangées)
+        """
+        datesExistantes = pd.DatetimeIndex(pd.to_datetime(existants['date_mesure']))
+        datesValides = pd.DatetimeIndex(valides['date_mesure'])
+        anciens = pd.DataFrame({'valeur_mesure': pd.to_numeric(existants['valeur_mesure'], errors='coerce').to_numpy(dtype=np.float64),
+                                'code_validation': pd.to_numeric(existants['code_validation'], errors='coerce').to_numpy(dtype=np.float64)},
+                                index=datesExistantes)
+
+        communes = datesValides.isin(datesExistantes)
+        ancienneLigne = anciens.reindex(datesValides[communes])
+        valeursNouvelles = np.round(valides['valeur_mesure'].to_numpy(dtype=np.float64, na_value=np.nan)[communes], int(arrondi))
+        valeursAnciennes = np.round(ancienneLigne['valeur_mesure'].to_numpy(), int(arrondi))
+        codesNouveaux = pd.to_numeric(valides['code_validation']).to_numpy(dtype=np.float64, na_value=np.nan)[communes]
+        inchangees = ((valeursNouvelles == valeursAnciennes) | (np.isnan(valeursNouvelles) & np.isnan(valeursAnciennes))) & \
+                        (codesNouveaux == ancienneLigne['code_validation'].to_numpy())
+
+        modifiees = communes.copy()
+        modifiees[communes] = ~inchangees
+        return valides[~communes], valides[modifiees], datesExistantes.difference(datesValides), int(inchangees.sum())
+
+    def ajouteCompteursDiff(self,frequence,compteurs):
+        """
+            Fonction de cumul des nombres de lignes [insérées, mises à jour, supprimées, inchangées] du mode 
+            LABEL_REMPLACEMENT_DIFF pour la fréquence <frequence> (compte rendu de bilanTraitement)
+        """
+        with self.verrouCompteurs:
+            cumul = self.compteursDiff.setdefault(frequence, [0, 0, 0, 0])
+            for i in range(4):
+                cumul[i] += compteurs[i]
+
+    def insereMesuresDidon(self,valEtCodes,frequence):
+        """
+            Fonction d'insertion de la structure de données de sortie dans la table DIDON de la fréquence <frequence>
+            selon le mode d'insertion du traitement :
+                - LABEL_INSERTION_COPY : chargement en masse par COPY PostgreSQL (psycopg2)
+                - LABEL_INSERTION_TO_SQL (par défaut) : DataFrame.to_sql
+        """
+        if self.getModeInsertion() == LABEL_INSERTION_COPY:
+            self.insereMesuresDidonCopy(valEtCodes, frequence)
+        else:
+            self.prepareChargement(valEtCodes, frequence).to_sql(self.getTableAUtiliser(frequence),self.engineDidon, schema=self.schemaMesureDidon, if_exists='append', index=False, index_label='date_mesure')
+
+    def insereMesuresDidonCopy(self,valEtCodes,frequence,tableQualifiee=None):
+        """
+            Fonction d'insertion en masse de la structure de données de sortie par COPY PostgreSQL
+            dans la table de la fréquence <frequence> ou, si elle est fournie, dans la table <tableQualifiee> (nom qualifié)
+            Les données sont transmises au format CSV en une seule commande COPY et une seule transaction
+        """
+        if tableQualifiee is None:
+            tableQualifiee = self.getTableQualifiee(self.getTableAUtiliser(frequence))
+        connexion = self.engineDidon.raw_connection()
+        try:
+            curseur = connexion.cursor()
+            copieMesures(curseur, valEtCodes, tableQualifiee)
+            connexion.commit()
+        except Exception:
+            connexion.rollback()
+            raise
+        finally:
+            connexion.close()
+
+    def getTableQualifiee(self,nomTable):
+        """
+            Permet de récupérer le nom qualifié (schéma mesure DIDON) de la table <nomTable> pour les requêtes SQL directes
+        """
+        return '"'+str(self.schemaMesureDidon)+'"."'+str(nomTable)+'"'
+
+    def traiteLotsEnParallele(self,traitementLot,lots,*parametres):
+        """
+            Fonction de traitement concurrent des lots de mesures <lots> par un pool borné de getNbWorkers() workers
+            Chaque lot est traité par <traitementLot> (traiteLotMesures ou traiteLotMultiFrequences) avec les <parametres>
+            Retourne la liste des statuts de <traitementLot> dans l'ordre de <lots>
+        """
+
+        nomFonction='traiteLotsEnParallele'
+        self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                        'Traitement de '+str(len(lots))+' lots de mesures avec '+str(self.getNbWorkers())+' workers')
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.getNbWorkers()) as executeur:
+            futures = [executeur.submit(self.traiteLotWorker,traitementLot,lot,*parametres) for lot in lots]
+            return [future.result() for future in futures]
+
+    def traiteLotWorker(self,traitementLot,nomsCourts,*parametres):
+        """
+            Fonction exécutée par un worker du traitement concurrent :
+                - ouverture à la première utilisation de la connexion XR propre au worker
+                - traitement du lot de mesures via <traitementLot> (traiteLotMesures ou traiteLotMultiFrequences)
+                - restitution au pool de la connexion DIDON de la session du worker
+        """
+
+        nomFonction='traiteLotWorker'
+
+        try:
+            if getattr(self.localWorker, 'connXR', None) is None:
+                connXR = self.creerConnexionXR()
+                with self.verrouConnexions:
+                    self.connexionsXRWorkers.append(connXR)
+                self.localWorker.connXR = connXR
+        except Exception as error:
+            self.getParametrage().getDidonLogger().ecrireLog( nomClasse, nomFonction,\
+                                                            'Erreur de connexion XR du worker pour nomsCourts='+str(nomsCourts)+' : %s'%error,'ERROR')
+            return [None for nomCourt in nomsCourts]
+
+        try:
+            return traitementLot(nomsCourts,*parametres)
+        finally:
+            self.sessionDidon.remove()
 
     def sortieFreqKO(self,freqMesure):
-        self.parametrage.getDidonLogger().ecrireLog( nomClasse,'sortieFreqKO','frequence '+freqMesure+' interdite => fin de programme')
-        sys.exit(0)
+        """
+            Fréquence <freqMesure> non autorisée par le paramétrage : trace et lève ValueError 
+            (la sortie du programme avec un code d'erreur est à la charge de l'appelant, cf. fonction principale)
+        """
+        self.parametrage.getDidonLogger().ecrireLog( nomClasse,'sortieFreqKO','frequence '+freqMesure+' interdite => fin de programme',\
+                                                    'ERROR')
+        raise ValueError('frequence '+freqMesure+' interdite')
 
 ## ######################################
 ## fonction principale
@@ -671,7 +2762,8 @@ class DidonGetMesures:
 def Usage():
     print ("Argument manquant.") 
     print ("Usage:")
-    print (argv[0] + ' <frequenceDemandée> [A|M|J|H] <environnement> [default PROD|LOCAL]')    
+    print (argv[0] + ' <frequenceDemandée> [A|M|J|H ou combinaison, ex : HDMA] <environnement> [default PROD|LOCAL] '+\
+            '[<debutRattrapage> <finRattrapage> (jj/mm/aaaa) [ECHANGE]]')    
     exit()
 
 '''
@@ -690,14 +2782,27 @@ if __name__ == "__main__":
 
     ## Recuperation de l'environnement (facultatif)
     env='PROD'
-    if len(argv)==3 :
+    if len(argv)>=3 :
         if str(argv[2]) == 'LOCAL':
             env = 'LOCAL'
 
-    ## Instanciation de la classe de traitement
-    dgm = DidonGetMesures(env, freqDemandee)
+    ## Recuperation de la fenetre de rattrapage (facultative, debut et fin au format jj/mm/aaaa)
+    if len(argv) == 4:
+        Usage()
+
+    ## Instanciation de la classe de traitement (fréquence interdite => fin de programme en erreur)
+    try:
+        dgm = DidonGetMesures(env, freqDemandee)
+    except ValueError as error:
+        print('Execution du script : ' + str(__file__) + ' ... erreur : ' + str(error))
+        exit(1)
 
     ## Appel du traitement
-    dgm.traiteMesures()
+    if len(argv) >= 6 and str(argv[5]) == 'ECHANGE':
+        dgm.traiteRechargementPartitions(argv[3], argv[4])
+    elif len(argv) >= 5:
+        dgm.traiteRattrapage(argv[3], argv[4])
+    else:
+        dgm.traiteMesures()
 
     print('Execution du script : ' + str(__file__) + ' ... fin')
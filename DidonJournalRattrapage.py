@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+#Nom : DidonJournalRattrapage.py
+#Description : Classe de gestion du journal de reprise des traitements de rattrapage
+#Copyright : 2026, Air Breizh
+#Auteur :  Manuel
+#Version: 1.0
+
+"""
+    Classe définissant le journal de reprise d'un traitement de rattrapage DIDON (fenêtre explicite) :
+    Pour chaque rattrapage (fréquences et fenêtre de jours demandées), conserve par mesure les plages de jours déjà
+    traitées, afin qu'un rattrapage interrompu reprenne là où il s'est arrêté, y compris si le découpage en partitions
+    de temps (getNbMoisParPartitionRattrapage) a changé entre les deux lancements.
+    Le journal est stocké dans un fichier local au format JSON (dates aaaa-mm-jj, plages de jours incluses et fusionnées) :
+        { "<frequences>|<debut>|<fin>" : { "<nomCourt>" : [ [ "<premierJour>", "<dernierJour>" ], ... ], ... }, ... }
+    Le journal est sauvegardé après chaque unité de travail (partition de temps x lot de mesures) terminée.
+"""
+
+import json
+import os
+import threading
+import pandas as pd
+from DidonDates import convertitDate
+
+class DidonJournalRattrapage:
+
+## ######################################
+## Declaration de variable globales
+## ######################################
+
+    global nomClasse
+    nomClasse='DidonJournalRattrapage'
+
+## ######################################
+## constructeur
+## ######################################
+
+    def __init__(self, fichierJournal, cleRattrapage, didonLogger):
+        """
+            Initialisation du journal du rattrapage <cleRattrapage> à partir du fichier <fichierJournal> s'il existe
+            <didonLogger> : logger DidonLogger utilisé pour les traces
+            Le verrou <verrou> protège les plages terminées et l'écriture du fichier, mis à jour par les workers du 
+            rattrapage concurrent à la fin de chaque unité de travail
+        """
+        nomFonction='__init__'
+
+        self.fichierJournal = fichierJournal
+        self.cleRattrapage = str(cleRattrapage)
+        self.didonLogger = didonLogger
+        self.verrou = threading.Lock()
+        self.journal = {}
+
+        if os.path.exists(self.fichierJournal):
+            try:
+                with open(self.fichierJournal, 'r', encoding='utf-8') as fichier:
+                    self.journal = json.load(fichier)
+            except Exception as error:
+                ## Un journal illisible implique un rattrapage complet de la fenêtre
+                self.didonLogger.ecrireLog( nomClasse, nomFonction,\
+                                            'Journal de rattrapage illisible ('+str(self.fichierJournal)+') : %s'%error,'ERROR')
+                self.journal = {}
+        ## Plages terminées par mesure : { nomCourt : [ [premierJour, dernierJour] (Timestamp), ... ] } triées et fusionnées
+        self.plages = {}
+        rattrapage = self.journal.get(self.cleRattrapage)
+        if isinstance(rattrapage, dict):
+            for nomCourt, plages in rattrapage.items():
+                self.plages[str(nomCourt)] = [[pd.Timestamp(premier), pd.Timestamp(dernier)] for premier, dernier in plages]
+        if os.path.exists(self.fichierJournal):
+            self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Journal de rattrapage charge depuis '+str(self.fichierJournal)+\
+                                        ' : '+str(self.getNbJoursTermines())+' jours x mesures deja termines')
+
+## ######################################
+## fonctions de traitement
+## ######################################
+
+    def getJours(self, debutPartition, finPartition):
+        """
+            Retourne le couple (premierJour, dernierJour) (Timestamp) de la partition [debutPartition, finPartition]
+            (dates jj/mm/aaaa ou ISO, jours inclus)
+        """
+        return convertitDate(debutPartition).normalize(), convertitDate(finPartition).normalize()
+
+    def isTerminee(self, debutPartition, finPartition, nomCourt):
+        """
+            Permet de savoir si tous les jours de la partition [debutPartition, finPartition] sont déjà terminés pour
+            la mesure <nomCourt>
+        """
+        premierJour, dernierJour = self.getJours(debutPartition, finPartition)
+        with self.verrou:
+            return any(premier <= premierJour and dernierJour <= dernier for premier, dernier in self.plages.get(str(nomCourt), []))
+
+    def getNbJoursTermines(self):
+        """
+            Permet de récupérer le nombre de jours x mesures terminés du rattrapage
+        """
+        with self.verrou:
+            return sum((dernier - premier).days + 1 for plages in self.plages.values() for premier, dernier in plages)
+
+    def marqueTerminees(self, debutPartition, finPartition, nomsCourts):
+        """
+            Enregistrement des jours de la partition [debutPartition, finPartition] terminés pour les mesures <nomsCourts>
+            (fusion avec les plages adjacentes ou chevauchantes) puis sauvegarde du journal
+        """
+        premierJour, dernierJour = self.getJours(debutPartition, finPartition)
+        with self.verrou:
+            for nomCourt in nomsCourts:
+                fusion = []
+                for plage in sorted(self.plages.get(str(nomCourt), []) + [[premierJour, dernierJour]]):
+                    if len(fusion) > 0 and plage[0] <= fusion[-1][1] + pd.Timedelta(days=1):
+                        fusion[-1][1] = max(fusion[-1][1], plage[1])
+                    else:
+                        fusion.append(list(plage))
+                self.plages[str(nomCourt)] = fusion
+            self.journal[self.cleRattrapage] = {nomCourt: [[premier.strftime('%Y-%m-%d'), dernier.strftime('%Y-%m-%d')] \
+                                                            for premier, dernier in plages] for nomCourt, plages in self.plages.items()}
+            self.sauvegarde()
+
+    def sauvegarde(self):
+        """
+            Ecriture du journal dans le fichier <fichierJournal> (via un fichier temporaire pour ne jamais laisser un journal partiel)
+            Appelée sous le verrou du journal
+        """
+        fichierTemporaire = self.fichierJournal + '.tmp'
+        with open(fichierTemporaire, 'w', encoding='utf-8') as fichier:
+            json.dump(self.journal, fichier, indent=1, sort_keys=True)
+        os.replace(fichierTemporaire, self.fichierJournal)
@@ -13,12 +13,44 @@
     Le handler INFO implique la rotation du fichier de log quotidiennement alors 
     que le handler ERROR implique la création d'un nouveau fichier à chaque execution
     du logger.
+    Le niveau DEBUG (optionnel) permet de tracer les résumés de structures de données.
+    Les messages peuvent être passés sous forme de fonction (construction paresseuse) : 
+    ils ne sont alors construits que si le niveau de trace est actif.
+    En mode asynchrone (optionnel), les traces sont déposées dans une file bornée et écrites dans les fichiers
+    par un thread dédié (QueueListener), par lots de <tailleLot> traces :
+        - file pleine : les traces INFO et DEBUG sont perdues (et comptées), les traces ERROR et CRITICAL
+          bloquent l'appelant jusqu'à libération d'une place (elles ne sont jamais perdues)
+        - une trace ERROR ou CRITICAL provoque l'écriture immédiate du lot en cours
+        - les traces restantes sont écrites à l'arrêt du logger (arreter, appelé automatiquement en fin de programme)
+    Le dépôt dans la file est protégé par verrou et peut être réalisé depuis plusieurs threads.
 """
 
+import atexit
 import datetime
 import logging
 import logging.handlers
 import os
+import queue
+
+class DidonQueueHandler(logging.handlers.QueueHandler):
+    """
+        Handler de dépôt des traces dans la file bornée du mode asynchrone de DidonLogger :
+        file pleine => perte (comptée) des traces de niveau inférieur à ERROR, attente pour les autres
+    """
+
+    def __init__(self, fileTraces):
+        logging.handlers.QueueHandler.__init__(self, fileTraces)
+        self.nbPerdues = 0
+
+    def enqueue(self, record):
+        ## Appelé sous le verrou du handler (Handler.handle)
+        if record.levelno >= logging.ERROR:
+            self.queue.put(record)
+        else:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.nbPerdues += 1
 
 class DidonLogger:
 
@@ -26,7 +58,7 @@ class DidonLogger:
 ## constructeur
 ## ######################################
 
-    def __init__(self, programme, logDir):
+    def __init__(self, programme, logDir, niveau='INFO', asynchrone=False, tailleFile=10000, tailleLot=100):
 
         """
             Fonction d'initialisation du logger
@@ -35,6 +67,9 @@ class DidonLogger:
                 - un 'formatter' de gestion des format de traces
                 - une méthodes de trace specifique
                 - un répertoire de stockage des logs
+                - un niveau de trace optionnel <niveau> ('INFO' par défaut ou 'DEBUG')
+                - un mode asynchrone optionnel <asynchrone> avec une file de <tailleFile> traces 
+                  et une écriture par lots de <tailleLot> traces
 
         """
         print('DidonLogger.__init__ : initialisation pour '+str(programme))
@@ -61,14 +96,33 @@ class DidonLogger:
         didonHandlerError.setFormatter(didonformatter)
         didonHandlerInfo.setFormatter(didonformatter)
 
-        didonHandlerInfo.setLevel(logging.INFO)
+        niveauLogger = logging.DEBUG if niveau == 'DEBUG' else logging.INFO
+        didonHandlerInfo.setLevel(niveauLogger)
         didonHandlerError.setLevel(logging.ERROR)
         didonHandlerError.setLevel(logging.CRITICAL)
 
         self.logger = logging.getLogger(programme)
-        self.logger.setLevel(logging.INFO)
-        self.logger.addHandler(didonHandlerError)
-        self.logger.addHandler(didonHandlerInfo)
+        self.logger.setLevel(niveauLogger)
+        self.handlerFile = None
+        self.listener = None
+
+        if asynchrone:
+            ## Ecriture par lots : chaque handler fichier est alimenté par un MemoryHandler de même niveau
+            ## vidé toutes les <tailleLot> traces ou dès une trace ERROR
+            handlersLots = []
+            for handlerFichier in (didonHandlerError, didonHandlerInfo):
+                handlerLot = logging.handlers.MemoryHandler(tailleLot, flushLevel=logging.ERROR, target=handlerFichier)
+                handlerLot.setLevel(handlerFichier.level)
+                handlersLots.append(handlerLot)
+            self.handlerFile = DidonQueueHandler(queue.Queue(maxsize=tailleFile))
+            self.listener = logging.handlers.QueueListener(self.handlerFile.queue, *handlersLots, respect_handler_level=True)
+            self.handlersLots = handlersLots
+            self.listener.start()
+            self.logger.addHandler(self.handlerFile)
+            atexit.register(self.arreter)
+        else:
+            self.logger.addHandler(didonHandlerError)
+            self.logger.addHandler(didonHandlerInfo)
 
 ## ######################################
 ## fonctions utils
@@ -79,9 +133,24 @@ class DidonLogger:
             Fonction d'ecriture de log prenant en parametre :
             - origine : classe ou script appelant
             - fonction : fonction appelante
-            - message : message à tracer
-            - level : niveau de trace optionnel ('INFO' par défaut)
+            - message : message à tracer, ou fonction sans paramètre retournant le message 
+              (appelée uniquement si le niveau de trace est actif)
+            - level : niveau de trace optionnel ('INFO' par défaut, 'DEBUG', 'ERROR' ou 'CRITICAL')
         """
+        if level == 'ERROR' or level == 'CRITICAL':
+            niveau = logging.ERROR
+        elif level == 'DEBUG':
+            niveau = logging.DEBUG
+        else:
+            niveau = logging.INFO
+
+        ## Aucune construction de message si le niveau de trace n'est pas actif
+        if not self.logger.isEnabledFor(niveau):
+            return
+
+        if callable(message):
+            message = message()
+
         if origine == '':
             origine = 'Undefined'
         
@@ -93,7 +162,32 @@ class DidonLogger:
         
         msgFinal = str(origine)+'.'+str(fonction)+' : '+str(message)
 
-        if level == 'ERROR' or level == 'CRITICAL':
-            self.logger.error(msgFinal)
-        else :
-            self.logger.info(msgFinal)
+        self.logger.log(niveau, msgFinal)
+
+    def arreter(self):
+        """
+            Fonction d'arrêt du mode asynchrone : écriture des traces restantes dans la file et dans les lots,
+            trace du nombre de traces perdues, puis arrêt du thread d'écriture
+            Sans effet en mode synchrone ou si le logger est déjà arrêté
+        """
+        if self.listener is None:
+            return
+
+        if self.handlerFile.nbPerdues > 0:
+            self.logger.error('DidonLogger.arreter : '+str(self.handlerFile.nbPerdues)+' traces perdues (file de traces pleine)')
+        self.listener.stop()
+        for handlerLot in self.handlersLots:
+            handlerLot.flush()
+        self.logger.removeHandler(self.handlerFile)
+        self.listener = None
+
+    @staticmethod
+    def resumeDataFrame(structure, nbLignes=5):
+        """
+            Fonction de résumé d'une structure de données (DataFrame pandas) pour les traces :
+            dimensions, <nbLignes> premières lignes et nombre de valeurs manquantes par colonne
+        """
+        if structure is None:
+            return 'None'
+        return 'dimensions='+str(structure.shape)+'\n'+str(structure.head(nbLignes))+\
+                '\nvaleurs manquantes : '+str(dict(structure.isna().sum()))
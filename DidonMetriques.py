@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+#Nom : DidonMetriques.py
+#Description : Classe de collecte des metriques de performance des traitements DIDON
+#Copyright : 2026, Air Breizh
+#Auteur :  Manuel
+#Version: 1.0
+
+"""
+    Classe définissant les métriques de performance d'un traitement DIDON :
+    Pour chaque mesure (nom court) et chaque étape (récupération XR, remplacement des valeurs et codes,
+    rééchantillonnage, contrôle d'existence, suppression, insertion, sorties supplémentaires), cumule :
+        - le temps passé (secondes)
+        - le nombre de lignes traitées
+        - le volume de données traitées (octets)
+        - le nombre de passages
+    En fin de traitement, les métriques sont restituées sous forme de tableau récapitulatif par étape
+    et exportées au format JSON et/ou fichier texte Prometheus (node_exporter textfile collector).
+"""
+
+import json
+import os
+import threading
+import time
+
+class DidonMetriques:
+
+## ######################################
+## Declaration de variable globales
+## ######################################
+
+    global nomClasse
+    nomClasse='DidonMetriques'
+
+    ## Etapes instrumentées
+    global ETAPE_EXTRACTION_XR
+    ETAPE_EXTRACTION_XR = 'extraction_xr'
+    global ETAPE_EXTRACTION_DIDON
+    ETAPE_EXTRACTION_DIDON = 'extraction_didon_horaire'
+    global ETAPE_REMPLACEMENT
+    ETAPE_REMPLACEMENT = 'remplacement_valeurs_codes'
+    global ETAPE_REECHANTILLONNAGE
+    ETAPE_REECHANTILLONNAGE = 'reechantillonnage'
+    global ETAPE_CONTROLE_EXISTANT
+    ETAPE_CONTROLE_EXISTANT = 'controle_existant'
+    global ETAPE_SUPPRESSION
+    ETAPE_SUPPRESSION = 'suppression'
+    global ETAPE_INSERTION
+    ETAPE_INSERTION = 'insertion'
+    global ETAPE_SORTIES
+    ETAPE_SORTIES = 'sorties'
+
+## ######################################
+## constructeur
+## ######################################
+
+    def __init__(self, frequence, didonLogger):
+        """
+            Initialisation des métriques du traitement de la fréquence <frequence>
+            <didonLogger> : logger DidonLogger utilisé pour les traces
+            Le verrou <verrou> protège les relevés par mesure et par étape, cumulés à chaque enregistrement par les workers
+            et les étapes du pipeline, et parcourus lors des restitutions et des exports
+        """
+        self.frequence = frequence
+        self.didonLogger = didonLogger
+        self.verrou = threading.Lock()
+        self.releves = {}
+        self.debut = time.time()
+
+## ######################################
+## fonctions de traitement
+## ######################################
+
+    def top(self):
+        """
+            Retourne un instant de départ pour la mesure du temps d'une étape (à passer à enregistre)
+        """
+        return time.perf_counter()
+
+    def enregistre(self, nomCourt, etape, top, nbLignes=0, nbOctets=0):
+        """
+            Enregistrement d'un passage de l'étape <etape> pour la mesure <nomCourt> démarré à <top>,
+            avec <nbLignes> lignes et <nbOctets> octets traités
+        """
+        duree = time.perf_counter() - top
+        with self.verrou:
+            releve = self.releves.setdefault((str(nomCourt), etape), [0.0, 0, 0, 0])
+            releve[0] += duree
+            releve[1] += int(nbLignes)
+            releve[2] += int(nbOctets)
+            releve[3] += 1
+
+    def tailleOctets(self, *structures):
+        """
+            Retourne le volume mémoire (octets) des structures de données (DataFrame, Series ou tuples de celles-ci)
+        """
+        taille = 0
+        for structure in structures:
+            if isinstance(structure, tuple):
+                taille += self.tailleOctets(*structure)
+            elif hasattr(structure, 'memory_usage'):
+                taille += int(structure.memory_usage(index=True).sum())
+        return taille
+
+    def getParEtape(self):
+        """
+            Retourne les métriques cumulées par étape : { etape : [duree, nbLignes, nbOctets, nbPassages] }
+        """
+        parEtape = {}
+        with self.verrou:
+            for (nomCourt, etape), releve in self.releves.items():
+                cumul = parEtape.setdefault(etape, [0.0, 0, 0, 0])
+                for i in range(4):
+                    cumul[i] += releve[i]
+        return parEtape
+
+    def getResume(self, nbMesuresLentes=10):
+        """
+            Retourne le tableau récapitulatif (chaine de caractères) :
+                - par étape : durée, lignes, octets, passages
+                - les <nbMesuresLentes> mesures les plus lentes (toutes étapes confondues)
+        """
+        resume = '{0:<28} {1:>12} {2:>12} {3:>14} {4:>10}\n'.format('Etape', 'Duree (s)', 'Lignes', 'Octets', 'Passages')
+        for etape, cumul in sorted(self.getParEtape().items(), key=lambda item: -item[1][0]):
+            resume += '{0:<28} {1:>12.3f} {2:>12} {3:>14} {4:>10}\n'.format(etape, cumul[0], cumul[1], cumul[2], cumul[3])
+
+        parMesure = {}
+        with self.verrou:
+            for (nomCourt, etape), releve in self.releves.items():
+                parMesure[nomCourt] = parMesure.get(nomCourt, 0.0) + releve[0]
+        resume += 'Mesures les plus lentes : '
+        resume += ', '.join(nomCourt+' ('+str(round(duree, 3))+' s)' \
+                            for nomCourt, duree in sorted(parMesure.items(), key=lambda item: -item[1])[:nbMesuresLentes])
+        return resume+'\n'
+
+    def exporteJson(self, fichier):
+        """
+            Export des métriques détaillées (par mesure et étape) et cumulées (par étape) au format JSON dans <fichier>
+        """
+        with self.verrou:
+            detail = [{'mesure': nomCourt, 'etape': etape, 'duree_s': releve[0], 'lignes': releve[1],\
+                        'octets': releve[2], 'passages': releve[3]} for (nomCourt, etape), releve in sorted(self.releves.items())]
+        export = {'frequence': self.frequence,
+                    'debut': self.debut,
+                    'duree_totale_s': time.time() - self.debut,
+                    'etapes': {etape: {'duree_s': cumul[0], 'lignes': cumul[1], 'octets': cumul[2], 'passages': cumul[3]}\
+                                for etape, cumul in self.getParEtape().items()},
+                    'detail': detail}
+        self.ecritFichier(fichier, json.dumps(export, indent=1))
+
+    def exportePrometheus(self, fichier):
+        """
+            Export des métriques détaillées au format texte Prometheus dans <fichier> (extension .prom attendue
+            par le textfile collector de node_exporter)
+        """
+        series = [('didon_etape_duree_secondes', 'Temps passe par mesure et etape', 0),
+                    ('didon_etape_lignes', 'Lignes traitees par mesure et etape', 1),
+                    ('didon_etape_octets', 'Octets traites par mesure et etape', 2)]
+        with self.verrou:
+            releves = sorted(self.releves.items())
+        contenu = ''
+        for nom, aide, indice in series:
+            contenu += '# HELP '+nom+' '+aide+'\n# TYPE '+nom+' gauge\n'
+            for (nomCourt, etape), releve in releves:
+                contenu += nom+'{frequence="'+str(self.frequence)+'",mesure="'+nomCourt+'",etape="'+etape+'"} '+str(releve[indice])+'\n'
+        contenu += '# HELP didon_traitement_duree_secondes Duree totale du traitement\n# TYPE didon_traitement_duree_secondes gauge\n'
+        contenu += 'didon_traitement_duree_secondes{frequence="'+str(self.frequence)+'"} '+str(time.time() - self.debut)+'\n'
+        self.ecritFichier(fichier, contenu)
+
+    def ecritFichier(self, fichier, contenu):
+        """
+            Ecriture de <contenu> dans <fichier> via un fichier temporaire (pas de lecture d'un fichier partiel)
+        """
+        nomFonction='ecritFichier'
+
+        try:
+            fichierTemporaire = fichier + '.tmp'
+            with open(fichierTemporaire, 'w', encoding='utf-8') as sortie:
+                sortie.write(contenu)
+            os.replace(fichierTemporaire, fichier)
+            self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Metriques exportees dans '+str(fichier))
+        except Exception as error:
+            self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Export des metriques impossible dans '+str(fichier)+' : %s'%error,'ERROR')
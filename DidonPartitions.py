@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+#Nom : DidonPartitions.py
+#Description : Classe de gestion du partitionnement par date_mesure des tables de mesures DIDON
+#Copyright : 2026, Air Breizh
+#Auteur :  Manuel
+#Version: 1.0
+
+"""
+    Classe définissant la gestion du partitionnement des tables de mesures DIDON (PostgreSQL 11 et plus) :
+        - partitionnement par intervalles (RANGE) sur date_mesure, de granularité mensuelle ou annuelle selon la fréquence
+          (par défaut mensuelle pour H et annuelle pour D, les tables des autres fréquences ne sont pas partitionnées)
+        - conversion d'une table non partitionnée en table partitionnée (partitionneTable)
+        - création des partitions couvrant une fenêtre de traitement (creePartitions) : il n'y a pas de partition par
+          défaut, les partitions sont créées avant l'écriture des mesures
+        - clé primaire (nom_mes_court, date_mesure), déclarée sur la table partitionnée et propagée à ses partitions,
+          utilisée par le mapping SQLAlchemy, les requêtes de contrôle d'existence, de suppression et de lecture des
+          mesures d'une plage, et par le mode de remplacement UPSERT (creeIndex)
+        - rechargement complet d'une partition par échange (echangePartition) : chargement d'une table de transit
+          puis, en une transaction, détachement et suppression de la partition existante et rattachement de la table
+          de transit à sa place (DETACH / ATTACH PARTITION) au lieu de suppressions ligne à ligne
+    Usage (maintenance des partitions et des index) :
+    python DidonPartitions.py <frequence> <environnement> [<debut> <fin>]
+    <frequence> et <environnement> :
+        Mêmes valeurs que pour DidonGetMesures
+    <debut> <fin> :
+        Facultatifs, dates au format jj/mm/aaaa de la fenêtre à couvrir par des partitions, à défaut de la plus
+        ancienne date_mesure de la table à getNbPartitionsAvance() partitions après la date du jour
+"""
+
+import pandas as pd
+from sys import argv
+
+class DidonPartitions:
+
+## ######################################
+## Declaration de variable globales
+## ######################################
+
+    global nomClasse
+    nomClasse='DidonPartitions'
+
+    ## Granularités de partitionnement
+    global LABEL_PARTITION_MOIS
+    LABEL_PARTITION_MOIS = 'MOIS'
+    global LABEL_PARTITION_ANNEE
+    LABEL_PARTITION_ANNEE = 'ANNEE'
+
+    ## Suffixes des tables de transit (échange de partition) et des tables converties (partitionneTable)
+    global SUFFIXE_TRANSIT
+    SUFFIXE_TRANSIT = '_transit'
+    global SUFFIXE_NON_PARTITIONNEE
+    SUFFIXE_NON_PARTITIONNEE = '_non_partitionnee'
+
+## ######################################
+## constructeur
+## ######################################
+
+    def __init__(self, engineDidon, schema, granularites, nbPartitionsAvance, delaiVerrou, didonLogger):
+        """
+            Initialisation de la gestion des partitions :
+                - <engineDidon> : engine SQLAlchemy de la base DIDON (PostgreSQL)
+                - <schema> : schéma des tables de mesures DIDON
+                - <granularites> : dictionnaire fréquence => LABEL_PARTITION_MOIS ou LABEL_PARTITION_ANNEE
+                  (fréquences absentes : tables non partitionnées)
+                - <nbPartitionsAvance> : nombre de partitions créées par avance après la date du jour (maintenance)
+                - <delaiVerrou> : délai maximal (secondes) d'attente des verrous lors d'un échange de partition
+                - <didonLogger> : logger DidonLogger utilisé pour les traces
+        """
+        self.engineDidon = engineDidon
+        self.schema = schema
+        self.granularites = dict(granularites)
+        self.nbPartitionsAvance = max(0, int(nbPartitionsAvance))
+        self.delaiVerrou = float(delaiVerrou)
+        self.didonLogger = didonLogger
+        ## Partitions déjà créées ou contrôlées pendant le traitement (évite les ordres DDL répétés)
+        self.partitionsConnues = set()
+
+## ######################################
+## fonctions de traitement
+## ######################################
+
+    def getGranularite(self, frequence):
+        """
+            Permet de récupérer la granularité de partitionnement de la table de la fréquence <frequence> (None si non partitionnée)
+        """
+        return self.granularites.get(str(frequence))
+
+    def getBornesPartitions(self, frequence, debut, fin):
+        """
+            Retourne la liste des bornes (debutPartition, finPartition exclue) des partitions de la fréquence <frequence>
+            couvrant les dates <debut> à <fin> incluses (Timestamp), liste vide si la table n'est pas partitionnée
+        """
+        granularite = self.getGranularite(frequence)
+        if granularite is None:
+            return []
+        courant = pd.Timestamp(debut).normalize().replace(day=1)
+        if granularite == LABEL_PARTITION_ANNEE:
+            courant = courant.replace(month=1)
+            pas = pd.offsets.YearBegin(1)
+        else:
+            pas = pd.offsets.MonthBegin(1)
+        bornes = []
+        while courant <= pd.Timestamp(fin):
+            suivant = courant + pas
+            bornes.append((courant, suivant))
+            courant = suivant
+        return bornes
+
+    def getNomPartition(self, table, frequence, debutPartition):
+        """
+            Retourne le nom de la partition de <table> débutant à <debutPartition> : <table>_aaaamm ou <table>_aaaa
+        """
+        if self.getGranularite(frequence) == LABEL_PARTITION_ANNEE:
+            return str(table)+'_'+debutPartition.strftime('%Y')
+        return str(table)+'_'+debutPartition.strftime('%Y%m')
+
+    def getNomQualifie(self, nomTable):
+        """
+            Retourne le nom qualifié (schéma des mesures DIDON) de la table <nomTable>
+        """
+        return '"'+str(self.schema)+'"."'+str(nomTable)+'"'
+
+    def getClausePartition(self, debutPartition, finPartition):
+        """
+            Retourne la clause FOR VALUES d'une partition couvrant [debutPartition, finPartition[
+        """
+        return "FOR VALUES FROM ('"+debutPartition.strftime('%Y-%m-%d %H:%M:%S')+"') TO ('"+\
+                finPartition.strftime('%Y-%m-%d %H:%M:%S')+"')"
+
+    def isPartitionnee(self, curseur, table):
+        """
+            Permet de savoir si la table <table> est une table partitionnée (curseur psycopg2 <curseur>)
+        """
+        curseur.execute('SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid '+\
+                        'JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = %s AND c.relname = %s',
+                        (str(self.schema), str(table)))
+        return curseur.fetchone() is not None
+
+    def execute(self, operation):
+        """
+            Exécution de <operation> (fonction (curseur psycopg2) => résultat) en une transaction sur une connexion
+            du pool de l'engine DIDON, annulée en cas d'erreur (propagée)
+        """
+        connexion = self.engineDidon.raw_connection()
+        try:
+            curseur = connexion.cursor()
+            resultat = operation(curseur)
+            connexion.commit()
+            return resultat
+        except Exception:
+            connexion.rollback()
+            raise
+        finally:
+            connexion.close()
+
+    def maintient(self, table, frequence, debut=None, fin=None):
+        """
+            Maintenance de la table <table> de la fréquence <frequence> :
+                - conversion en table partitionnée si elle ne l'est pas (partitionneTable)
+                - création des partitions de <debut> à <fin> (Timestamp), par défaut de la plus ancienne date_mesure
+                  de la table (date du jour si elle est vide) à getNbPartitionsAvance() partitions après la date du jour
+                - création de la clé primaire (nom_mes_court, date_mesure) si elle est absente (creeIndex)
+            Sans effet si la fréquence n'a pas de granularité de partitionnement
+        """
+
+        nomFonction='maintient'
+
+        if self.getGranularite(frequence) is None:
+            self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Table '+str(table)+' non partitionnee (frequence '+str(frequence)+')')
+            return
+        self.partitionneTable(table, frequence)
+        if debut is None:
+            def lecturePlusAncienne(curseur):
+                curseur.execute('SELECT min(date_mesure) FROM '+self.getNomQualifie(table))
+                return curseur.fetchone()[0]
+            plusAncienne = self.execute(lecturePlusAncienne)
+            debut = pd.Timestamp(plusAncienne) if plusAncienne is not None else pd.Timestamp.now()
+        if fin is None:
+            fin = pd.Timestamp.now().normalize()
+            for indice in range(self.nbPartitionsAvance):
+                fin = self.getBornesPartitions(frequence, fin, fin)[0][1]
+        self.creePartitions(table, frequence, debut, fin)
+        self.creeIndex(table)
+
+    def partitionneTable(self, table, frequence):
+        """
+            Conversion de la table non partitionnée <table> en table partitionnée par intervalles de date_mesure,
+            en une transaction :
+                - renommage de la table existante en <table>SUFFIXE_NON_PARTITIONNEE
+                - création de la table partitionnée de même structure (colonnes et valeurs par défaut) avec la clé
+                  primaire (nom_mes_court, date_mesure), qui inclut la clé de partitionnement
+                - création des partitions couvrant les mesures existantes puis copie des mesures
+            La table renommée est conservée (suppression, droits et index annexes à la charge de l'administrateur)
+            Sans effet si la table est déjà partitionnée
+        """
+
+        nomFonction='partitionneTable'
+
+        def conversion(curseur):
+            if self.isPartitionnee(curseur, table):
+                return None
+            ancienne = str(table)+SUFFIXE_NON_PARTITIONNEE
+            curseur.execute('ALTER TABLE '+self.getNomQualifie(table)+' RENAME TO "'+ancienne+'"')
+            curseur.execute('CREATE TABLE '+self.getNomQualifie(table)+' (LIKE '+self.getNomQualifie(ancienne)+\
+                            ' INCLUDING DEFAULTS, PRIMARY KEY (nom_mes_court, date_mesure)) PARTITION BY RANGE (date_mesure)')
+            curseur.execute('SELECT min(date_mesure), max(date_mesure) FROM '+self.getNomQualifie(ancienne))
+            plusAncienne, plusRecente = curseur.fetchone()
+            if plusAncienne is not None:
+                for debutPartition, finPartition in self.getBornesPartitions(frequence, plusAncienne, plusRecente):
+                    self.creePartition(curseur, table, frequence, debutPartition, finPartition)
+            curseur.execute('INSERT INTO '+self.getNomQualifie(table)+' SELECT * FROM '+self.getNomQualifie(ancienne))
+            return curseur.rowcount
+
+        nbLignes = self.execute(conversion)
+        if nbLignes is not None:
+            self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Table '+str(table)+' convertie en table partitionnee ('+\
+                                        str(nbLignes)+' lignes copiees, table d\'origine conservee sous le nom '+\
+                                        str(table)+SUFFIXE_NON_PARTITIONNEE+')')
+
+    def creePartitions(self, table, frequence, debut, fin):
+        """
+            Création des partitions manquantes de la table partitionnée <table> couvrant les dates <debut> à <fin> incluses
+            Sans effet si la fréquence n'a pas de granularité de partitionnement ou si la table n'est pas partitionnée
+        """
+
+        nomFonction='creePartitions'
+
+        bornes = [(debutPartition, finPartition) for debutPartition, finPartition in self.getBornesPartitions(frequence, debut, fin) \
+                    if self.getNomPartition(table, frequence, debutPartition) not in self.partitionsConnues]
+        if len(bornes) == 0:
+            return
+
+        def creation(curseur):
+            if not self.isPartitionnee(curseur, table):
+                return 0
+            for debutPartition, finPartition in bornes:
+                self.creePartition(curseur, table, frequence, debutPartition, finPartition)
+            return len(bornes)
+
+        if self.execute(creation) > 0:
+            self.partitionsConnues.update(self.getNomPartition(table, frequence, debutPartition) for debutPartition, finPartition in bornes)
+            self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Partitions de '+str(table)+' presentes de '+\
+                                        str(bornes[0][0].date())+' a '+str(bornes[-1][1].date()))
+
+    def creePartition(self, curseur, table, frequence, debutPartition, finPartition):
+        """
+            Création (si elle n'existe pas) de la partition de <table> couvrant [debutPartition, finPartition[
+        """
+        curseur.execute('CREATE TABLE IF NOT EXISTS '+self.getNomQualifie(self.getNomPartition(table, frequence, debutPartition))+\
+                        ' PARTITION OF '+self.getNomQualifie(table)+' '+self.getClausePartition(debutPartition, finPartition))
+
+    def creeIndex(self, table):
+        """
+            Création (si la table n'a pas de clé primaire) de la clé primaire (nom_mes_court, date_mesure) de la table
+            <table>, propagée à toutes ses partitions (y compris celles créées ultérieurement)
+            Si des doublons empêchent la clé primaire, un index non unique est créé à la place (erreur tracée)
+        """
+
+        nomFonction='creeIndex'
+
+        def lectureCle(curseur):
+            curseur.execute('SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indrelid '+\
+                            'JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = %s AND c.relname = %s AND i.indisprimary',
+                            (str(self.schema), str(table)))
+            return curseur.fetchone() is not None
+
+        if not self.execute(lectureCle):
+            try:
+                self.execute(lambda curseur: curseur.execute('ALTER TABLE '+self.getNomQualifie(table)+\
+                                                            ' ADD PRIMARY KEY (nom_mes_court, date_mesure)'))
+            except Exception as error:
+                self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Cle primaire impossible sur '+str(table)+\
+                                            ' (doublons ?) : %s'%error+' => index non unique','ERROR')
+                self.execute(lambda curseur: curseur.execute('CREATE INDEX IF NOT EXISTS "'+str(table)+'_mesure_date_idx" ON '+\
+                                                            self.getNomQualifie(table)+' (nom_mes_court, date_mesure)'))
+        self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Index (nom_mes_court, date_mesure) present sur '+str(table))
+
+    def echangePartition(self, table, frequence, debutPartition, chargement):
+        """
+            Rechargement complet de la partition de <table> débutant à <debutPartition> par échange :
+                - création d'une table de transit de même structure avec une contrainte sur les bornes de la partition
+                  (le rattachement n'a alors pas à parcourir les lignes)
+                - chargement de la table de transit par <chargement> (fonction (nom qualifié de la table de transit)
+                  => nombre de lignes chargées), sur ses propres connexions
+                - clé primaire (nom_mes_court, date_mesure) de la table de transit, créée après le chargement (elle
+                  devient la partition de la clé primaire de <table> au rattachement), et statistiques
+                - en une transaction (délai d'attente des verrous borné) : détachement et suppression de la partition
+                  existante, renommage et rattachement de la table de transit
+            La partition n'est pas modifiée si le chargement ou l'échange est en erreur (table de transit supprimée,
+            erreur propagée)
+            Retourne le nombre de lignes de la nouvelle partition
+        """
+
+        nomFonction='echangePartition'
+
+        debutPartition, finPartition = self.getBornesPartitions(frequence, debutPartition, debutPartition)[0]
+        partition = self.getNomPartition(table, frequence, debutPartition)
+        transit = partition+SUFFIXE_TRANSIT
+
+        def creationTransit(curseur):
+            curseur.execute('DROP TABLE IF EXISTS '+self.getNomQualifie(transit))
+            curseur.execute('CREATE TABLE '+self.getNomQualifie(transit)+' (LIKE '+self.getNomQualifie(table)+' INCLUDING DEFAULTS)')
+            curseur.execute('ALTER TABLE '+self.getNomQualifie(transit)+' ADD CONSTRAINT "'+transit+'_bornes" CHECK '+\
+                            '(date_mesure IS NOT NULL AND date_mesure >= %s AND date_mesure < %s)',
+                            (debutPartition.to_pydatetime(), finPartition.to_pydatetime()))
+
+        def indexationTransit(curseur):
+            curseur.execute('ALTER TABLE '+self.getNomQualifie(transit)+' ADD PRIMARY KEY (nom_mes_court, date_mesure)')
+            curseur.execute('ANALYZE '+self.getNomQualifie(transit))
+
+        def echange(curseur):
+            curseur.execute("SET LOCAL lock_timeout = '"+str(int(self.delaiVerrou*1000))+"ms'")
+            curseur.execute('SELECT 1 FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '+\
+                            'JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = %s AND c.relname = %s',
+                            (str(self.schema), partition))
+            if curseur.fetchone() is not None:
+                curseur.execute('ALTER TABLE '+self.getNomQualifie(table)+' DETACH PARTITION '+self.getNomQualifie(partition))
+                curseur.execute('DROP TABLE '+self.getNomQualifie(partition))
+            curseur.execute('ALTER TABLE '+self.getNomQualifie(transit)+' RENAME TO "'+partition+'"')
+            curseur.execute('ALTER TABLE '+self.getNomQualifie(table)+' ATTACH PARTITION '+self.getNomQualifie(partition)+\
+                            ' '+self.getClausePartition(debutPartition, finPartition))
+
+        self.execute(creationTransit)
+        try:
+            nbLignes = chargement(self.getNomQualifie(transit))
+            self.execute(indexationTransit)
+            self.execute(echange)
+        except Exception:
+            try:
+                self.execute(lambda curseur: curseur.execute('DROP TABLE IF EXISTS '+self.getNomQualifie(transit)))
+            except Exception as error:
+                self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Suppression impossible de '+transit+' : %s'%error,'ERROR')
+            raise
+        self.partitionsConnues.add(partition)
+        self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Partition '+partition+' de '+str(table)+' echangee : '+\
+                                    str(nbLignes)+' lignes')
+        return nbLignes
+
+## ######################################
+## fonction principale
+## ######################################
+
+'''
+    Usage explanation
+'''
+def Usage():
+    print ("Argument manquant.")
+    print ("Usage:")
+    print (argv[0] + ' <frequenceDemandée> [A|M|J|H ou combinaison, ex : HD] <environnement> [default PROD|LOCAL] '+\
+            '[<debut> <fin> (jj/mm/aaaa)]')
+    exit()
+
+'''
+    main
+'''
+
+if __name__ == "__main__":
+
+    from DidonGetMesures import DidonGetMesures
+    from DidonDates import convertitDate
+
+    if len(argv) < 2 or len(argv) == 4:
+        Usage()
+    env = 'LOCAL' if len(argv) >= 3 and str(argv[2]) == 'LOCAL' else 'PROD'
+
+    ## Connexion DIDON uniquement (pas de récupération XR)
+    dgm = DidonGetMesures(env, argv[1], connexionImmediate=False)
+    dgm.connectDidon()
+    if not dgm.getDIDONConnected():
+        print('Connexion DIDON impossible')
+        exit(1)
+    partitions = dgm.getPartitions() if dgm.getPartitions() is not None else dgm.creePartitionsDidon()
+    debut = convertitDate(argv[3]) if len(argv) >= 5 else None
+    fin = convertitDate(argv[4]) if len(argv) >= 5 else None
+    for freq in dgm.getFrequencesMesure():
+        partitions.maintient(dgm.getTableAUtiliser(freq), freq, debut, fin)
+    dgm.disconnect()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+#Nom : DidonPipeline.py
+#Description : Classe d'execution en pipeline (extraction, transformation, chargement) des traitements DIDON
+#Copyright : 2026, Air Breizh
+#Auteur :  Manuel
+#Version: 1.0
+
+"""
+    Classe définissant l'exécution en pipeline d'un traitement DIDON découpé en trois étapes appliquées à chaque élément
+    (lot de mesures) :
+        - extraction (récupération XR) dans un thread dédié
+        - transformation (remplacements, rééchantillonnage, structure de sortie) dans un thread dédié
+        - chargement (écriture en base DIDON) dans le thread appelant
+    Les étapes communiquent par des files bornées de <tailleFile> éléments : l'extraction des éléments suivants se
+    déroule pendant la transformation et le chargement des précédents, et la mémoire est bornée par la taille des files
+    (une étape en avance attend qu'une place se libère).
+    Chaque étape traite les éléments un par un dans leur ordre d'arrivée : l'ordre des résultats est celui des éléments.
+    L'erreur d'une étape sur un élément n'interrompt pas le pipeline : l'élément n'est pas transmis aux étapes
+    suivantes et son résultat est celui de la fonction <surErreur>.
+    Pour chaque étape sont cumulés le temps de traitement, le temps d'attente d'un élément en entrée (file vide)
+    et le temps d'attente d'une place en sortie (file pleine).
+"""
+
+import queue
+import threading
+import time
+
+class DidonPipeline:
+
+## ######################################
+## Declaration de variable globales
+## ######################################
+
+    global nomClasse
+    nomClasse='DidonPipeline'
+
+    ## Etapes du pipeline
+    global ETAPE_PIPELINE_EXTRACTION
+    ETAPE_PIPELINE_EXTRACTION = 'extraction'
+    global ETAPE_PIPELINE_TRANSFORMATION
+    ETAPE_PIPELINE_TRANSFORMATION = 'transformation'
+    global ETAPE_PIPELINE_CHARGEMENT
+    ETAPE_PIPELINE_CHARGEMENT = 'chargement'
+    global ETAPES_PIPELINE
+    ETAPES_PIPELINE = [ETAPE_PIPELINE_EXTRACTION, ETAPE_PIPELINE_TRANSFORMATION, ETAPE_PIPELINE_CHARGEMENT]
+
+    ## Marqueur de fin de file
+    global FIN_FILE
+    FIN_FILE = object()
+
+## ######################################
+## constructeur
+## ######################################
+
+    def __init__(self, extraction, transformation, chargement, tailleFile, didonLogger):
+        """
+            Initialisation du pipeline :
+                - <extraction> : fonction (element) => données extraites
+                - <transformation> : fonction (element, données extraites) => données transformées
+                - <chargement> : fonction (element, données transformées) => résultat de l'élément
+                - <tailleFile> : nombre maximal d'éléments en attente entre deux étapes
+                - <didonLogger> : logger DidonLogger utilisé pour les traces
+        """
+        self.extraction = extraction
+        self.transformation = transformation
+        self.chargement = chargement
+        self.tailleFile = max(1, int(tailleFile))
+        self.didonLogger = didonLogger
+        self.verrou = threading.Lock()
+        self.cumuls = {}
+        self.arret = threading.Event()
+
+## ######################################
+## fonctions de traitement
+## ######################################
+
+    def execute(self, elements, surErreur):
+        """
+            Exécution du pipeline sur la liste <elements>
+            <surErreur> : fonction (element, etape, erreur) => résultat d'un élément dont une étape est en erreur
+            Retourne la liste des résultats dans l'ordre de <elements>
+        """
+        nomFonction='execute'
+
+        self.cumuls = {etape: [0.0, 0.0, 0.0, 0] for etape in ETAPES_PIPELINE}
+        self.arret.clear()
+        fileExtraction = queue.Queue(maxsize=self.tailleFile)
+        fileTransformation = queue.Queue(maxsize=self.tailleFile)
+        threads = [threading.Thread(target=self.executeExtraction, args=(elements, fileExtraction), name=nomClasse+'-extraction'),
+                    threading.Thread(target=self.executeEtape, args=(ETAPE_PIPELINE_TRANSFORMATION, self.transformation,\
+                                                                    fileExtraction, fileTransformation), name=nomClasse+'-transformation')]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        resultats = [None for element in elements]
+        try:
+            ## Chargement dans le thread appelant
+            while True:
+                entree = self.retire(ETAPE_PIPELINE_CHARGEMENT, fileTransformation)
+                if entree is FIN_FILE or entree is None:
+                    break
+                indice, element, erreur, donnees = entree
+                if erreur is not None:
+                    resultats[indice] = surErreur(element, erreur[0], erreur[1])
+                    continue
+                top = time.perf_counter()
+                try:
+                    resultats[indice] = self.chargement(element, donnees)
+                except Exception as error:
+                    resultats[indice] = surErreur(element, ETAPE_PIPELINE_CHARGEMENT, error)
+                self.cumule(ETAPE_PIPELINE_CHARGEMENT, 0, time.perf_counter() - top, 1)
+        finally:
+            ## Arrêt des étapes en amont (cas d'une erreur imprévue du chargement)
+            self.arret.set()
+            for thread in threads:
+                thread.join()
+        self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Pipeline de '+str(len(elements))+' elements :\n'+self.getResume())
+        return resultats
+
+    def executeExtraction(self, elements, fileSortie):
+        """
+            Etape d'extraction (thread dédié) : extraction de chaque élément et dépôt dans <fileSortie>
+        """
+        for indice, element in enumerate(elements):
+            if self.arret.is_set():
+                return
+            top = time.perf_counter()
+            try:
+                entree = (indice, element, None, self.extraction(element))
+            except Exception as error:
+                entree = (indice, element, (ETAPE_PIPELINE_EXTRACTION, error), None)
+            self.cumule(ETAPE_PIPELINE_EXTRACTION, 0, time.perf_counter() - top, 1)
+            self.depose(ETAPE_PIPELINE_EXTRACTION, fileSortie, entree)
+        self.depose(ETAPE_PIPELINE_EXTRACTION, fileSortie, FIN_FILE)
+
+    def executeEtape(self, etape, fonction, fileEntree, fileSortie):
+        """
+            Etape intermédiaire <etape> (thread dédié) : application de <fonction> à chaque élément de <fileEntree>
+            et dépôt dans <fileSortie>. Les éléments en erreur sont transmis sans traitement
+        """
+        while True:
+            entree = self.retire(etape, fileEntree)
+            if entree is FIN_FILE or entree is None:
+                self.depose(etape, fileSortie, FIN_FILE)
+                return
+            indice, element, erreur, donnees = entree
+            if erreur is None:
+                top = time.perf_counter()
+                try:
+                    entree = (indice, element, None, fonction(element, donnees))
+                except Exception as error:
+                    entree = (indice, element, (etape, error), None)
+                self.cumule(etape, 0, time.perf_counter() - top, 1)
+            if not self.depose(etape, fileSortie, entree):
+                return
+
+    def retire(self, etape, fileEntree):
+        """
+            Retrait du prochain élément de <fileEntree> par l'étape <etape>, avec cumul du temps d'attente en entrée
+            Retourne None si le pipeline est arrêté
+        """
+        top = time.perf_counter()
+        while True:
+            try:
+                entree = fileEntree.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if self.arret.is_set():
+                    entree = None
+                    break
+        self.cumule(etape, 1, time.perf_counter() - top)
+        return entree
+
+    def depose(self, etape, fileSortie, entree):
+        """
+            Dépôt de <entree> dans <fileSortie> par l'étape <etape>, avec cumul du temps d'attente d'une place en sortie
+            Retourne False si le pipeline est arrêté avant le dépôt
+        """
+        top = time.perf_counter()
+        while True:
+            try:
+                fileSortie.put(entree, timeout=0.1)
+                depose = True
+                break
+            except queue.Full:
+                if self.arret.is_set():
+                    depose = False
+                    break
+        self.cumule(etape, 2, time.perf_counter() - top)
+        return depose
+
+    def cumule(self, etape, indice, duree, nbElements=0):
+        """
+            Cumul de <duree> dans le compteur <indice> (0 : traitement, 1 : attente en entrée, 2 : attente en sortie)
+            de l'étape <etape> et de <nbElements> éléments traités
+        """
+        with self.verrou:
+            cumul = self.cumuls.setdefault(etape, [0.0, 0.0, 0.0, 0])
+            cumul[indice] += duree
+            cumul[3] += nbElements
+
+    def getParEtape(self):
+        """
+            Retourne les cumuls par étape : { etape : [duree traitement, attente entree, attente sortie, nbElements] }
+        """
+        with self.verrou:
+            return {etape: list(cumul) for etape, cumul in self.cumuls.items()}
+
+    def getResume(self):
+        """
+            Retourne le tableau récapitulatif (chaine de caractères) des temps de traitement et d'attente par étape
+        """
+        resume = '{0:<16} {1:>12} {2:>16} {3:>16} {4:>10}\n'.format('Etape', 'Duree (s)', 'Attente entree', 'Attente sortie', 'Elements')
+        parEtape = self.getParEtape()
+        for etape in ETAPES_PIPELINE:
+            cumul = parEtape.get(etape, [0.0, 0.0, 0.0, 0])
+            resume += '{0:<16} {1:>12.3f} {2:>16.3f} {3:>16.3f} {4:>10}\n'.format(etape, cumul[0], cumul[1], cumul[2], cumul[3])
+        return resume
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+#Nom : DidonSorties.py
+#Description : Classes des sorties supplementaires (PostgreSQL, Parquet, CSV) des traitements DIDON
+#Copyright : 2026, Air Breizh
+#Auteur :  Manuel
+#Version: 1.0
+
+"""
+    Classes des sorties supplémentaires de DidonGetMesures, alimentées avec les mesures écrites (lignes avec code
+    de validation) à partir d'une seule extraction XR. Chaque sortie dispose des méthodes :
+        - marquePlage(nomCourt, debut, fin, frequence) : plage de date_mesure remplacée en base DIDON pour une mesure
+        - ecrit(nomCourt, valEtCodes, frequence) : écriture des lignes d'une mesure
+        - termine() : fin de chargement (écriture des données en attente)
+        - ferme() : libération des ressources en fin de traitement
+    Sorties disponibles :
+        - DidonSortiePostgreSQL : base PostgreSQL (autre que DIDON), remplacement en une transaction des mesures de la
+          plage de date_mesure remplacée en base DIDON (marquePlage) puis chargement par COPY (copieMesures)
+        - DidonSortieFichiers : fichiers Parquet (LABEL_SORTIE_PARQUET) ou CSV (LABEL_SORTIE_CSV) partitionnés par
+          fréquence et par date :
+            <repertoire>/frequence=<frequence>/annee=<aaaa>[/mois=<mm>]/<horodatage>.parquet|csv
+          Les lignes sont mises en attente par partition et écrites par groupes de <tailleGroupe> lignes (row groups
+          Parquet), le volume total en attente étant borné à 4 x <tailleGroupe> lignes. Un fichier par partition est
+          écrit par chargement (suffixe .tmp jusqu'à termine()), avec une colonne date_chargement permettant de ne
+          retenir que le dernier chargement d'une mesure. Le format Parquet nécessite pyarrow
+    La fonction copieMesures (COPY PostgreSQL des colonnes COLONNES_MESURE) est partagée avec DidonGetMesures
+"""
+
+import datetime
+import io
+import os
+import threading
+import pandas as pd
+from sqlalchemy import create_engine
+from DidonPartitions import LABEL_PARTITION_MOIS
+
+## Types de sorties supplémentaires
+LABEL_SORTIE_POSTGRESQL = 'POSTGRESQL'
+LABEL_SORTIE_PARQUET = 'PARQUET'
+LABEL_SORTIE_CSV = 'CSV'
+
+## Colonnes de la structure de données de sortie écrites en base (DIDON et sortie PostgreSQL)
+COLONNES_MESURE = ['nom_mes_court', 'date_mesure', 'valeur_mesure', 'code_validation']
+
+def copieMesures(curseur, valEtCodes, tableQualifiee):
+    """
+        Copie (COPY ... FROM STDIN) des colonnes COLONNES_MESURE de <valEtCodes> dans <tableQualifiee> via le curseur 
+        psycopg2 <curseur>, sans validation de la transaction
+        Les valeurs manquantes sont transmises comme NULL et le code de validation comme entier
+        Retourne le nombre de lignes copiées
+    """
+    tampon = io.StringIO()
+    valEtCodes.assign(code_validation=pd.to_numeric(valEtCodes['code_validation']).astype('int64')).\
+        to_csv(tampon, columns=COLONNES_MESURE, header=False, index=False, na_rep='', date_format='%Y-%m-%d %H:%M:%S')
+    tampon.seek(0)
+    curseur.copy_expert('COPY '+tableQualifiee+' ('+','.join(COLONNES_MESURE)+') FROM STDIN WITH (FORMAT csv)', tampon)
+    return len(valEtCodes)
+
+class DidonSortiePostgreSQL:
+
+## ######################################
+## Declaration de variable globales
+## ######################################
+
+    global nomClasse
+    nomClasse='DidonSortiePostgreSQL'
+
+## ######################################
+## constructeur
+## ######################################
+
+    def __init__(self, url, schema, tables, didonLogger):
+        """
+            Initialisation de la sortie PostgreSQL :
+                - <url> : URL SQLAlchemy de la base cible
+                - <schema> : schéma des tables cibles
+                - <tables> : dictionnaire fréquence => table cible (mêmes colonnes que les tables DIDON)
+                - <didonLogger> : logger DidonLogger utilisé pour les traces
+            Le verrou <verrou> ne protège que le compteur de lignes écrites et les plages marquées : chaque écriture d'une 
+            mesure utilise sa propre connexion du pool et sa propre transaction, les workers écrivent donc en parallèle
+        """
+        self.engine = create_engine(url, pool_pre_ping=True)
+        self.schema = schema
+        self.tables = dict(tables)
+        self.didonLogger = didonLogger
+        self.verrou = threading.Lock()
+        self.nbLignes = 0
+        ## Plages de date_mesure remplacées en base DIDON, en attente de remplacement : { (nomCourt, frequence) : [debut, fin] }
+        self.plages = {}
+
+## ######################################
+## fonctions de traitement
+## ######################################
+
+    def getLibelle(self):
+        """
+            Retourne le libellé de la sortie (base cible) pour les traces et le cr final
+        """
+        return 'PostgreSQL '+self.engine.url.render_as_string(hide_password=True)
+
+    def getNbLignes(self):
+        """
+            Permet de récupérer le nombre de lignes écrites depuis la création
+        """
+        return self.nbLignes
+
+    def getTableQualifiee(self, frequence):
+        """
+            Retourne le nom qualifié de la table cible de la fréquence <frequence> (None si la fréquence n'a pas de table)
+        """
+        table = self.tables.get(str(frequence))
+        if table is None:
+            return None
+        return '"'+str(self.schema)+'"."'+str(table)+'"'
+
+    def marquePlage(self, nomCourt, debut, fin, frequence):
+        """
+            Enregistrement de la plage [debut, fin] (Timestamp) de date_mesure remplacée en base DIDON pour la mesure <nomCourt>,
+            remplacée dans la table cible par l'écriture suivante de la mesure (ou par termine si la mesure n'a aucune ligne
+            à écrire) : les lignes supprimées ou invalidées dans DIDON sont aussi supprimées de la table cible
+            Plusieurs plages marquées pour une même mesure avant son écriture sont réunies
+        """
+        if self.getTableQualifiee(frequence) is None:
+            return
+        cle = (str(nomCourt), str(frequence))
+        with self.verrou:
+            plage = self.plages.get(cle)
+            if plage is None:
+                self.plages[cle] = [pd.Timestamp(debut), pd.Timestamp(fin)]
+            else:
+                self.plages[cle] = [min(plage[0], pd.Timestamp(debut)), max(plage[1], pd.Timestamp(fin))]
+
+    def ecrit(self, nomCourt, valEtCodes, frequence):
+        """
+            Remplacement en une transaction des mesures <nomCourt> de la table de la fréquence <frequence> sur la plage
+            marquée (marquePlage), étendue au [min,max] de date_mesure de <valEtCodes> : suppression puis COPY des lignes
+            Les fréquences sans table cible sont ignorées
+        """
+        tableQualifiee = self.getTableQualifiee(frequence)
+        if tableQualifiee is None:
+            return
+        with self.verrou:
+            plage = self.plages.pop((str(nomCourt), str(frequence)), None)
+        if len(valEtCodes) > 0:
+            dates = pd.to_datetime(valEtCodes['date_mesure'])
+            plage = [dates.min(), dates.max()] if plage is None else [min(plage[0], dates.min()), max(plage[1], dates.max())]
+        if plage is None:
+            return
+        self.remplace(tableQualifiee, nomCourt, plage, valEtCodes)
+        with self.verrou:
+            self.nbLignes += len(valEtCodes)
+
+    def remplace(self, tableQualifiee, nomCourt, plage, valEtCodes):
+        """
+            Remplacement en une transaction des lignes de la mesure <nomCourt> de <tableQualifiee> sur la plage [debut, fin]
+            <plage> de date_mesure par les lignes <valEtCodes> (suppression seule si <valEtCodes> est vide)
+        """
+        connexion = self.engine.raw_connection()
+        try:
+            curseur = connexion.cursor()
+            curseur.execute('DELETE FROM '+tableQualifiee+' WHERE nom_mes_court = %s AND date_mesure BETWEEN %s AND %s',
+                            (str(nomCourt), pd.Timestamp(plage[0]).to_pydatetime(), pd.Timestamp(plage[1]).to_pydatetime()))
+            if len(valEtCodes) > 0:
+                copieMesures(curseur, valEtCodes, tableQualifiee)
+            connexion.commit()
+        except Exception:
+            connexion.rollback()
+            raise
+        finally:
+            connexion.close()
+
+    def termine(self):
+        """
+            Fin de chargement : suppression dans la table cible des plages marquées des mesures sans ligne écrite 
+            (ex : mesure sans donnée XR sur une partition rechargée)
+        """
+        with self.verrou:
+            plages = self.plages
+            self.plages = {}
+        for (nomCourt, frequence), plage in plages.items():
+            self.remplace(self.getTableQualifiee(frequence), nomCourt, plage, pd.DataFrame(columns=COLONNES_MESURE))
+
+    def ferme(self):
+        """
+            Fermeture des connexions du pool de la base cible
+        """
+        self.engine.dispose()
+
+class DidonSortieFichiers:
+
+## ######################################
+## constructeur
+## ######################################
+
+    def __init__(self, repertoire, formatFichiers, tailleGroupe, granularites, didonLogger):
+        """
+            Initialisation de la sortie fichiers :
+                - <repertoire> : répertoire racine des partitions
+                - <formatFichiers> : LABEL_SORTIE_PARQUET ou LABEL_SORTIE_CSV
+                - <tailleGroupe> : nombre de lignes par groupe écrit (row group Parquet)
+                - <granularites> : dictionnaire fréquence => LABEL_PARTITION_MOIS ou LABEL_PARTITION_ANNEE
+                  (partitions annuelles pour les fréquences absentes)
+                - <didonLogger> : logger DidonLogger utilisé pour les traces
+            Lève ImportError si le format Parquet est demandé sans pyarrow
+            Le verrou <verrou> protège les lignes en attente par partition, les fichiers ouverts et l'horodatage du 
+            chargement en cours : les écritures dans les fichiers se font sous le verrou, les workers sont donc 
+            sérialisés sur cette sortie
+        """
+        self.repertoire = repertoire
+        self.format = str(formatFichiers).upper()
+        self.tailleGroupe = max(1, int(tailleGroupe))
+        self.granularites = dict(granularites)
+        self.didonLogger = didonLogger
+        self.verrou = threading.Lock()
+        self.nbLignes = 0
+        ## Lignes en attente par partition : { chemin : [structures de données] } et nombre de lignes en attente
+        self.tampons = {}
+        self.nbLignesTampons = {}
+        ## Fichiers ouverts du chargement en cours : { chemin : writer Parquet (None en CSV) }
+        self.fichiers = {}
+        self.horodatage = None
+        self.dateChargement = None
+
+        if self.format == LABEL_SORTIE_PARQUET:
+            import pyarrow
+            import pyarrow.parquet
+            self.schemaParquet = pyarrow.schema([('nom_mes_court', pyarrow.string()), ('date_mesure', pyarrow.timestamp('us')),
+                                                ('valeur_mesure', pyarrow.float64()), ('code_validation', pyarrow.int64()),
+                                                ('date_chargement', pyarrow.timestamp('us'))])
+        os.makedirs(self.repertoire, exist_ok=True)
+
+## ######################################
+## fonctions de traitement
+## ######################################
+
+    def getLibelle(self):
+        """
+            Retourne le libellé de la sortie (format et répertoire) pour les traces et le cr final
+        """
+        return self.format+' '+str(self.repertoire)
+
+    def getNbLignes(self):
+        """
+            Permet de récupérer le nombre de lignes écrites depuis la création
+        """
+        return self.nbLignes
+
+    def getCheminPartition(self, frequence, annee, mois):
+        """
+            Retourne le chemin (sans extension) du fichier du chargement en cours de la partition (frequence, annee, mois)
+        """
+        repertoire = os.path.join(self.repertoire, 'frequence='+str(frequence), 'annee='+str(annee))
+        if self.granularites.get(str(frequence)) == LABEL_PARTITION_MOIS:
+            repertoire = os.path.join(repertoire, 'mois='+'%02d'%mois)
+        return os.path.join(repertoire, self.horodatage)
+
+    def ecrit(self, nomCourt, valEtCodes, frequence):
+        """
+            Mise en attente des lignes <valEtCodes> de la mesure <nomCourt> dans les partitions de la fréquence <frequence>,
+            puis écriture des partitions ayant atteint <tailleGroupe> lignes (ou de la plus grande si le volume total en
+            attente dépasse 4 x <tailleGroupe> lignes)
+        """
+        if len(valEtCodes) == 0:
+            return
+        with self.verrou:
+            if self.horodatage is None:
+                self.dateChargement = datetime.datetime.now()
+                self.horodatage = self.dateChargement.strftime('%Y%m%dT%H%M%S%f')
+            lignes = pd.DataFrame({'nom_mes_court': str(nomCourt),
+                                    'date_mesure': pd.to_datetime(valEtCodes['date_mesure']).to_numpy(),
+                                    'valeur_mesure': pd.to_numeric(valEtCodes['valeur_mesure']).astype('float64').to_numpy(),
+                                    'code_validation': pd.to_numeric(valEtCodes['code_validation']).astype('int64').to_numpy(),
+                                    'date_chargement': self.dateChargement})
+            for (annee, mois), partition in lignes.groupby([lignes['date_mesure'].dt.year, lignes['date_mesure'].dt.month]):
+                chemin = self.getCheminPartition(frequence, annee, mois)
+                self.tampons.setdefault(chemin, []).append(partition)
+                self.nbLignesTampons[chemin] = self.nbLignesTampons.get(chemin, 0) + len(partition)
+                if self.nbLignesTampons[chemin] >= self.tailleGroupe:
+                    self.ecritTampon(chemin)
+            if sum(self.nbLignesTampons.values()) > 4 * self.tailleGroupe:
+                self.ecritTampon(max(self.nbLignesTampons, key=self.nbLignesTampons.get))
+
+    def ecritTampon(self, chemin):
+        """
+            Ecriture des lignes en attente de la partition <chemin> dans son fichier (ouvert à la première écriture),
+            en un groupe de lignes. Appelée sous le verrou de la sortie
+        """
+        groupe = pd.concat(self.tampons.pop(chemin), ignore_index=True)
+        self.nbLignesTampons.pop(chemin)
+        if chemin not in self.fichiers:
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        if self.format == LABEL_SORTIE_PARQUET:
+            import pyarrow
+            import pyarrow.parquet
+            if chemin not in self.fichiers:
+                self.fichiers[chemin] = pyarrow.parquet.ParquetWriter(chemin+'.parquet.tmp', self.schemaParquet, compression='snappy')
+            self.fichiers[chemin].write_table(pyarrow.Table.from_pandas(groupe, schema=self.schemaParquet, preserve_index=False),\
+                                                row_group_size=len(groupe))
+        else:
+            groupe.to_csv(chemin+'.csv.tmp', mode='a', header=chemin not in self.fichiers, index=False, date_format='%Y-%m-%d %H:%M:%S')
+            self.fichiers[chemin] = None
+        self.nbLignes += len(groupe)
+
+    def termine(self):
+        """
+            Fin de chargement : écriture des lignes en attente, fermeture et renommage des fichiers du chargement
+        """
+        nomFonction='termine'
+
+        with self.verrou:
+            for chemin in list(self.tampons):
+                self.ecritTampon(chemin)
+            extension = '.parquet' if self.format == LABEL_SORTIE_PARQUET else '.csv'
+            for chemin, writer in self.fichiers.items():
+                if writer is not None:
+                    writer.close()
+                os.replace(chemin+extension+'.tmp', chemin+extension)
+            if len(self.fichiers) > 0:
+                self.didonLogger.ecrireLog( 'DidonSortieFichiers', nomFonction, self.getLibelle()+' : '+str(len(self.fichiers))+\
+                                            ' fichiers ecrits ('+str(self.nbLignes)+' lignes depuis la creation)')
+            self.fichiers = {}
+            self.horodatage = None
+
+    def ferme(self):
+        """
+            Fin de traitement : écriture et fermeture des fichiers en cours (termine)
+        """
+        self.termine()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+#Nom : DidonStatistiques.py
+#Description : Classe de maintenance incrementale des statistiques reglementaires des mesures horaires DIDON
+#Copyright : 2026, Air Breizh
+#Auteur :  Manuel
+#Version: 1.0
+
+"""
+    Classe définissant la maintenance incrémentale des statistiques réglementaires annuelles des mesures horaires DIDON,
+    utilisée comme sortie supplémentaire de DidonGetMesures :
+        - marquePlage(nomCourt, debut, fin, frequence) : enregistrement de tous les jours de la plage remplacée en base
+          DIDON (fréquence horaire), y compris les jours dont toutes les heures ont été supprimées (modes DIFF, UPSERT,
+          PLAGE, échange de partition)
+        - ecrit(nomCourt, valEtCodes, frequence) : enregistrement des jours des lignes écrites (fréquence horaire)
+        - termine() : pour chaque mesure, relecture dans la table horaire DIDON des seuls jours modifiés, calcul de leurs
+          états partiels journaliers puis recalcul des indicateurs annuels des seules années modifiées par fusion
+          des états journaliers
+    Etat partiel journalier (table getTableJour(), une ligne par mesure et par jour) : nombre d'heures valides, somme,
+    minimum, maximum, nombre d'heures supérieures à chaque seuil horaire, et histogramme des valeurs horaires en classes
+    de largeur fixe (fusionnable par addition des effectifs, percentiles à la largeur d'une classe près)
+    Indicateurs annuels (table getTableAnnee(), une ligne par mesure et par année) : nombre d'heures valides, moyenne,
+    maximum horaire, nombre de jours valides (au moins nbHeuresMinJour heures), maximum des moyennes journalières,
+    dépassements des seuils horaires et des seuils journaliers (moyennes journalières), percentiles horaires (histogramme)
+    et percentiles des moyennes journalières
+    Convention de jour (celle de XR et de DidonGetMesures) : date_mesure est l'heure de fin de la période mesurée, le jour
+    d'une mesure horaire datée t est celui de t - 1h (getJours) : le jour J couvre les mesures datées de J 01h à J+1 00h
+    Les seuils sont définis par mesure ({ nomCourt ou '*' : { 'horaire' : [...], 'journalier' : [...] } }) : une
+    modification des seuils ou de la largeur des classes nécessite le rechargement des périodes concernées
+"""
+
+import datetime
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import MetaData, Table, Column, String, Date, Integer, Float, Text, DateTime, text, bindparam, and_
+
+class DidonStatistiques:
+
+## ######################################
+## Declaration de variable globales
+## ######################################
+
+    global nomClasse
+    nomClasse='DidonStatistiques'
+
+    ## Types de seuils
+    global LABEL_SEUIL_HORAIRE
+    LABEL_SEUIL_HORAIRE = 'horaire'
+    global LABEL_SEUIL_JOURNALIER
+    LABEL_SEUIL_JOURNALIER = 'journalier'
+    ## Clé des seuils applicables à toutes les mesures
+    global LABEL_TOUTES_MESURES
+    LABEL_TOUTES_MESURES = '*'
+
+## ######################################
+## constructeur
+## ######################################
+
+    def __init__(self, engineDidon, schema, tableHoraire, frequenceHoraire, tableJour, tableAnnee, seuils, percentiles,\
+                    largeurClasse, nbHeuresMinJour, didonLogger):
+        """
+            Initialisation des statistiques et création des tables si elles n'existent pas :
+                - <engineDidon> : engine SQLAlchemy de la base DIDON
+                - <schema> : schéma des tables de statistiques
+                - <tableHoraire> : nom qualifié de la table horaire DIDON relue pour les jours modifiés
+                - <frequenceHoraire> : libellé de la fréquence horaire (seules les écritures de cette fréquence sont prises en compte)
+                - <tableJour> <tableAnnee> : noms des tables des états journaliers et des indicateurs annuels
+                - <seuils> : seuils horaires et journaliers par mesure (voir description de la classe)
+                - <percentiles> : percentiles (0 à 100) calculés dans les indicateurs annuels
+                - <largeurClasse> : largeur des classes de l'histogramme des valeurs horaires
+                - <nbHeuresMinJour> : nombre minimal d'heures valides d'un jour pour le calcul de sa moyenne journalière
+                - <didonLogger> : logger DidonLogger utilisé pour les traces
+            Le verrou <verrou> protège le dictionnaire des jours modifiés, alimenté par les workers du traitement 
+            concurrent (marquePlage, ecrit) et vidé par termine ; les recalculs de termine se font hors verrou
+        """
+        nomFonction='__init__'
+
+        self.engineDidon = engineDidon
+        self.tableHoraire = tableHoraire
+        self.frequenceHoraire = str(frequenceHoraire)
+        self.seuils = dict(seuils)
+        self.percentiles = [float(percentile) for percentile in percentiles]
+        self.largeurClasse = float(largeurClasse)
+        self.nbHeuresMinJour = int(nbHeuresMinJour)
+        self.didonLogger = didonLogger
+        self.verrou = threading.Lock()
+        ## Jours modifiés depuis le dernier appel de termine : { nomCourt : set(jours) }
+        self.joursModifies = {}
+        self.nbJoursMaj = 0
+        self.nbAnneesMaj = 0
+
+        metadata = MetaData(schema=schema)
+        self.tableJour = Table(tableJour, metadata,
+                                Column('nom_mes_court', String(64), primary_key=True),
+                                Column('jour', Date, primary_key=True),
+                                Column('nb_heures', Integer),
+                                Column('somme', Float),
+                                Column('minimum', Float),
+                                Column('maximum', Float),
+                                Column('depassements', Text),
+                                Column('histogramme', Text),
+                                Column('date_maj', DateTime))
+        self.tableAnnee = Table(tableAnnee, metadata,
+                                Column('nom_mes_court', String(64), primary_key=True),
+                                Column('annee', Integer, primary_key=True),
+                                Column('nb_heures', Integer),
+                                Column('moyenne', Float),
+                                Column('maximum_horaire', Float),
+                                Column('nb_jours_valides', Integer),
+                                Column('maximum_journalier', Float),
+                                Column('depassements_horaires', Text),
+                                Column('depassements_journaliers', Text),
+                                Column('percentiles_horaires', Text),
+                                Column('percentiles_journaliers', Text),
+                                Column('histogramme', Text),
+                                Column('date_maj', DateTime))
+        metadata.create_all(self.engineDidon, checkfirst=True)
+        self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Tables de statistiques '+str(tableJour)+' et '+str(tableAnnee)+' pretes')
+
+## ######################################
+## fonctions de traitement
+## ######################################
+
+    def getSeuils(self, nomCourt, typeSeuil):
+        """
+            Retourne la liste des seuils <typeSeuil> (LABEL_SEUIL_HORAIRE ou LABEL_SEUIL_JOURNALIER) de la mesure <nomCourt>
+        """
+        seuils = self.seuils.get(nomCourt, self.seuils.get(LABEL_TOUTES_MESURES, {}))
+        return [float(seuil) for seuil in seuils.get(typeSeuil, [])]
+
+    def getNbJoursMaj(self):
+        """
+            Permet de récupérer le nombre d'états journaliers recalculés depuis la création
+        """
+        return self.nbJoursMaj
+
+    def getNbAnneesMaj(self):
+        """
+            Permet de récupérer le nombre d'indicateurs annuels recalculés depuis la création
+        """
+        return self.nbAnneesMaj
+
+    def getJours(self, datesMesure):
+        """
+            Retourne les jours (Timestamp à 00h) des mesures horaires datées <datesMesure> : une mesure datée de J+1 00h
+            est la dernière heure du jour J
+        """
+        return (pd.to_datetime(datesMesure) - pd.Timedelta(hours=1)).dt.normalize()
+
+    def marquePlage(self, nomCourt, debut, fin, frequence):
+        """
+            Sortie DidonGetMesures : enregistrement de tous les jours de la plage [debut, fin] (Timestamp) de date_mesure
+            remplacée en base DIDON pour la mesure <nomCourt> (fréquence horaire uniquement), recalculés par termine :
+            un jour sans plus aucune valeur horaire valide perd son état journalier
+        """
+        if str(frequence) != self.frequenceHoraire:
+            return
+        jours = pd.date_range(*self.getJours(pd.Series([pd.Timestamp(debut), pd.Timestamp(fin)])), freq='D')
+        with self.verrou:
+            self.joursModifies.setdefault(nomCourt, set()).update(jours)
+
+    def ecrit(self, nomCourt, valEtCodes, frequence):
+        """
+            Sortie DidonGetMesures : enregistrement des jours des lignes <valEtCodes> écrites pour la mesure <nomCourt>
+            (fréquence horaire uniquement), recalculés par termine
+        """
+        if str(frequence) != self.frequenceHoraire or valEtCodes is None or len(valEtCodes) == 0:
+            return
+        jours = set(self.getJours(valEtCodes['date_mesure']).unique())
+        with self.verrou:
+            self.joursModifies.setdefault(nomCourt, set()).update(pd.Timestamp(jour) for jour in jours)
+
+    def termine(self):
+        """
+            Fin de chargement : recalcul des états journaliers des jours modifiés puis des indicateurs annuels des années
+            modifiées, mesure par mesure (majMesure)
+            L'erreur d'une mesure est tracée, ses jours restent à recalculer au prochain appel
+        """
+        nomFonction='termine'
+
+        with self.verrou:
+            joursModifies, self.joursModifies = self.joursModifies, {}
+        if len(joursModifies) == 0:
+            return
+        debut = time.perf_counter()
+        nbJours, nbAnnees = 0, 0
+        for nomCourt, jours in joursModifies.items():
+            try:
+                nbAnnees += self.majMesure(nomCourt, sorted(jours))
+                nbJours += len(jours)
+            except Exception as error:
+                self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Erreur de mise a jour des statistiques de '+str(nomCourt)+\
+                                            ' : %s'%error,'ERROR')
+                with self.verrou:
+                    self.joursModifies.setdefault(nomCourt, set()).update(jours)
+        self.nbJoursMaj += nbJours
+        self.nbAnneesMaj += nbAnnees
+        self.didonLogger.ecrireLog( nomClasse, nomFonction, 'Statistiques mises a jour : '+str(nbJours)+' jours, '+str(nbAnnees)+\
+                                    ' annees, '+str(len(joursModifies))+' mesures en '+str(round(time.perf_counter() - debut, 3))+' s')
+
+    def majMesure(self, nomCourt, jours):
+        """
+            Mise à jour des statistiques de la mesure <nomCourt> pour les jours modifiés <jours> (triés) :
+                - lecture des valeurs horaires valides des jours dans la table horaire DIDON (de <jours[0]> 01h au
+                  lendemain de <jours[-1]> 00h inclus)
+                - remplacement des états journaliers de ces jours (un jour sans valeur n'a plus d'état)
+                - recalcul des indicateurs annuels des années de ces jours
+            Retourne le nombre d'années recalculées
+        """
+        ## Bornes typées DateTime : comparées dans le format de stockage de date_mesure quelle que soit la base
+        requete = text('SELECT date_mesure, valeur_mesure FROM '+self.tableHoraire+\
+                        ' WHERE nom_mes_court = :nom AND date_mesure > :debut AND date_mesure <= :fin AND code_validation = 1').\
+                        bindparams(bindparam('debut', type_=DateTime), bindparam('fin', type_=DateTime))
+        with self.engineDidon.connect() as connexion:
+            horaires = pd.read_sql(requete, connexion, params={'nom': nomCourt, 'debut': jours[0].to_pydatetime(),
+                                                                'fin': (jours[-1] + pd.Timedelta(days=1)).to_pydatetime()})
+        horaires['jour'] = self.getJours(horaires['date_mesure'])
+        horaires = horaires[horaires['jour'].isin(jours) & horaires['valeur_mesure'].notna()]
+
+        maintenant = pd.Timestamp.now().to_pydatetime()
+        etats = [self.calculeEtatJournalier(nomCourt, jour, valeurs['valeur_mesure'].to_numpy(dtype=np.float64), maintenant) \
+                    for jour, valeurs in horaires.groupby('jour')]
+        annees = sorted(set(jour.year for jour in jours))
+        with self.engineDidon.begin() as connexion:
+            for indice in range(0, len(jours), 500):
+                connexion.execute(self.tableJour.delete().where(and_(self.tableJour.c.nom_mes_court == nomCourt,\
+                                                                    self.tableJour.c.jour.in_([jour.date() for jour in jours[indice:indice+500]]))))
+            if len(etats) > 0:
+                connexion.execute(self.tableJour.insert(), etats)
+            for annee in annees:
+                self.majAnnee(connexion, nomCourt, annee, maintenant)
+        return len(annees)
+
+    def calculeEtatJournalier(self, nomCourt, jour, valeurs, maintenant):
+        """
+            Retourne l'état partiel journalier (ligne de getTableJour) des valeurs horaires valides <valeurs> du jour <jour>
+        """
+        classes, effectifs = np.unique(np.floor(valeurs / self.largeurClasse).astype(np.int64), return_counts=True)
+        return {'nom_mes_court': nomCourt, 'jour': pd.Timestamp(jour).date(), 'nb_heures': int(len(valeurs)),
+                'somme': float(valeurs.sum()), 'minimum': float(valeurs.min()), 'maximum': float(valeurs.max()),
+                'depassements': json.dumps({str(seuil): int((valeurs > seuil).sum()) for seuil in self.getSeuils(nomCourt, LABEL_SEUIL_HORAIRE)}),
+                'histogramme': json.dumps({str(classe): int(effectif) for classe, effectif in zip(classes, effectifs)}),
+                'date_maj': maintenant}
+
+    def majAnnee(self, connexion, nomCourt, annee, maintenant):
+        """
+            Recalcul des indicateurs annuels de la mesure <nomCourt> pour l'année <annee> par fusion de ses états journaliers
+            (lus et écrits dans la transaction de <connexion>), la ligne est supprimée si l'année n'a plus d'état journalier
+        """
+        etats = connexion.execute(self.tableJour.select().where(and_(self.tableJour.c.nom_mes_court == nomCourt,\
+                                                                    self.tableJour.c.jour >= datetime.date(annee, 1, 1),\
+                                                                    self.tableJour.c.jour < datetime.date(annee + 1, 1, 1)))).mappings().all()
+        connexion.execute(self.tableAnnee.delete().where(and_(self.tableAnnee.c.nom_mes_court == nomCourt, self.tableAnnee.c.annee == annee)))
+        if len(etats) == 0:
+            return
+
+        nbHeures = sum(etat['nb_heures'] for etat in etats)
+        histogramme = {}
+        depassementsHoraires = {str(seuil): 0 for seuil in self.getSeuils(nomCourt, LABEL_SEUIL_HORAIRE)}
+        for etat in etats:
+            for classe, effectif in json.loads(etat['histogramme']).items():
+                histogramme[int(classe)] = histogramme.get(int(classe), 0) + effectif
+            for seuil, nb in json.loads(etat['depassements']).items():
+                if seuil in depassementsHoraires:
+                    depassementsHoraires[seuil] += nb
+        moyennesJournalieres = np.array([etat['somme'] / etat['nb_heures'] for etat in etats if etat['nb_heures'] >= self.nbHeuresMinJour])
+
+        connexion.execute(self.tableAnnee.insert(), [{
+            'nom_mes_court': nomCourt, 'annee': int(annee), 'nb_heures': int(nbHeures),
+            'moyenne': sum(etat['somme'] for etat in etats) / nbHeures,
+            'maximum_horaire': max(etat['maximum'] for etat in etats),
+            'nb_jours_valides': int(len(moyennesJournalieres)),
+            'maximum_journalier': float(moyennesJournalieres.max()) if len(moyennesJournalieres) > 0 else None,
+            'depassements_horaires': json.dumps(depassementsHoraires),
+            'depassements_journaliers': json.dumps({str(seuil): int((moyennesJournalieres > seuil).sum()) \
+                                                    for seuil in self.getSeuils(nomCourt, LABEL_SEUIL_JOURNALIER)}),
+            'percentiles_horaires': json.dumps({str(percentile): self.percentileHistogramme(histogramme, percentile) \
+                                                for percentile in self.percentiles}),
+            'percentiles_journaliers': json.dumps({str(percentile): float(np.percentile(moyennesJournalieres, percentile)) \
+                                                    for percentile in self.percentiles} if len(moyennesJournalieres) > 0 else {}),
+            'histogramme': json.dumps({str(classe): effectif for classe, effectif in sorted(histogramme.items())}),
+            'date_maj': maintenant}])
+
+    def percentileHistogramme(self, histogramme, percentile):
+        """
+            Retourne le percentile <percentile> (0 à 100) estimé à partir de l'histogramme { classe : effectif }
+            par interpolation linéaire dans la classe contenant le rang recherché
+        """
+        total = sum(histogramme.values())
+        if total == 0:
+            return None
+        rang = percentile / 100.0 * total
+        cumul = 0
+        for classe in sorted(histogramme):
+            effectif = histogramme[classe]
+            if cumul + effectif >= rang:
+                return float((classe + (rang - cumul) / effectif) * self.largeurClasse)
+            cumul += effectif
+        return float((max(histogramme) + 1) * self.largeurClasse)
+
+    def getIndicateurs(self, nomsCourts=None, annees=None):
+        """
+            Retourne les indicateurs annuels (structure de données, une ligne par mesure et par année, colonnes JSON décodées)
+            des mesures <nomsCourts> et des années <annees> (toutes par défaut), sans l'histogramme
+        """
+        requete = self.tableAnnee.select()
+        if nomsCourts is not None:
+            requete = requete.where(self.tableAnnee.c.nom_mes_court.in_(list(nomsCourts)))
+        if annees is not None:
+            requete = requete.where(self.tableAnnee.c.annee.in_([int(annee) for annee in annees]))
+        with self.engineDidon.connect() as connexion:
+            indicateurs = pd.DataFrame(connexion.execute(requete).mappings().all(), columns=[colonne.name for colonne in self.tableAnnee.c])
+        for colonne in ['depassements_horaires', 'depassements_journaliers', 'percentiles_horaires', 'percentiles_journaliers']:
+            indicateurs[colonne] = indicateurs[colonne].map(json.loads)
+        return indicateurs.drop(columns=['histogramme'])
+
+    def getPercentile(self, nomCourt, annee, percentile):
+        """
+            Retourne le percentile horaire <percentile> (0 à 100) de la mesure <nomCourt> pour l'année <annee>, calculé à partir
+            de l'histogramme annuel (None si l'année n'a pas d'indicateurs)
+        """
+        with self.engineDidon.connect() as connexion:
+            histogramme = connexion.execute(self.tableAnnee.select().with_only_columns(self.tableAnnee.c.histogramme).\
+                                            where(and_(self.tableAnnee.c.nom_mes_court == nomCourt, self.tableAnnee.c.annee == int(annee)))).scalar()
+        if histogramme is None:
+            return None
+        return self.percentileHistogramme({int(classe): effectif for classe, effectif in json.loads(histogramme).items()}, float(percentile))
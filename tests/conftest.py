@@ -0,0 +1,9 @@
+# -*- coding: UTF-8 -*-
+"""
+    Configuration pytest : modules du traitement (racine du dépôt) importables depuis les tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,61 @@
+# -*- coding: UTF-8 -*-
+"""
+    Equivalence des plages fusionnées du journal de rattrapage (DidonJournalRattrapage) et de l'ensemble des jours
+    terminés : partitions marquées dans le désordre, chevauchantes ou adjacentes, relues après rechargement du fichier
+    avec un autre découpage en partitions
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from DidonJournalRattrapage import DidonJournalRattrapage
+from DidonLogger import DidonLogger
+
+CLE = 'H|2023-01-01T00:00:00|2023-12-31T00:00:00'
+NOMS_COURTS = ['MES1', 'MES2']
+PREMIER_JOUR = pd.Timestamp('2023-01-01')
+NB_JOURS = 365
+
+def ouvreJournal(repertoire, cle=CLE):
+    os.makedirs(str(repertoire), exist_ok=True)
+    return DidonJournalRattrapage(os.path.join(str(repertoire), 'journal.json'), cle,
+                                    DidonLogger('test_journal_rattrapage', str(repertoire)+os.sep))
+
+def partition(premier, nbJours):
+    debut = PREMIER_JOUR + pd.Timedelta(days=int(premier))
+    return debut.strftime('%d/%m/%Y'), (debut + pd.Timedelta(days=int(nbJours) - 1)).strftime('%d/%m/%Y')
+
+def test_plages_fusionnees_identiques_ensemble_des_jours(tmp_path):
+    aleas = np.random.default_rng(18)
+    journal = ouvreJournal(tmp_path)
+    termines = {nomCourt: set() for nomCourt in NOMS_COURTS}
+    for premier, nbJours, nbMesures in zip(aleas.integers(0, NB_JOURS - 40, 30), aleas.integers(1, 40, 30), aleas.integers(1, 3, 30)):
+        journal.marqueTerminees(*partition(premier, nbJours), NOMS_COURTS[:nbMesures])
+        for nomCourt in NOMS_COURTS[:nbMesures]:
+            termines[nomCourt].update(range(premier, premier + nbJours))
+
+    ## Plages triées, disjointes et non adjacentes dans le fichier
+    with open(os.path.join(str(tmp_path), 'journal.json'), encoding='utf-8') as fichier:
+        plagesFichier = json.load(fichier)[CLE]
+    for nomCourt, plages in plagesFichier.items():
+        bornes = [(pd.Timestamp(premier), pd.Timestamp(dernier)) for premier, dernier in plages]
+        assert all(premier <= dernier for premier, dernier in bornes)
+        assert all(suivante[0] > precedente[1] + pd.Timedelta(days=1) for precedente, suivante in zip(bornes, bornes[1:]))
+
+    ## Rechargement et interrogation avec un découpage hebdomadaire
+    relu = ouvreJournal(tmp_path)
+    assert relu.getNbJoursTermines() == sum(len(jours) for jours in termines.values())
+    for nomCourt in NOMS_COURTS:
+        for premier in range(0, NB_JOURS, 7):
+            nbJours = min(7, NB_JOURS - premier)
+            attendu = all(jour in termines[nomCourt] for jour in range(premier, premier + nbJours))
+            assert relu.isTerminee(*partition(premier, nbJours), nomCourt) == attendu
+
+def test_autre_rattrapage_independant(tmp_path):
+    ouvreJournal(tmp_path).marqueTerminees(*partition(0, 31), NOMS_COURTS)
+    autre = ouvreJournal(tmp_path, 'D|2023-01-01T00:00:00|2023-12-31T00:00:00')
+    assert autre.getNbJoursTermines() == 0
+    assert not autre.isTerminee(*partition(0, 31), NOMS_COURTS[0])
@@ -0,0 +1,80 @@
+# -*- coding: UTF-8 -*-
+"""
+    Equivalence de la récupération XR par lots (getTailleLotXR) et mesure par mesure : mêmes lignes écrites dans DIDON
+    pour les fréquences H et D, et agrégation M/A vectorisée par lot (agregeMesuresMA) et mesure par mesure 
+    (transformeMesuresXR) pour les fréquences M et A (XR simulé par DidonBenchMesures.FauxXAIR, base DIDON SQLite locale)
+"""
+
+import os
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+import DidonBenchMesures
+from DidonGetMesures import DidonGetMesures
+from DidonLogger import DidonLogger
+
+## Mesures simulées (lot final incomplet pour la taille de lot LOT_XR) et fenêtre explicite traitée
+NB_MESURES = 5
+LOT_XR = 2
+DEBUT = '25/12/2022'
+FIN = '15/02/2023'
+## Fenêtre des fréquences M et A : une année complète (agrégats annuels représentatifs)
+DEBUT_MA = '01/01/2022'
+FIN_MA = '31/12/2022'
+
+def lisMesuresDidon(repertoire, frequence, tailleLotXR, debut=DEBUT, fin=FIN):
+    """
+        Traitement de la fenêtre [<debut>, <fin>] à la fréquence <frequence> avec des lots XR de <tailleLotXR> mesures
+        dans une base DIDON vide du répertoire <repertoire>
+        Retourne le couple (lignes de la table DIDON triées, nombre d'appels XR)
+    """
+    os.makedirs(str(repertoire), exist_ok=True)
+    didonLogger = DidonLogger('test_lots_xr', str(repertoire)+os.sep)
+    parametrage = DidonBenchMesures.FauxParametrage(NB_MESURES, 1, didonLogger,
+                                                    {'getTailleLotXR': tailleLotXR,
+                                                     'getFichierSchemaDidon': os.path.join(str(repertoire), 'schema.pickle')})
+    fabriqueEngine = DidonBenchMesures.creeFabriqueEngine(None, str(repertoire))
+    DidonBenchMesures.initialiseTables(fabriqueEngine, parametrage)
+    fauxXR = DidonBenchMesures.FauxXAIR(graine=7)
+
+    dgm = DidonGetMesures('BENCH', frequence, parametrage=parametrage, fabriqueXR=lambda: fauxXR, engineDidon=fabriqueEngine())
+    try:
+        resultats = dgm.executeTraitement(frequences=[frequence], debut=debut, fin=fin)
+        assert all(statut is True for statut in resultats['frequences'][frequence]['statuts'].values())
+    finally:
+        dgm.disconnect()
+
+    engine = fabriqueEngine()
+    try:
+        with engine.connect() as connexion:
+            lignes = pd.read_sql(text('SELECT nom_mes_court, date_mesure, valeur_mesure, code_validation FROM '+\
+                                        DidonBenchMesures.SCHEMA_MESURE+'.'+parametrage.getTable(frequence)+\
+                                        ' ORDER BY nom_mes_court, date_mesure'), connexion)
+    finally:
+        engine.dispose()
+    return lignes, fauxXR.nbAppels
+
+@pytest.mark.parametrize('frequence', ['H', 'D'])
+def test_lots_identiques_mesure_par_mesure(tmp_path, frequence):
+    parMesure, appelsParMesure = lisMesuresDidon(tmp_path / 'mesure', frequence, 1)
+    parLots, appelsParLots = lisMesuresDidon(tmp_path / 'lots', frequence, LOT_XR)
+
+    assert appelsParMesure == NB_MESURES
+    assert appelsParLots == -(-NB_MESURES // LOT_XR)
+    assert len(parMesure) > 0
+    assert parMesure['nom_mes_court'].nunique() == NB_MESURES
+    pd.testing.assert_frame_equal(parLots, parMesure)
+
+@pytest.mark.parametrize('frequence', ['M', 'A'])
+def test_agregats_ma_par_lots_identiques_mesure_par_mesure(tmp_path, frequence):
+    ## Arrondis et taux de représentativité M/A calculés par pyair.stats
+    pytest.importorskip('pyair')
+    parMesure, appelsParMesure = lisMesuresDidon(tmp_path / 'mesure', frequence, 1, DEBUT_MA, FIN_MA)
+    parLots, appelsParLots = lisMesuresDidon(tmp_path / 'lots', frequence, LOT_XR, DEBUT_MA, FIN_MA)
+
+    assert appelsParMesure == NB_MESURES
+    assert appelsParLots == -(-NB_MESURES // LOT_XR)
+    assert parMesure['nom_mes_court'].nunique() == NB_MESURES
+    pd.testing.assert_frame_equal(parLots, parMesure)
@@ -0,0 +1,65 @@
+# -*- coding: UTF-8 -*-
+"""
+    Equivalence des modes d'écriture DIDON avec l'insertion to_sql et le remplacement unitaire d'origine : insertion
+    COPY (getModeInsertion) et remplacements UPSERT, PLAGE et DIFF (getModeRemplacement), après un chargement puis un
+    rechargement partiel avec des valeurs XR différentes (XR simulé par DidonBenchMesures.FauxXAIR)
+    Ces modes nécessitent PostgreSQL : base de test à fournir par la variable d'environnement DIDON_TEST_URL (URL
+    SQLAlchemy), tests ignorés sinon
+"""
+
+import os
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+import DidonBenchMesures
+from DidonGetMesures import DidonGetMesures
+from DidonLogger import DidonLogger
+
+URL_DIDON = os.environ.get('DIDON_TEST_URL')
+NB_MESURES = 3
+
+pytestmark = pytest.mark.skipif(not URL_DIDON, reason='DIDON_TEST_URL (base PostgreSQL de test) non definie')
+
+def lisMesuresDidon(repertoire, frequence, modeInsertion, modeRemplacement):
+    """
+        Chargement de janvier 2023 (graine 7) puis rechargement du 10 au 20 janvier (graine 8) à la fréquence <frequence>
+        dans les tables DIDON vides de la base de test, avec les modes <modeInsertion> et <modeRemplacement>
+        Retourne les lignes de la table DIDON triées
+    """
+    os.makedirs(str(repertoire), exist_ok=True)
+    parametrage = DidonBenchMesures.FauxParametrage(NB_MESURES, 1, DidonLogger('test_modes_ecriture', str(repertoire)+os.sep),
+                                                    {'getModeInsertion': modeInsertion, 'getModeRemplacement': modeRemplacement,
+                                                     'getFichierSchemaDidon': os.path.join(str(repertoire), 'schema.pickle')})
+    fabriqueEngine = DidonBenchMesures.creeFabriqueEngine(URL_DIDON, str(repertoire))
+    DidonBenchMesures.initialiseTables(fabriqueEngine, parametrage)
+
+    for graine, debut, fin in ((7, '01/01/2023', '31/01/2023'), (8, '10/01/2023', '20/01/2023')):
+        fauxXR = DidonBenchMesures.FauxXAIR(graine=graine)
+        dgm = DidonGetMesures('BENCH', frequence, parametrage=parametrage, fabriqueXR=lambda: fauxXR, engineDidon=fabriqueEngine())
+        try:
+            assert dgm.getModeRemplacement() == modeRemplacement
+            resultats = dgm.executeTraitement(frequences=[frequence], debut=debut, fin=fin)
+            assert all(statut is True for statut in resultats['frequences'][frequence]['statuts'].values())
+        finally:
+            dgm.disconnect()
+
+    engine = fabriqueEngine()
+    try:
+        with engine.connect() as connexion:
+            return pd.read_sql(text('SELECT nom_mes_court, date_mesure, valeur_mesure, code_validation FROM '+\
+                                    DidonBenchMesures.SCHEMA_MESURE+'.'+parametrage.getTable(frequence)+\
+                                    ' ORDER BY nom_mes_court, date_mesure'), connexion)
+    finally:
+        engine.dispose()
+
+@pytest.mark.parametrize('frequence', ['H', 'D'])
+@pytest.mark.parametrize('modeInsertion, modeRemplacement', [('COPY', 'UNITAIRE'), ('TO_SQL', 'UPSERT'),
+                                                             ('TO_SQL', 'PLAGE'), ('TO_SQL', 'DIFF')])
+def test_modes_identiques_to_sql_unitaire(tmp_path, frequence, modeInsertion, modeRemplacement):
+    reference = lisMesuresDidon(tmp_path / 'reference', frequence, 'TO_SQL', 'UNITAIRE')
+    lignes = lisMesuresDidon(tmp_path / 'mode', frequence, modeInsertion, modeRemplacement)
+
+    assert reference['nom_mes_court'].nunique() == NB_MESURES
+    pd.testing.assert_frame_equal(lignes, reference)
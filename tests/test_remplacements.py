@@ -0,0 +1,55 @@
+# -*- coding: UTF-8 -*-
+"""
+    Equivalence des remplacements compilés (compileRemplacements / appliqueRemplacements) et des remplacements successifs
+    clé par clé (DataFrame.replace) sur des valeurs et codes XR simulés (DidonBenchMesures.FauxXAIR)
+"""
+
+import os
+
+import pandas as pd
+
+import DidonBenchMesures
+from DidonGetMesures import DidonGetMesures
+from DidonLogger import DidonLogger
+
+NOMS_COURTS = ['BENCH001', 'BENCH002', 'BENCH003']
+
+def creeTraitement(repertoire, remplacementsCodes=None):
+    """
+        Traitement H sans connexion dont le paramétrage simulé utilise les remplacements de codes <remplacementsCodes>
+        (ceux de FauxParametrage par défaut)
+    """
+    os.makedirs(str(repertoire), exist_ok=True)
+    parametrage = DidonBenchMesures.FauxParametrage(len(NOMS_COURTS), 1, DidonLogger('test_remplacements', str(repertoire)+os.sep),
+                                                    {'getFichierSchemaDidon': os.path.join(str(repertoire), 'schema.pickle')})
+    if remplacementsCodes is not None:
+        parametrage.remplacementsCodes = dict(remplacementsCodes)
+    return DidonGetMesures('BENCH', 'H', parametrage=parametrage, connexionImmediate=False)
+
+def remplaceCleParCle(structure, cles, remplacement):
+    """
+        Remplacements successifs clé par clé (traitement d'origine)
+    """
+    structure = structure.copy()
+    for cle in cles:
+        structure.replace(to_replace=cle, value=remplacement(cle), inplace=True)
+    return structure
+
+def test_remplacements_compiles_identiques_cle_par_cle(tmp_path):
+    dgm = creeTraitement(tmp_path)
+    parametrage = dgm.getParametrage()
+    dataVal, codesVal = DidonBenchMesures.FauxXAIR(graine=12).get_mesures(mes=NOMS_COURTS, debut='01/01/2023', fin='31/03/2023', brut=True)
+    assert (dataVal == DidonBenchMesures.VALEUR_ABSENTE_XR).any().any()
+
+    pd.testing.assert_frame_equal(dgm.appliqueRemplacements(dataVal, dgm.remplacementsValeurs),
+                                    remplaceCleParCle(dataVal, parametrage.getDictRemplacementValeurs(), parametrage.remplacerValeur))
+    pd.testing.assert_frame_equal(dgm.appliqueRemplacements(codesVal, dgm.remplacementsCodes),
+                                    remplaceCleParCle(codesVal, parametrage.getDictRemplacementCodes(), parametrage.remplacerCode),
+                                    check_dtype=False)
+
+def test_valeur_de_remplacement_non_remplacee(tmp_path):
+    ## Une seule passe : 'A' devient 'R' sans être ensuite remplacé par 1
+    dgm = creeTraitement(tmp_path, {'A': 'R', 'R': 1})
+    codesVal = pd.DataFrame({'BENCH001': ['A', 'R', 'N'], 'BENCH002': ['R', 'A', 'A']}, dtype=object)
+    attendus = codesVal.apply(lambda colonne: colonne.map({'A': 'R', 'R': 1, 'N': 'N'}))
+    pd.testing.assert_frame_equal(dgm.appliqueRemplacements(codesVal, dgm.remplacementsCodes), attendus)
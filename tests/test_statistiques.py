@@ -0,0 +1,97 @@
+# -*- coding: UTF-8 -*-
+"""
+    Equivalence des indicateurs annuels maintenus incrémentalement (DidonStatistiques : états journaliers des seuls jours
+    modifiés fusionnés par année) et des indicateurs recalculés sur toute la table horaire DIDON, après un chargement
+    puis un rechargement partiel avec des valeurs XR différentes (XR simulé par DidonBenchMesures.FauxXAIR, base DIDON
+    SQLite locale)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+import DidonBenchMesures
+from DidonGetMesures import DidonGetMesures
+from DidonLogger import DidonLogger
+
+NB_MESURES = 2
+SEUILS = {'*': {'horaire': [30], 'journalier': [25]}}
+PERCENTILES = [50, 98]
+LARGEUR_CLASSE = 1
+NB_HEURES_MIN_JOUR = 18
+
+def charge(parametrage, fabriqueEngine, graine, debut, fin):
+    """
+        Chargement horaire de la fenêtre [debut, fin] avec les valeurs XR simulées de graine <graine>
+        Retourne les indicateurs annuels maintenus par les statistiques du traitement
+    """
+    fauxXR = DidonBenchMesures.FauxXAIR(graine=graine)
+    dgm = DidonGetMesures('BENCH', 'H', parametrage=parametrage, fabriqueXR=lambda: fauxXR, engineDidon=fabriqueEngine())
+    try:
+        resultats = dgm.executeTraitement(frequences=['H'], debut=debut, fin=fin)
+        assert all(statut is True for statut in resultats['frequences']['H']['statuts'].values())
+        return dgm.getStatistiques().getIndicateurs()
+    finally:
+        dgm.disconnect()
+
+def recalculeIndicateurs(fabriqueEngine, parametrage):
+    """
+        Indicateurs annuels recalculés sur toutes les valeurs horaires valides de la table horaire DIDON, jour d'une mesure
+        datée t = jour de t - 1h : { (nomCourt, annee) : indicateurs }
+    """
+    engine = fabriqueEngine()
+    try:
+        with engine.connect() as connexion:
+            horaires = pd.read_sql(text('SELECT nom_mes_court, date_mesure, valeur_mesure FROM '+DidonBenchMesures.SCHEMA_MESURE+'.'+\
+                                        parametrage.getTable('H')+' WHERE code_validation = 1 AND valeur_mesure IS NOT NULL'), connexion)
+    finally:
+        engine.dispose()
+    horaires['jour'] = (pd.to_datetime(horaires['date_mesure']) - pd.Timedelta(hours=1)).dt.normalize()
+    indicateurs = {}
+    for (nomCourt, annee), valeurs in horaires.groupby(['nom_mes_court', horaires['jour'].dt.year]):
+        parJour = valeurs.groupby('jour')['valeur_mesure'].agg(['count', 'mean'])
+        moyennes = parJour.loc[parJour['count'] >= NB_HEURES_MIN_JOUR, 'mean'].to_numpy()
+        indicateurs[(nomCourt, int(annee))] = {
+            'nb_heures': len(valeurs), 'moyenne': valeurs['valeur_mesure'].mean(), 'maximum_horaire': valeurs['valeur_mesure'].max(),
+            'nb_jours_valides': len(moyennes), 'maximum_journalier': moyennes.max() if len(moyennes) > 0 else None,
+            'depassements_horaires': {'30.0': int((valeurs['valeur_mesure'] > 30).sum())},
+            'depassements_journaliers': {'25.0': int((moyennes > 25).sum())},
+            'percentiles_horaires': {str(float(p)): np.percentile(valeurs['valeur_mesure'], p) for p in PERCENTILES},
+            'percentiles_journaliers': {str(float(p)): np.percentile(moyennes, p) for p in PERCENTILES} if len(moyennes) > 0 else {}}
+    return indicateurs
+
+def test_fusion_journaliere_identique_recalcul_complet(tmp_path):
+    os.makedirs(str(tmp_path), exist_ok=True)
+    parametrage = DidonBenchMesures.FauxParametrage(NB_MESURES, 1, DidonLogger('test_statistiques', str(tmp_path)+os.sep),
+                                                    {'getStatistiquesActives': True, 'getSeuilsStatistiques': SEUILS,
+                                                     'getPercentilesStatistiques': PERCENTILES,
+                                                     'getLargeurClasseStatistiques': LARGEUR_CLASSE,
+                                                     'getNbHeuresMinJourStatistiques': NB_HEURES_MIN_JOUR,
+                                                     'getFichierSchemaDidon': os.path.join(str(tmp_path), 'schema.pickle')})
+    fabriqueEngine = DidonBenchMesures.creeFabriqueEngine(None, str(tmp_path))
+    DidonBenchMesures.initialiseTables(fabriqueEngine, parametrage)
+
+    charge(parametrage, fabriqueEngine, 7, '01/01/2023', '28/02/2023')
+    indicateurs = charge(parametrage, fabriqueEngine, 8, '10/01/2023', '20/01/2023')
+    attendus = recalculeIndicateurs(fabriqueEngine, parametrage)
+
+    ## La mesure datée du 01/01/2023 00h appartient au 31/12/2022
+    assert sorted(attendus) == sorted((nomCourt, annee) for nomCourt in parametrage.getNomsCourtsMesures() for annee in (2022, 2023))
+    assert sorted(zip(indicateurs['nom_mes_court'], indicateurs['annee'])) == sorted(attendus)
+    for ligne in indicateurs.to_dict('records'):
+        attendu = attendus[(ligne['nom_mes_court'], ligne['annee'])]
+        assert ligne['nb_heures'] == attendu['nb_heures']
+        assert ligne['nb_jours_valides'] == attendu['nb_jours_valides']
+        assert ligne['moyenne'] == pytest.approx(attendu['moyenne'])
+        assert ligne['maximum_horaire'] == pytest.approx(attendu['maximum_horaire'])
+        assert ligne['depassements_horaires'] == attendu['depassements_horaires']
+        assert ligne['depassements_journaliers'] == attendu['depassements_journaliers']
+        if attendu['nb_jours_valides'] > 0:
+            assert ligne['maximum_journalier'] == pytest.approx(attendu['maximum_journalier'])
+            assert ligne['percentiles_journaliers'] == pytest.approx(attendu['percentiles_journaliers'])
+        ## Percentiles horaires estimés par l'histogramme : à la largeur d'une classe près
+        for percentile, valeur in attendu['percentiles_horaires'].items():
+            assert abs(ligne['percentiles_horaires'][percentile] - valeur) <= LARGEUR_CLASSE
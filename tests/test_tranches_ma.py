@@ -0,0 +1,64 @@
+# -*- coding: UTF-8 -*-
+"""
+    Equivalence des agrégats M et A calculés par tranches de récupération XR (getNbMoisParTranche, sommes partielles
+    fusionnées) et sur la fenêtre complète en une fois : mêmes lignes écrites dans DIDON (XR simulé par
+    DidonBenchMesures.FauxXAIR, base DIDON SQLite locale)
+"""
+
+import os
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+import DidonBenchMesures
+from DidonGetMesures import DidonGetMesures
+from DidonLogger import DidonLogger
+
+## Mesures simulées et fenêtre traitée (début et fin en cours de mois : tranches de tête et de queue incomplètes)
+NB_MESURES = 3
+DEBUT = '15/11/2021'
+FIN = '20/02/2023'
+
+def lisAgregatsDidon(repertoire, frequence, nbMoisParTranche, tailleLotXR):
+    """
+        Traitement de la fenêtre [DEBUT, FIN] à la fréquence <frequence> par tranches de <nbMoisParTranche> mois
+        (0 = fenêtre complète) et lots XR de <tailleLotXR> mesures dans une base DIDON vide du répertoire <repertoire>
+        Retourne le couple (lignes de la table DIDON triées, nombre d'appels XR)
+    """
+    os.makedirs(str(repertoire), exist_ok=True)
+    parametrage = DidonBenchMesures.FauxParametrage(NB_MESURES, 1, DidonLogger('test_tranches_ma', str(repertoire)+os.sep),
+                                                    {'getNbMoisParTranche': nbMoisParTranche, 'getTailleLotXR': tailleLotXR,
+                                                     'getFichierSchemaDidon': os.path.join(str(repertoire), 'schema.pickle')})
+    fabriqueEngine = DidonBenchMesures.creeFabriqueEngine(None, str(repertoire))
+    DidonBenchMesures.initialiseTables(fabriqueEngine, parametrage)
+    fauxXR = DidonBenchMesures.FauxXAIR(graine=13)
+
+    dgm = DidonGetMesures('BENCH', frequence, parametrage=parametrage, fabriqueXR=lambda: fauxXR, engineDidon=fabriqueEngine())
+    try:
+        resultats = dgm.executeTraitement(frequences=[frequence], debut=DEBUT, fin=FIN)
+        assert all(statut is True for statut in resultats['frequences'][frequence]['statuts'].values())
+    finally:
+        dgm.disconnect()
+
+    engine = fabriqueEngine()
+    try:
+        with engine.connect() as connexion:
+            lignes = pd.read_sql(text('SELECT nom_mes_court, date_mesure, valeur_mesure, code_validation FROM '+\
+                                        DidonBenchMesures.SCHEMA_MESURE+'.'+parametrage.getTable(frequence)+\
+                                        ' ORDER BY nom_mes_court, date_mesure'), connexion)
+    finally:
+        engine.dispose()
+    return lignes, fauxXR.nbAppels
+
+@pytest.mark.parametrize('frequence', ['M', 'A'])
+@pytest.mark.parametrize('tailleLotXR', [1, 2])
+def test_tranches_identiques_fenetre_complete(tmp_path, frequence, tailleLotXR):
+    ## Arrondis et taux de représentativité M/A calculés par pyair.stats
+    pytest.importorskip('pyair')
+    complete, appelsComplete = lisAgregatsDidon(tmp_path / 'complete', frequence, 0, tailleLotXR)
+    parTranches, appelsParTranches = lisAgregatsDidon(tmp_path / 'tranches', frequence, 4, tailleLotXR)
+
+    assert appelsParTranches > appelsComplete
+    assert complete['nom_mes_court'].nunique() == NB_MESURES
+    pd.testing.assert_frame_equal(parTranches, complete)